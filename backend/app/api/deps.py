@@ -3,20 +3,17 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import ReadOnlySessionLocal
 from app.models.models import User
+from app.services.auth_cache import TokenClaims, auth_cache
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     """Get the current authenticated user"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -24,20 +21,34 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        # Decode JWT token
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        email: str = payload.get("sub")
-        if email is None:
+    claims = auth_cache.get_claims(token)
+    if claims is None:
+        try:
+            # Decode JWT token
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+            email: str = payload.get("sub")
+            if email is None:
+                raise credentials_exception
+        except JWTError:
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+        claims = TokenClaims(email=email, user_id=payload.get("uid"))
+        auth_cache.put_claims(token, claims, expires_at=payload.get("exp"))
     
-    # Get user from database
-    result = await db.execute(select(User).filter(User.email == email))
-    user = result.scalar_one_or_none()
+    # Get user from the cache or the database, by primary key if the token carries it
+    if claims.user_id is not None:
+        cached = auth_cache.get_user(claims.user_id)
+        if cached is not None and cached.email == claims.email:
+            return cached.to_user()
+    # A session of its own, so the lookup doesn't hold a connection for the whole request
+    async with ReadOnlySessionLocal() as db:
+        if claims.user_id is not None:
+            user = await db.get(User, claims.user_id)
+        else:
+            result = await db.execute(select(User).filter(User.email == claims.email))
+            user = result.scalar_one_or_none()
     
-    if user is None:
+    # Ids can be reused after a user is deleted, so the email must match too
+    if user is None or user.email != claims.email:
         raise credentials_exception
     
     if not user.is_active:
@@ -46,4 +57,5 @@ async def get_current_user(
             detail="Inactive user"
         )
     
-    return user
\ No newline at end of file
+    auth_cache.put_user(user)
+    return user
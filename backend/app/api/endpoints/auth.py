@@ -1,29 +1,41 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from jose import jwt
-from passlib.context import CryptContext
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.models.models import User
 from app.schemas.schemas import UserCreate, UserResponse, Token
+from app.services.password_service import PasswordHasherBusyError, password_hasher
+from app.services.write_coalescer import write_coalescer
 
 router = APIRouter()
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-ins at once, please try again shortly",
+        headers={"Retry-After": "1"},
+    )
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password against its hash, returning an upgraded hash if one is due"""
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except PasswordHasherBusyError as e:
+        raise _busy() from e
 
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusyError as e:
+        raise _busy() from e
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
@@ -38,6 +50,9 @@ async def register(
     db: AsyncSession = Depends(get_db)
 ):
     """Register a new user"""
+    # Hash first: the write transaction starts with the lookup and shouldn't wait on bcrypt
+    hashed_password = await get_password_hash(user_data.password)
+    
     # Check if user already exists
     result = await db.execute(
         select(User).filter(User.email == user_data.email)
@@ -49,7 +64,6 @@ async def register(
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
     user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -61,7 +75,7 @@ async def register(
     
     # Create access token
     access_token = create_access_token(
-        data={"sub": user.email},
+        data={"sub": user.email, "uid": user.id},
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     
@@ -78,7 +92,7 @@ async def register(
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Log in a user"""
     # Get user from database
@@ -88,16 +102,25 @@ async def login(
     user = result.scalars().first()
     
     # Verify user and password
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = await verify_password(form_data.password, user.hashed_password) if user else (False, None)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Store a hash with the current work factor in place of a weaker one
+    if new_hash:
+        await write_coalescer.submit(
+            lambda session: session.execute(
+                update(User).where(User.id == user.id).values(hashed_password=new_hash)
+            )
+        )
+    
     # Generate access token
     access_token = create_access_token(
-        data={"sub": user.email},
+        data={"sub": user.email, "uid": user.id},
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     
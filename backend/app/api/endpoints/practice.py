@@ -1,26 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func, update, Integer
+from sqlalchemy import func, update
 from sqlalchemy.orm import joinedload
-from datetime import datetime
+from contextlib import aclosing
+import logging
 import random
 
-from app.core.database import get_db
+from app.core.database import get_read_db
+from app.core.clock import Clock, get_clock
 from app.models.models import Word, WordList, User, MistakePattern
-from app.schemas.schemas import PracticeRequest, PracticeResponse, PracticeSubmitRequest, PracticeResult, MistakePatternResponse, WordBase, WordForPattern
+from app.schemas.schemas import PracticeRequest, PracticeResponse, PracticeSubmitRequest, PracticeResult, MistakePatternResponse, MistakeAnalysisResponse, LetterConfusionResponse, PatternPracticeRequest, PatternWordCount, WordBase, WordForPattern
 from app.services.tts_service import tts_service
 from app.services.dictionary_service import dictionary_service
 from app.services.mistake_pattern_service import mistake_pattern_service
+from app.services.mistake_pattern_repository import upsert_mistake_pattern, get_word_patterns
 from app.api.deps import get_current_user
-from app.services.llm_service import llm_service
+from app.api.streaming import EventSourceResponse, sse_event
+from app.core.config import settings
+from app.services.mistake_analysis_service import (
+    mistake_analysis_service, USER_SCOPE, list_scope, word_scope
+)
+from app.services.stats_service import stats_service
+from app.services.srs_service import WordNotFoundError, srs_service
+from app.services.confusion_service import confusion_service
+from app.services.grapheme_index_service import grapheme_index_service
+from app.services.phonetic_key import sounds_alike
+from app.services.llm_service import (
+    llm_service, FALLBACK_ANALYSIS, LLMUnavailableError, parse_analysis
+)
+from app.services.review_event_service import review_event_service
+from app.services.write_coalescer import write_coalescer
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 @router.post("/get-word", response_model=PracticeResponse)
 async def get_practice_word(
     request: PracticeRequest,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -84,11 +103,89 @@ async def get_practice_word(
         "audio_url": audio_url
     }
 
+async def _check_word_list_access(db: AsyncSession, current_user: User, word_list_id: int) -> None:
+    result = await db.execute(
+        select(WordList.id).filter(
+            WordList.id == word_list_id,
+            WordList.owner_id == current_user.id
+        )
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Word list not found or access denied"
+        )
+
+@router.post("/pattern-word", response_model=PracticeResponse)
+async def get_pattern_practice_word(
+    request: PatternPracticeRequest,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a random word containing a spelling pattern, to drill a weak spot
+    """
+    key = grapheme_index_service.key_for(request.pattern)
+    if key is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown pattern"
+        )
+    if request.word_list_id:
+        await _check_word_list_access(db, current_user, request.word_list_id)
+
+    word_id = await grapheme_index_service.sample_word(db, current_user.id, key, request.word_list_id)
+    if word_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No words match this pattern"
+        )
+    word = await db.get(Word, word_id)
+    if word is None:
+        # Deleted since it was sampled
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No words match this pattern"
+        )
+
+    audio_url = tts_service.synthesize_speech(word.word, request.speed)
+    if not audio_url:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to generate audio for word"
+        )
+
+    return {
+        "word_id": word.id,
+        "word": word.word,
+        "phonetic": word.phonetic,
+        "audio_url": audio_url
+    }
+
+@router.get("/patterns", response_model=list[PatternWordCount])
+async def get_practice_patterns(
+    word_list_id: int = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the phonetic patterns that can be drilled, with how many words contain each
+    """
+    if word_list_id:
+        await _check_word_list_access(db, current_user, word_list_id)
+    counts = await grapheme_index_service.pattern_counts(db, current_user.id, word_list_id)
+    return [
+        PatternWordCount(pattern=name, words=counts[name])
+        for name in mistake_pattern_service.phonetic_patterns
+        if name in counts
+    ]
+
 @router.post("/submit", response_model=PracticeResult)
 async def submit_practice(
     request: PracticeSubmitRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+    clock: Clock = Depends(get_clock)
 ):
     """
     Submit a practice attempt and get results
@@ -96,14 +193,13 @@ async def submit_practice(
     # Get the word and verify access
     result = await db.execute(
         select(Word)
-        .options(joinedload(Word.mistake_patterns))
         .join(WordList)
         .filter(
             Word.id == request.word_id,
             WordList.owner_id == current_user.id
         )
     )
-    word = result.unique().scalar_one_or_none()
+    word = result.scalar_one_or_none()
     
     if not word:
         raise HTTPException(
@@ -114,75 +210,77 @@ async def submit_practice(
     # Check if the spelling is correct (case-insensitive)
     is_correct = request.user_spelling.lower().strip() == word.word.lower().strip()
     
-    # Update word stats
-    word.practice_count += 1
-    if is_correct:
-        word.correct_count += 1
-    else:
-        word.incorrect_count += 1
-        # Analyze mistake pattern if incorrect
-        pattern = mistake_pattern_service.analyze_mistake(word.word, request.user_spelling)
-        
-        # Check for existing pattern
-        result = await db.execute(
-            select(MistakePattern).filter(
-                MistakePattern.word_id == word.id,
-                MistakePattern.pattern_type == pattern["pattern_type"],
-                MistakePattern.description == pattern["description"]
-            )
-        )
-        existing_pattern = result.scalar_one_or_none()
+    async def record_attempt(session: AsyncSession):
+        """Count the attempt in one atomic update, along with whatever it teaches about the word"""
+        _, delta = await srs_service.record_answer(session, word, is_correct, clock.now())
+        stale_scopes = []
+        if not is_correct:
+            # Analyze the mistake once and record it in a single statement
+            pattern = mistake_pattern_service.analyze_mistake(word.word, request.user_spelling)
+            await upsert_mistake_pattern(session, word.id, pattern, request.user_spelling)
+            await confusion_service.record(session, current_user.id, word.word, request.user_spelling)
+            stale_scopes = await mistake_analysis_service.invalidate(session, current_user.id, word)
+            # The response reads this word's analysis, so make sure there is one to read
+            await mistake_analysis_service.request(session, current_user.id, word_scope(word.id))
         
-        if existing_pattern:
-            # Update existing pattern
-            existing_pattern.frequency += 1
-            if request.user_spelling not in existing_pattern.examples:
-                existing_pattern.examples = existing_pattern.examples + [request.user_spelling]
-        else:
-            # Create new pattern
-            new_pattern = MistakePattern(
-                word_id=word.id,
-                pattern_type=pattern["pattern_type"],
-                description=pattern["description"],
-                examples=[request.user_spelling],
-                frequency=1
-            )
-            db.add(new_pattern)
+        await stats_service.apply_delta(session, current_user.id, word.word_list_id, delta)
+        return stale_scopes
     
-    # Update familiar status based on practice history
-    if word.practice_count >= 3 and word.correct_count / word.practice_count >= 0.8:
-        word.familiar = True
+    # Don't hold a connection while the write waits for its batch
+    await db.close()
     
-    word.last_practiced = datetime.utcnow()
-    await db.commit()
-    await db.refresh(word)
+    # Committed together with the answers of other learners
+    try:
+        stale_scopes = await write_coalescer.submit(record_attempt)
+    except WordNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Word not found or access denied"
+        )
+    if not is_correct:
+        mistake_analysis_service.schedule(current_user.id, stale_scopes)
+    review_event_service.record(
+        current_user.id, word, is_correct, request.user_spelling,
+        word.srs_level, word.last_practiced, request.latency_ms
+    )
     
     # Get dictionary data if not already available
     if not word.meaning and dictionary_service:
         try:
-            meaning, example = await dictionary_service.get_word_details(word.word)
+            meaning, example, phonetic = await dictionary_service.get_word_details(word.word)
+            details = {}
             if meaning:
-                word.meaning = meaning
-                await db.commit()
+                details["meaning"] = word.meaning = meaning
             if example: 
-                word.example = example
-                await db.commit()
+                details["example"] = word.example = example
+            if phonetic and not word.phonetic:
+                details["phonetic"] = word.phonetic = phonetic
+            if details:
+                await write_coalescer.submit(
+                    lambda session: session.execute(update(Word).where(Word.id == word.id).values(**details))
+                )
         except Exception as e:
-            print(f"Error getting dictionary data: {e}")
+            logger.warning(f"Error getting dictionary data for '{word.word}': {str(e)}")
     
     # Transform mistake patterns for response using the updated schema
     mistake_patterns = []
     if not is_correct:
-        pattern = mistake_pattern_service.analyze_mistake(word.word, request.user_spelling)
-        if pattern:
-            # Create or update mistake pattern
-            db_pattern = await create_or_update_mistake_pattern(db, word.id, pattern)
-            mistake_patterns = await get_mistake_patterns(db, word_id=word.id)
-            
-            # Add LLM analysis for the patterns
-            llm_analysis = await llm_service.analyze_mistake_patterns(mistake_patterns)
-            for pattern in mistake_patterns:
-                pattern.llm_analysis = llm_analysis
+        patterns = await get_word_patterns(db, word.id)
+        
+        # Attach the latest stored LLM analysis; a fresh one is computed in the background
+        analysis = await mistake_analysis_service.get_analysis(db, current_user.id, word_scope(word.id))
+        mistake_patterns = [
+            MistakePatternResponse(
+                pattern_type=p.pattern_type,
+                description=p.description,
+                examples=p.examples,
+                count=p.frequency,
+                word=WordForPattern(id=word.id, word=word.word),
+                llm_analysis=analysis.analysis,
+                llm_analysis_status=analysis.status
+            )
+            for p in patterns
+        ]
     
     return PracticeResult(
         word_id=word.id,
@@ -192,6 +290,7 @@ async def submit_practice(
         meaning=word.meaning,
         example=word.example,
         phonetic=word.phonetic,
+        sounds_alike=not is_correct and sounds_alike(word.word, request.user_spelling, word.phonetic_key),
         mistake_patterns=mistake_patterns
     )
 
@@ -199,7 +298,7 @@ async def submit_practice(
 @router.get("/{word_list_id}/stats")
 async def get_practice_stats(
     word_list_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -219,24 +318,15 @@ async def get_practice_stats(
             detail="Word list not found or access denied"
         )
     
-    # Get word statistics
-    result = await db.execute(
-        select(
-            func.count().label('total_words'),
-            func.sum(Word.familiar.cast(Integer)).label('familiar_words'),
-            func.sum((Word.practice_count > 0).cast(Integer)).label('practiced_words'),
-            func.sum(Word.correct_count).label('total_correct'),
-            func.sum(Word.practice_count).label('total_practices')
-        ).filter(Word.word_list_id == word_list_id)
-    )
-    stats = result.first()
+    # Read the incrementally maintained counters for the list
+    stats = await stats_service.get_word_list_stats(db, word_list_id)
     
     # Calculate statistics
-    total_words = stats.total_words or 0
-    familiar_words = stats.familiar_words or 0
-    practiced_words = stats.practiced_words or 0
-    total_correct = stats.total_correct or 0
-    total_practices = stats.total_practices or 0
+    total_words = stats.total_words
+    familiar_words = stats.familiar_words
+    practiced_words = stats.practiced_words
+    total_correct = stats.total_correct
+    total_practices = stats.total_attempts
     
     return {
         "total_words": total_words,
@@ -248,7 +338,7 @@ async def get_practice_stats(
 @router.get("/mistake-patterns", response_model=list[MistakePatternResponse])
 async def get_mistake_patterns(
     word_list_id: int = None,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -269,11 +359,11 @@ async def get_mistake_patterns(
     result = await db.execute(query)
     patterns = result.unique().scalars().all()
     
-    # Add LLM analysis for the patterns
+    # Attach the latest stored LLM analysis; a fresh one is computed in the background
+    analysis = None
     if patterns:
-        llm_analysis = await llm_service.analyze_mistake_patterns(patterns)
-        for pattern in patterns:
-            pattern.llm_analysis = llm_analysis
+        scope = list_scope(word_list_id) if word_list_id else USER_SCOPE
+        analysis = await mistake_analysis_service.get_analysis(db, current_user.id, scope)
             
     return [
         MistakePatternResponse(
@@ -285,7 +375,103 @@ async def get_mistake_patterns(
                 id=pattern.word.id,
                 word=pattern.word.word
             ) if pattern.word else None,
-            llm_analysis=pattern.llm_analysis
+            llm_analysis=analysis.analysis if analysis else None,
+            llm_analysis_status=analysis.status if analysis else None
         )
         for pattern in patterns
-    ]
\ No newline at end of file
+    ]
+
+async def _resolve_analysis_scope(
+    db: AsyncSession,
+    current_user: User,
+    word_id: int = None,
+    word_list_id: int = None
+) -> str:
+    """Get the analysis scope for a word, a word list or all patterns, checking ownership"""
+    if word_id:
+        result = await db.execute(
+            select(Word.id).join(WordList).filter(
+                Word.id == word_id,
+                WordList.owner_id == current_user.id
+            )
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Word not found or access denied"
+            )
+        return word_scope(word_id)
+    if word_list_id:
+        await _check_word_list_access(db, current_user, word_list_id)
+        return list_scope(word_list_id)
+    return USER_SCOPE
+
+@router.get("/mistake-analysis", response_model=MistakeAnalysisResponse)
+async def get_mistake_analysis(
+    word_id: int = None,
+    word_list_id: int = None,
+    wait: float = Query(0, ge=0, le=settings.MISTAKE_ANALYSIS_MAX_WAIT_SECONDS),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the LLM analysis of the current user's mistake patterns.
+    
+    Covers one word if word_id is given, one word list if word_list_id is
+    given, and all patterns otherwise. While a fresh analysis is pending the
+    request waits up to `wait` seconds for it, so clients can long-poll.
+    """
+    scope = await _resolve_analysis_scope(db, current_user, word_id, word_list_id)
+    return await mistake_analysis_service.wait_for(db, current_user.id, scope, wait)
+
+@router.get("/mistake-analysis/stream")
+async def stream_mistake_analysis(
+    word_id: int = None,
+    word_list_id: int = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream an LLM analysis of the current user's mistake patterns as server-sent events.
+    
+    Same scopes as /mistake-analysis. Sends `delta` events with pieces of
+    the analysis text as the model writes them, then a `done` event with the
+    parsed analysis, or an `error` event with the fallback analysis if the
+    model is unavailable.
+    """
+    scope = await _resolve_analysis_scope(db, current_user, word_id, word_list_id)
+    patterns = await mistake_analysis_service.load_patterns(db, current_user.id, scope)
+    # Don't hold the database connection for the length of the stream
+    await db.close()
+
+    async def events():
+        if not patterns:
+            yield sse_event("done", None)
+            return
+        text = []
+        try:
+            async with aclosing(llm_service.stream_mistake_patterns(patterns)) as pieces:
+                async for piece in pieces:
+                    text.append(piece)
+                    yield sse_event("delta", {"text": piece})
+        except LLMUnavailableError:
+            yield sse_event("error", FALLBACK_ANALYSIS)
+            return
+        yield sse_event("done", parse_analysis("".join(text)))
+
+    return EventSourceResponse(events())
+
+@router.get("/confusions", response_model=list[LetterConfusionResponse])
+async def get_letter_confusions(
+    limit: int = Query(10, ge=1, le=100),
+    kind: str = Query(None, pattern="^(substitute|insert|delete|transpose)$"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the letters and letter groups the current user confuses most often.
+    
+    Counts are kept up to date on every wrong answer, so this reads the top
+    of the user's confusion matrix without looking at mistake patterns.
+    """
+    return await confusion_service.top_confusions(db, current_user.id, limit, kind)
@@ -5,11 +5,12 @@ from sqlalchemy import func, and_, desc, text
 from datetime import datetime
 from typing import List, Dict
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.models.models import Word, WordList, User
 from app.schemas.schemas import ReviewWordResponse, ReviewSubmitRequest, PracticeResult, SRSStatsResponse
 from app.services.tts_service import tts_service
 from app.services.srs_service import srs_service
+from app.services.review_event_service import review_event_service
 from app.api.deps import get_current_user
 
 router = APIRouter()
@@ -17,7 +18,7 @@ router = APIRouter()
 @router.get("", response_model=List[ReviewWordResponse])
 async def get_review_words(
     limit: int = 20,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get words that are due for review"""
@@ -70,7 +71,11 @@ async def submit_review(
     is_correct = request.user_spelling.lower().strip() == word.word.lower().strip()
 
     # Process the review result with SRS
-    await srs_service.process_review_result(db, word, is_correct)
+    old_level = await srs_service.process_review_result(db, word, is_correct, current_user.id)
+    review_event_service.record(
+        current_user.id, word, is_correct, request.user_spelling,
+        old_level, word.last_practiced, request.latency_ms
+    )
 
     return PracticeResult(
         word_id=word.id,
@@ -85,7 +90,7 @@ async def submit_review(
 
 @router.get("/stats", response_model=SRSStatsResponse)
 async def get_srs_stats(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get SRS statistics for the user"""
@@ -2,7 +2,7 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.services import spelling_rule_service
 from app.schemas.schemas import (
     SpellingRuleCreate,
@@ -22,7 +22,7 @@ async def create_rule(
 @router.get("/{rule_id}", response_model=SpellingRuleResponse)
 async def get_rule(
     rule_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     rule = await spelling_rule_service.get_spelling_rule(db, rule_id)
     if not rule:
@@ -34,7 +34,7 @@ async def list_rules(
     skip: int = 0,
     limit: int = 100,
     category: Optional[str] = Query(None, description="Filter rules by category"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     return await spelling_rule_service.get_spelling_rules(db, skip, limit, category)
 
@@ -1,28 +1,60 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Tuple
+from collections import Counter
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func, Integer
-from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 
-from app.core.database import get_db
-from app.models.models import Word, WordList, User, MistakePattern
+from app.core.database import get_db, get_read_db
+from app.core.clock import Clock, get_clock
+from app.models.models import Word, WordList, User
 from app.schemas.schemas import (
     ReviewWordResponse, ReviewSubmitRequest, SRSStatsResponse,
-    MistakePatternResponse, WordForPattern, PracticeResult
+    MistakePatternResponse, WordForPattern, PracticeResult,
+    BatchReviewRequest, BatchReviewResponse, BatchReviewItemResult,
+    ReviewEventResponse
 )
-from app.services.srs_service import srs_service
+from app.services.srs_service import WordNotFoundError, srs_service
+from app.services.stats_service import stats_service
+from app.services.review_event_service import review_event_service
+from app.services.write_coalescer import write_coalescer
 from app.services.tts_service import tts_service
 from app.services.mistake_pattern_service import mistake_pattern_service
+from app.services.mistake_pattern_repository import upsert_mistake_pattern, get_word_patterns
+from app.services.confusion_service import confusion_service
+from app.services.phonetic_key import sounds_alike
+from app.services.mistake_analysis_service import mistake_analysis_service
 from app.api.deps import get_current_user
 
 router = APIRouter()
 
+async def _apply_review(
+    db: AsyncSession, word: Word, is_correct: bool, reviewed_at: datetime, user_id: int
+) -> Tuple[int, Counter]:
+    """Apply one review outcome to a word's practice stats and SRS schedule, returning its old level and stats delta"""
+    if is_correct:
+        levels = [min(level + 1, 5) for level in range(6)]  # Cap at level 5
+    else:
+        levels = [max(level - 1, 0) for level in range(6)]  # Floor at level 0
+    
+    # Calculate next review time based on SRS level
+    intervals = [srs_service.get_review_interval(level, user_id) for level in range(6)]
+    return await srs_service.record_answer(
+        db, word, is_correct, reviewed_at, levels=levels, intervals=intervals
+    )
+
+def _review_time(answered_at: Optional[datetime], now: datetime) -> datetime:
+    """Convert a client timestamp to naive UTC, never later than the server time"""
+    if answered_at is None:
+        return now
+    if answered_at.tzinfo is not None:
+        answered_at = answered_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return min(answered_at, now)
+
 @router.get("/review", response_model=List[ReviewWordResponse])
 async def get_review_words(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     limit: int = 20
 ):
@@ -67,21 +99,21 @@ async def get_review_words(
 async def submit_review(
     word_id: int,
     request: ReviewSubmitRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+    clock: Clock = Depends(get_clock)
 ):
     """Submit a review result for a word"""
     # Verify word exists and belongs to user
     result = await db.execute(
         select(Word)
-        .options(joinedload(Word.mistake_patterns))
         .join(WordList)
         .filter(
             Word.id == word_id,
             WordList.owner_id == current_user.id
         )
     )
-    word = result.unique().scalar_one_or_none()
+    word = result.scalar_one_or_none()
     
     if not word:
         raise HTTPException(
@@ -91,56 +123,40 @@ async def submit_review(
     
     # Check if the spelling is correct (case-insensitive)
     is_correct = request.user_spelling.lower().strip() == word.word.lower().strip()
+    reviewed_at = clock.now()
     
-    # Update SRS level and next review time based on correctness
-    word.practice_count += 1
-    if is_correct:
-        word.correct_count += 1
-        word.srs_level = min(word.srs_level + 1, 5)  # Cap at level 5
-    else:
-        word.incorrect_count += 1
-        word.srs_level = max(word.srs_level - 1, 0)  # Floor at level 0
-        
-        # Analyze and store mistake pattern
-        pattern = mistake_pattern_service.analyze_mistake(word.word, request.user_spelling)
-        
-        # Check for existing pattern
-        result = await db.execute(
-            select(MistakePattern).filter(
-                MistakePattern.word_id == word.id,
-                MistakePattern.pattern_type == pattern["pattern_type"],
-                MistakePattern.description == pattern["description"]
-            )
-        )
-        existing_pattern = result.scalar_one_or_none()
-        
-        if existing_pattern:
-            existing_pattern.frequency += 1
-            if request.user_spelling not in existing_pattern.examples:
-                existing_pattern.examples = existing_pattern.examples + [request.user_spelling]
-        else:
-            new_pattern = MistakePattern(
-                word_id=word.id,
-                pattern_type=pattern["pattern_type"],
-                description=pattern["description"],
-                examples=[request.user_spelling],
-                frequency=1
-            )
-            db.add(new_pattern)
-    
-    # Calculate next review time based on SRS level
-    word.review_interval = srs_service.get_review_interval(word.srs_level)
-    word.next_review = datetime.utcnow() + timedelta(hours=word.review_interval)
-    word.last_practiced = datetime.utcnow()
+    async def record_review(session: AsyncSession):
+        """Update stats, SRS level and next review time in one atomic update"""
+        old_level, delta = await _apply_review(session, word, is_correct, reviewed_at, current_user.id)
+        stale_scopes = []
+        if not is_correct:
+            pattern = mistake_pattern_service.analyze_mistake(word.word, request.user_spelling)
+            await upsert_mistake_pattern(session, word.id, pattern, request.user_spelling)
+            await confusion_service.record(session, current_user.id, word.word, request.user_spelling)
+            stale_scopes = await mistake_analysis_service.invalidate(session, current_user.id, word)
+        await stats_service.apply_delta(session, current_user.id, word.word_list_id, delta)
+        return old_level, stale_scopes
     
-    # Update familiar status based on practice history
-    if word.practice_count >= 3 and word.correct_count / word.practice_count >= 0.8:
-        word.familiar = True
+    # Don't hold a connection while the write waits for its batch
+    await db.close()
     
-    await db.commit()
-    await db.refresh(word)
+    # Committed together with the answers of other learners
+    try:
+        old_level, stale_scopes = await write_coalescer.submit(record_review)
+    except WordNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Word not found or access denied"
+        )
+    if not is_correct:
+        mistake_analysis_service.schedule(current_user.id, stale_scopes)
+    review_event_service.record(
+        current_user.id, word, is_correct, request.user_spelling,
+        old_level, reviewed_at, request.latency_ms
+    )
     
     # Transform mistake patterns for response
+    patterns = await get_word_patterns(db, word.id)
     mistake_patterns = [
         MistakePatternResponse(
             pattern_type=p.pattern_type,
@@ -152,7 +168,7 @@ async def submit_review(
                 word=word.word
             )
         )
-        for p in word.mistake_patterns
+        for p in patterns
     ]
     
     return PracticeResult(
@@ -162,12 +178,147 @@ async def submit_review(
         correct_spelling=word.word,
         meaning=word.meaning,
         example=word.example,
+        sounds_alike=not is_correct and sounds_alike(word.word, request.user_spelling, word.phonetic_key),
         mistake_patterns=mistake_patterns
     )
 
+@router.post("/review/batch", response_model=BatchReviewResponse)
+async def submit_review_batch(
+    request: BatchReviewRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    clock: Clock = Depends(get_clock)
+):
+    """
+    Submit several review results at once, e.g. after practicing offline.
+    
+    Ownership is checked with a single query and all updates are applied in
+    one transaction, in the order the answers were given.
+    """
+    now = clock.now()
+    word_ids = {item.word_id for item in request.results}
+    
+    # Load every referenced word the user owns
+    result = await db.execute(
+        select(Word)
+        .join(WordList)
+        .filter(
+            Word.id.in_(word_ids),
+            WordList.owner_id == current_user.id
+        )
+    )
+    words = {word.id: word for word in result.scalars().all()}
+    
+    # Replay answers chronologically so the final schedule matches live practice
+    ordered = sorted(
+        enumerate(request.results),
+        key=lambda entry: _review_time(entry[1].answered_at, now)
+    )
+    
+    results: List[Optional[BatchReviewItemResult]] = [None] * len(request.results)
+    events = []
+    deltas = {}
+    mistaken_word_ids = set()
+    for index, item in ordered:
+        word = words.get(item.word_id)
+        if not word:
+            results[index] = BatchReviewItemResult(word_id=item.word_id, status="not_found")
+            continue
+        
+        is_correct = item.user_spelling.lower().strip() == word.word.lower().strip()
+        reviewed_at = _review_time(item.answered_at, now)
+        mistake_pattern = None
+        try:
+            old_level, delta = await _apply_review(db, word, is_correct, reviewed_at, current_user.id)
+            # Collect the stats changes to apply once per word list
+            deltas.setdefault(word.word_list_id, Counter()).update(delta)
+            if not is_correct:
+                mistaken_word_ids.add(word.id)
+                analyzed = mistake_pattern_service.analyze_mistake(word.word, item.user_spelling)
+                pattern = await upsert_mistake_pattern(
+                    db, word.id, analyzed, item.user_spelling, with_examples=True
+                )
+                await confusion_service.record(db, current_user.id, word.word, item.user_spelling)
+        except SQLAlchemyError:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database error while saving review results"
+            )
+        
+        if not is_correct:
+            mistake_pattern = MistakePatternResponse(
+                pattern_type=pattern.pattern_type,
+                description=pattern.description,
+                examples=pattern.examples,
+                count=pattern.frequency,
+                word=WordForPattern(id=word.id, word=word.word)
+            )
+        
+        results[index] = BatchReviewItemResult(
+            word_id=word.id,
+            status="ok",
+            correct=is_correct,
+            correct_spelling=word.word,
+            sounds_alike=not is_correct and sounds_alike(word.word, item.user_spelling, word.phonetic_key),
+            srs_level=word.srs_level,
+            next_review=word.next_review,
+            mistake_pattern=mistake_pattern
+        )
+        events.append(
+            (word, is_correct, item.user_spelling, old_level, word.srs_level, reviewed_at, item.latency_ms)
+        )
+    
+    stale_scopes = set()
+    try:
+        for word_list_id, delta in deltas.items():
+            await stats_service.apply_delta(db, current_user.id, word_list_id, delta)
+        for word_id in mistaken_word_ids:
+            stale_scopes.update(
+                await mistake_analysis_service.invalidate(db, current_user.id, words[word_id])
+            )
+        await db.commit()
+    except SQLAlchemyError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error while saving review results"
+        )
+    
+    mistake_analysis_service.schedule(current_user.id, stale_scopes)
+    for word, is_correct, user_spelling, old_level, new_level, reviewed_at, latency_ms in events:
+        review_event_service.record(
+            current_user.id, word, is_correct, user_spelling,
+            old_level, reviewed_at, latency_ms, new_level=new_level
+        )
+    
+    failed = sum(1 for item_result in results if item_result.status != "ok")
+    return BatchReviewResponse(
+        processed=len(results) - failed,
+        failed=failed,
+        results=results
+    )
+
+@router.get("/history", response_model=List[ReviewEventResponse])
+async def get_review_history(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the user's individual review attempts in a time range, oldest first"""
+    return await review_event_service.get_events(
+        db,
+        current_user.id,
+        start=_review_time(start, datetime.max) if start else None,
+        end=_review_time(end, datetime.max) if end else None,
+        limit=limit
+    )
+
 @router.get("/stats", response_model=SRSStatsResponse)
 async def get_srs_stats(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get SRS statistics for the current user"""
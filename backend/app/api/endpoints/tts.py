@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict
 
-from app.api.deps import get_db
+from app.core.database import get_read_db
 from app.services.batch_tts_service import batch_tts_service
 
 router = APIRouter()
@@ -10,7 +10,7 @@ router = APIRouter()
 @router.post("/generate-all", response_model=Dict)
 async def generate_all_audio(
     speed: str = "normal",
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Generate audio files for all words in the database"""
     if speed not in ["normal", "slow"]:
@@ -26,7 +26,7 @@ async def generate_all_audio(
 async def generate_word_list_audio(
     word_list_id: int,
     speed: str = "normal",
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Generate audio files for words in a specific word list"""
     if speed not in ["normal", "slow"]:
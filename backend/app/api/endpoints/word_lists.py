@@ -7,19 +7,22 @@ from typing import List
 import csv
 import io
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.models.models import WordList, Word, User
 from app.schemas.schemas import WordListCreate, WordListResponse, WordResponse, SimilarWordsResponse
 from app.services.csv_service import csv_service
 from app.services.dictionary_service import dictionary_service
+from app.services.grapheme_index_service import grapheme_index_service
+from app.services.phonetic_key import phonetic_key
 from app.services.srs_service import srs_service
+from app.services.stats_service import stats_service
 from app.api.deps import get_current_user
 
 router = APIRouter()
 
 @router.get("/", response_model=List[WordListResponse])
 async def get_word_lists(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all word lists for the current user"""
@@ -31,7 +34,7 @@ async def get_word_lists(
 @router.get("/{list_id}", response_model=WordListResponse)
 async def get_word_list(
     list_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific word list"""
@@ -52,7 +55,7 @@ async def get_word_list(
 @router.get("/{list_id}/words", response_model=List[WordResponse])
 async def get_words_in_list(
     list_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all words in a specific word list"""
@@ -90,21 +93,13 @@ async def upload_word_list(
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="File must be a CSV")
     
-    # Create new word list
-    word_list = WordList(
-        name=name,
-        description=description,
-        owner_id=current_user.id,
-        created_at=datetime.now(timezone.utc)
-    )
-    db.add(word_list)
-    await db.flush()  # Get word_list.id
-    
-    # Read and process CSV file
+    # Read the CSV and look up word details before anything is written, so the
+    # write lock isn't held across dictionary lookups
     content = await file.read()
     csv_file = io.StringIO(content.decode())
     csv_reader = csv.DictReader(csv_file)
     
+    entries = []
     for row in csv_reader:
         if 'word' not in row:
             raise HTTPException(status_code=400, detail="CSV must have a 'word' column")
@@ -112,25 +107,42 @@ async def upload_word_list(
         word_text = row['word'].strip()
         # Get word details including phonetic representation
         meaning, example, phonetic = await dictionary_service.get_word_details(word_text)
-        
+        entries.append((row, word_text, meaning, example, phonetic))
+    
+    # Create new word list
+    word_list = WordList(
+        name=name,
+        description=description,
+        owner_id=current_user.id,
+        created_at=datetime.now(timezone.utc)
+    )
+    db.add(word_list)
+    await db.flush()  # Get word_list.id
+    
+    new_words = []
+    for row, word_text, meaning, example, phonetic in entries:
         # Create new word
         word = Word(
             word=word_text,
             meaning=meaning or row.get('meaning', '').strip(),
             example=example or row.get('example', '').strip(),
             phonetic=phonetic,
+            phonetic_key=phonetic_key(word_text),
             word_list_id=word_list.id,
             familiar=False,
             practice_count=0,
             correct_count=0,
             incorrect_count=0
         )
-        db.add(word)
-        await db.flush()
-        
         # Initialize SRS for the new word
-        await srs_service.initialize_word(db, word)
+        srs_service.initialize_word(word)
+        db.add(word)
+        new_words.append(word)
+    await db.flush()  # Get the word ids for the index
     
+    # Words, counters and index entries commit together
+    await stats_service.add_words(db, current_user.id, word_list.id, new_words)
+    await grapheme_index_service.add_words(db, current_user.id, new_words)
     await db.commit()
     return word_list
 
@@ -154,6 +166,8 @@ async def delete_word_list(
             detail="Word list not found"
         )
     
+    await stats_service.remove_word_list(db, current_user.id, word_list.id)
+    await grapheme_index_service.remove_word_list(db, word_list.id)
     await db.delete(word_list)
     await db.commit()
     return {"message": "Word list deleted successfully"}
@@ -189,7 +203,7 @@ async def update_word_list(
 @router.get("/words/{word_id}/similar", response_model=SimilarWordsResponse)
 async def get_similar_words(
     word_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get similar words for a specific word"""
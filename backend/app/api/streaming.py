@@ -0,0 +1,32 @@
+import json
+from typing import Any
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class EventSourceResponse(StreamingResponse):
+    """
+    Streaming response for server-sent events.
+
+    Starlette stops iterating the body when the client disconnects but
+    leaves the generator suspended; it is closed here so whatever it holds
+    open, like an upstream LLM call, ends with the request.
+    """
+
+    media_type = "text/event-stream"
+
+    def __init__(self, content, **kwargs):
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **(kwargs.pop("headers", None) or {})}
+        super().__init__(content, headers=headers, **kwargs)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()
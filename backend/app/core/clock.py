@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+
+class Clock:
+    """Source of the current time as naive UTC datetimes, like datetime.utcnow()"""
+
+    def now(self) -> datetime:
+        return datetime.utcnow()
+
+
+class SimulatedClock(Clock):
+    """Clock that only moves when told to, for simulations and reproducible runs"""
+
+    def __init__(self, start: datetime):
+        self._now = start
+
+    def now(self) -> datetime:
+        return self._now
+
+    def advance(self, delta: timedelta) -> None:
+        """Move the clock forward"""
+        self._now += delta
+
+
+_clock: Clock = Clock()
+
+
+def get_clock() -> Clock:
+    """Get the active clock; also used as a FastAPI dependency"""
+    return _clock
+
+
+def set_clock(clock: Clock) -> None:
+    """Replace the active clock, e.g. with a SimulatedClock"""
+    global _clock
+    _clock = clock
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -9,12 +9,35 @@ class Settings(BaseSettings):
     # Security
     SECRET_KEY: str = "your-super-secret-key-change-this-in-production"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_TTL_SECONDS: int = 60  # How long a decoded token and its user are reused without a query
+    AUTH_CACHE_MAX_ENTRIES: int = 10000  # Tokens, and separately users, kept per process
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # Work factor of new hashes; weaker stored hashes are upgraded at login
+    PASSWORD_HASH_WORKERS: int = 2  # Threads hashing and verifying passwords
+    PASSWORD_HASH_MAX_PENDING: int = 32  # Password checks that may wait for a thread; more are turned away
+    PASSWORD_HASH_MAX_WAIT_SECONDS: float = 5.0  # Longest a password check waits for a thread
     
     # OpenAI Configuration
     OPENAI_API_KEY: str = ""
+    LLM_BACKEND: str = "openai"  # 'openai', or 'stub' for a deterministic offline backend
+    LLM_MODEL: str = "gpt-3.5-turbo"
+    LLM_BASE_URL: Optional[str] = None  # OpenAI-compatible endpoint, defaults to the OpenAI API
+    LLM_MAX_CONCURRENCY: int = 8  # In-flight completion requests across the whole process
+    LLM_TIMEOUT_SECONDS: float = 20.0  # Deadline for one completion, including retries
+    LLM_MAX_RETRIES: int = 2  # Retries for timeouts, connection errors, rate limits and 5xx
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failures before calls are short-circuited
+    LLM_CIRCUIT_RESET_SECONDS: int = 30  # How long the circuit stays open before a trial call
     
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./spelling_teacher.db"
+    DATABASE_ECHO: bool = False  # Log every SQL statement
+    SQLITE_JOURNAL_MODE: str = "WAL"  # Lets reads run alongside a write
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # Safe with WAL; FULL also syncs on every commit
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # How long a connection waits for a lock before "database is locked"
+    SQLITE_CACHE_SIZE_KB: int = 20000  # Page cache per connection
+    SQLITE_MMAP_SIZE_MB: int = 256  # Share of the file read through memory mapping (0 disables it)
+    SQLITE_READ_POOL_SIZE: int = 4  # Read-only connections kept for endpoints that only read
+    SQLITE_WRITE_POOL_SIZE: int = 1  # Write connections per process, handed out in arrival order (0 opens one per session)
+    SQLITE_OPTIMIZE_INTERVAL_HOURS: float = 6  # How often planner statistics are refreshed (0 disables it)
     
     # CORS Settings
     CORS_ORIGINS: List[str] = [
@@ -29,6 +52,49 @@ class Settings(BaseSettings):
     MIN_PRACTICE_COUNT: int = 3  # Minimum practices before word can be familiar
     MIN_ACCURACY: float = 0.8  # Minimum accuracy to mark word as familiar
     
+    # Stats Counters
+    STATS_RECONCILE_INTERVAL_MINUTES: int = 60  # How often counters are checked against aggregates
+    
+    # Review Event Log
+    REVIEW_EVENT_BATCH_SIZE: int = 200  # Flush after this many events
+    REVIEW_EVENT_FLUSH_MS: int = 500  # ... or after this many milliseconds
+    
+    # Write Coalescing
+    WRITE_COALESCE_MS: float = 5  # How long submitted answers are collected into one transaction
+    WRITE_COALESCE_MAX_BATCH: int = 100  # ... or until this many are waiting
+    
+    # SRS Interval Optimizer
+    SRS_TARGET_RETENTION: float = 0.9  # Recall probability the fitted intervals aim for
+    SRS_OPTIMIZER_INTERVAL_HOURS: int = 24  # How often the background job refits (0 disables it)
+    SRS_OPTIMIZER_MIN_SAMPLES: int = 200  # Minimum reviews before a level's interval is fitted
+    SRS_OPTIMIZER_MIN_USER_SAMPLES: int = 50  # Minimum reviews before a user gets their own scale
+    SRS_PARAMETER_REFRESH_MINUTES: int = 10  # How often each process loads the latest fitted intervals
+    
+    # Background Mistake Analysis
+    MISTAKE_ANALYSIS_WORKERS: int = 2  # Concurrent LLM analysis jobs
+    MISTAKE_ANALYSIS_MAX_WAIT_SECONDS: int = 30  # Longest a client may block waiting for a fresh analysis
+    
+    # LLM Response Cache
+    LLM_CACHE_DIR: str = "cache/llm"
+    LLM_CACHE_TTL_HOURS: int = 168  # Cached completions older than this are fetched again
+    LLM_CACHE_MAX_MB: int = 50  # Oldest entries are evicted beyond this size
+    
+    # LLM Prompt Compaction
+    LLM_PROMPT_TOP_K: int = 8  # Most mistake patterns included in an analysis prompt
+    LLM_PROMPT_MAX_EXAMPLES: int = 3  # Most recent examples kept per pattern
+    LLM_PROMPT_TOKEN_BUDGET: int = 400  # Estimated tokens the pattern section may take
+    LLM_PROMPT_RECENCY_HALF_LIFE_DAYS: float = 14  # Age at which a pattern's frequency counts half
+    
+    # Mistake Pattern Analysis
+    MISTAKE_PATTERN_FEATURE_CACHE_SIZE: int = 8192  # Correct spellings whose precomputed features are kept
+    MISTAKE_PATTERN_MAX_EXAMPLES: int = 10  # Most recent distinct attempts kept per pattern
+    MISTAKE_RECLASSIFY_WORKERS: int = 4  # Processes analyzing attempts during bulk reclassification
+    MISTAKE_RECLASSIFY_BATCH_SIZE: int = 500  # Words read and rewritten per reclassification batch
+
+    # Pattern Drills
+    GRAPHEME_NGRAM_MIN: int = 2  # Shortest letter sequence words are indexed by
+    GRAPHEME_NGRAM_MAX: int = 4  # Longest letter sequence words are indexed by
+    
     # File Cleanup
     FILE_MAX_AGE_HOURS: int = 24  # Maximum age for temporary files
     
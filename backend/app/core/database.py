@@ -1,24 +1,168 @@
+from sqlalchemy import event
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import Optional
+from urllib.parse import quote
+import asyncio
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+
+
+def _write_pool_options(url: URL) -> dict:
+    """Pool settings for the primary engine"""
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return {}
+    if settings.SQLITE_WRITE_POOL_SIZE <= 0:
+        return {}
+    # SQLite has one write lock and its busy handler polls for it, so under
+    # load some writers keep losing until busy_timeout runs out. Waiting for
+    # one of a few pooled connections instead is first come, first served.
+    return {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": settings.SQLITE_WRITE_POOL_SIZE,
+        "max_overflow": 0,
+    }
 
-SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./spelling_teacher.db"
 
 engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
-    echo=True,
+    echo=settings.DATABASE_ECHO,
     future=True,
+    **_write_pool_options(make_url(SQLALCHEMY_DATABASE_URL)),
 )
 
+
+def sqlite_pragmas(read_only: bool = False) -> list:
+    """Pragmas every new SQLite connection starts with"""
+    pragmas = [
+        # Wait for a lock instead of failing with "database is locked"
+        f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        # Negative sizes are in KiB
+        f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}",
+        f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE_MB) * 1024 * 1024}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if read_only:
+        # Refuse writes even if the file could be opened for writing
+        return pragmas + ["PRAGMA query_only=ON"]
+    return [
+        # Readers don't block the writer and vice versa; the setting is stored in the file
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        # In WAL mode NORMAL only syncs at checkpoints and can't corrupt the database
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+    ] + pragmas
+
+
+def _read_only_url(url: URL) -> Optional[URL]:
+    """The URL of a read-only connection to the same SQLite file, if there is a file"""
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return None
+    if url.query.get("uri") == "true" or url.database.startswith("file:"):
+        return None  # Already a URI whose options we don't want to second-guess
+    return url.set(
+        database=f"file:{quote(url.database)}",
+        query={**url.query, "mode": "ro", "uri": "true"}
+    )
+
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        # Let SQLAlchemy's "begin" event start transactions instead of the driver
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in sqlite_pragmas():
+            cursor.execute(pragma)
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin_immediate(conn) -> None:
+        # Take the write lock up front. A transaction that reads first and
+        # writes later can't wait for it: upgrading a read snapshot fails with
+        # "database is locked" at once, whatever busy_timeout says. Sessions
+        # that only read should therefore use ReadOnlySessionLocal.
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+# Reads get their own pool of read-only connections, which in WAL mode run
+# alongside the writer; other databases share the primary engine
+_read_url = _read_only_url(make_url(SQLALCHEMY_DATABASE_URL))
+if _read_url is not None:
+    read_engine = create_async_engine(
+        _read_url,
+        echo=settings.DATABASE_ECHO,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=0,
+    )
+
+    @event.listens_for(read_engine.sync_engine, "connect")
+    def _set_read_only_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for pragma in sqlite_pragmas(read_only=True):
+            cursor.execute(pragma)
+        cursor.close()
+else:
+    read_engine = engine
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
 
+ReadOnlySessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+    info={"read_only": True},
+)
+
 Base = declarative_base()
 
 async def get_db():
     """Dependency for getting DB sessions"""
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def get_read_db():
+    """Dependency for getting DB sessions for endpoints that only read"""
+    async with ReadOnlySessionLocal() as session:
+        yield session
+
+async def optimize_database() -> None:
+    """
+    Refresh the query planner's statistics.
+
+    A database that was never analyzed gets a full ANALYZE; after that
+    PRAGMA optimize only re-analyzes tables that changed enough to matter.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    async with engine.connect() as conn:
+        analyzed = await conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        )
+        if analyzed.first() is None:
+            await conn.exec_driver_sql("ANALYZE")
+        else:
+            await conn.exec_driver_sql("PRAGMA optimize")
+        await conn.commit()
+
+async def run_optimize(interval_hours: float) -> None:
+    """Keep the planner statistics fresh on a schedule"""
+    while True:
+        await asyncio.sleep(interval_hours * 3600)
+        try:
+            await optimize_database()
+            logger.info("Database statistics refreshed")
+        except Exception as e:
+            logger.error(f"Error optimizing the database: {str(e)}")
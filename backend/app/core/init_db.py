@@ -2,12 +2,20 @@ import asyncio
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import text
-from datetime import datetime, timedelta
+from sqlalchemy import select, text, update
+from datetime import timedelta
 
 from app.core.database import Base, engine, AsyncSessionLocal
+from app.core.clock import get_clock
+from app.core.config import settings
 from app.models.models import User, WordList, Word
 from app.services.spelling_rule_service import initialize_common_rules
+from app.services.explanation_service import initialize_explanation_catalogue
+from app.services.grapheme_index_service import grapheme_index_service
+from app.services.mistake_pattern_repository import (
+    DELETE_DUPLICATE_PATTERNS_SQL, MERGE_DUPLICATE_PATTERNS_SQL, UNIQUE_PATTERN_INDEX
+)
+from app.services.phonetic_key import phonetic_key
 
 logger = logging.getLogger(__name__)
 
@@ -63,16 +71,153 @@ async def apply_srs_migration():
             logger.error(f"Error applying SRS migration: {str(e)}")
             raise
 
+# Keep only each pattern's most recently seen examples
+MISTAKE_EXAMPLE_TRIM_SQL = """
+    DELETE FROM mistake_pattern_examples
+    WHERE id NOT IN (
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY pattern_id ORDER BY last_seen DESC, id DESC
+            ) AS position
+            FROM mistake_pattern_examples
+        )
+        WHERE position <= :max_examples
+    )
+"""
+
+# Move examples from the JSON list on mistake_patterns into their own table;
+# how often each attempt was made wasn't recorded, so each counts once
+MISTAKE_EXAMPLE_COPY_SQL = """
+    INSERT OR IGNORE INTO mistake_pattern_examples (pattern_id, spelling, count, last_seen)
+    SELECT p.id, e.value, 1, COALESCE(p.updated_at, p.created_at, CURRENT_TIMESTAMP)
+    FROM mistake_patterns p, json_each(p.examples) e
+    WHERE p.examples IS NOT NULL
+    ORDER BY p.id, e.key
+"""
+
+async def apply_mistake_example_migration():
+    """Move mistake pattern examples of existing databases into mistake_pattern_examples"""
+    async with AsyncSessionLocal() as session:
+        try:
+            result = await session.execute(text("PRAGMA table_info(mistake_patterns)"))
+            if "examples" not in {column[1] for column in result.all()}:
+                return
+            await session.execute(text(MISTAKE_EXAMPLE_COPY_SQL))
+            await session.execute(
+                text(MISTAKE_EXAMPLE_TRIM_SQL), {"max_examples": settings.MISTAKE_PATTERN_MAX_EXAMPLES}
+            )
+            await session.execute(text("ALTER TABLE mistake_patterns DROP COLUMN examples"))
+            await session.commit()
+            logger.info("Moved mistake pattern examples to mistake_pattern_examples")
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Error moving mistake pattern examples: {str(e)}")
+            raise
+
+# Merge duplicate patterns into the oldest row, then enforce uniqueness for the upsert
+MISTAKE_PATTERN_UNIQUE_INDEX_SQL = [
+    MERGE_DUPLICATE_PATTERNS_SQL,
+    """
+    UPDATE OR IGNORE mistake_pattern_examples
+    SET pattern_id = (
+        SELECT MIN(k.id) FROM mistake_patterns d, mistake_patterns k
+        WHERE d.id = mistake_pattern_examples.pattern_id
+          AND k.word_id IS d.word_id
+          AND k.pattern_type = d.pattern_type
+          AND k.description = d.description
+    )
+    WHERE pattern_id IN (
+        SELECT id FROM mistake_patterns
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM mistake_patterns
+            GROUP BY word_id, pattern_type, description
+        )
+    )
+    """,
+    """
+    DELETE FROM mistake_pattern_examples
+    WHERE pattern_id NOT IN (
+        SELECT MIN(id) FROM mistake_patterns
+        GROUP BY word_id, pattern_type, description
+    )
+    """,
+    DELETE_DUPLICATE_PATTERNS_SQL,
+    f"""
+    CREATE UNIQUE INDEX IF NOT EXISTS {UNIQUE_PATTERN_INDEX}
+    ON mistake_patterns (word_id, pattern_type, description)
+    """,
+]
+
+async def apply_mistake_pattern_unique_index():
+    """Add the unique index the mistake pattern upsert relies on to existing databases"""
+    async with AsyncSessionLocal() as session:
+        try:
+            result = await session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"),
+                {"name": UNIQUE_PATTERN_INDEX}
+            )
+            if result.first() is not None:
+                return
+            for statement in MISTAKE_PATTERN_UNIQUE_INDEX_SQL:
+                await session.execute(text(statement))
+            # Merged patterns may hold more examples than are kept
+            await session.execute(
+                text(MISTAKE_EXAMPLE_TRIM_SQL), {"max_examples": settings.MISTAKE_PATTERN_MAX_EXAMPLES}
+            )
+            await session.commit()
+            logger.info("Merged duplicate mistake patterns and made them unique")
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Error adding mistake pattern unique index: {str(e)}")
+            raise
+
+async def apply_phonetic_key_migration(batch_size: int = 500):
+    """Add the phonetic key column to existing databases and compute the missing keys"""
+    async with AsyncSessionLocal() as session:
+        try:
+            result = await session.execute(text("PRAGMA table_info(words)"))
+            if "phonetic_key" not in {column[1] for column in result.all()}:
+                await session.execute(text("ALTER TABLE words ADD COLUMN phonetic_key VARCHAR"))
+                logger.info("Added phonetic_key column")
+
+            while True:
+                result = await session.execute(
+                    select(Word.id, Word.word).where(Word.phonetic_key.is_(None)).limit(batch_size)
+                )
+                rows = result.all()
+                if not rows:
+                    break
+                await session.execute(
+                    update(Word), [{"id": row.id, "phonetic_key": phonetic_key(row.word)} for row in rows]
+                )
+            await session.commit()
+        except SQLAlchemyError as e:
+            await session.rollback()
+            logger.error(f"Error adding phonetic keys: {str(e)}")
+            raise
+
 async def init_db():
     """Initialize the database by creating all tables and applying migrations"""
     try:
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+        
+        await apply_mistake_example_migration()
+        await apply_phonetic_key_migration()
+        await apply_mistake_pattern_unique_index()
             
         # Initialize common spelling rules
         async with AsyncSessionLocal() as session:
             await initialize_common_rules(session)
             
+        # Seed the mistake explanation catalogue, linked to the rules above
+        async with AsyncSessionLocal() as session:
+            await initialize_explanation_catalogue(session)
+            
+        # Index words imported before the grapheme index existed
+        async with AsyncSessionLocal() as session:
+            await grapheme_index_service.backfill(session)
+            
         logger.info("Database initialized successfully")
     except SQLAlchemyError as e:
         logger.error(f"Error initializing database: {e}")
@@ -117,12 +262,13 @@ async def create_test_data(session: AsyncSession):
             }
         ]
         
-        current_time = datetime.utcnow()
+        current_time = get_clock().now()
         for word_data in sample_words:
             word = Word(
                 word=word_data["word"],
                 meaning=word_data["meaning"],
                 example=word_data["example"],
+                phonetic_key=phonetic_key(word_data["word"]),
                 word_list_id=word_list.id,
                 familiar=False,
                 practice_count=0,
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Text, JSON, CheckConstraint, Table
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Float, Text, JSON, CheckConstraint, Table, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -39,15 +39,46 @@ class MistakePattern(Base):
     pattern_type = Column(String, nullable=False)  # e.g., 'substitution', 'insertion', 'deletion', 'transposition'
     description = Column(String, nullable=False)  # e.g., 'ie/ei confusion', 'double letter omission'
     frequency = Column(Integer, default=1)
-    examples = Column(JSON, nullable=False, default=list)  # List of incorrect attempts
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
     word = relationship("Word", back_populates="mistake_patterns")
+    example_rows = relationship(
+        "MistakeExample",
+        back_populates="pattern",
+        cascade="all, delete-orphan",
+        order_by="(MistakeExample.last_seen, MistakeExample.id)",
+        lazy="selectin"
+    )
 
     __table_args__ = (
         CheckConstraint('frequency >= 0', name='check_frequency_non_negative'),
+        Index('uq_mistake_patterns_word_pattern', 'word_id', 'pattern_type', 'description', unique=True),
+    )
+
+    @property
+    def examples(self) -> list:
+        """The most recent incorrect attempts, oldest first"""
+        return [example.spelling for example in self.example_rows]
+
+
+class MistakeExample(Base):
+    """One of the most recent distinct attempts recorded for a mistake pattern"""
+    __tablename__ = "mistake_pattern_examples"
+    
+    id = Column(Integer, primary_key=True)
+    pattern_id = Column(Integer, ForeignKey("mistake_patterns.id", ondelete="CASCADE"), nullable=False)
+    spelling = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=1)  # Times this exact attempt was made
+    last_seen = Column(DateTime(timezone=True), nullable=False)
+    
+    # Relationships
+    pattern = relationship("MistakePattern", back_populates="example_rows")
+    
+    __table_args__ = (
+        Index('uq_mistake_pattern_examples_pattern_spelling', 'pattern_id', 'spelling', unique=True),
+        Index('ix_mistake_pattern_examples_pattern_seen', 'pattern_id', 'last_seen'),
     )
 
 
@@ -59,6 +90,7 @@ class Word(Base):
     meaning = Column(Text, nullable=True)
     example = Column(Text, nullable=True)
     phonetic = Column(String, nullable=True)
+    phonetic_key = Column(String, nullable=True)  # Sound-alike key of the spelling, see phonetic_key.py
     word_list_id = Column(Integer, ForeignKey("word_lists.id"))
     
     # Practice statistics
@@ -105,4 +137,173 @@ rule_words = Table(
     Base.metadata,
     Column("rule_id", Integer, ForeignKey("spelling_rules.id"), primary_key=True),
     Column("word_id", Integer, ForeignKey("words.id"), primary_key=True)
-)
\ No newline at end of file
+)
+
+
+class UserStats(Base):
+    """Incrementally maintained practice counters for all of a user's words"""
+    __tablename__ = "user_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_words = Column(Integer, default=0, nullable=False)
+    practiced_words = Column(Integer, default=0, nullable=False)
+    familiar_words = Column(Integer, default=0, nullable=False)
+    total_correct = Column(Integer, default=0, nullable=False)
+    total_attempts = Column(Integer, default=0, nullable=False)
+    
+    # Number of words at each SRS level
+    level_0 = Column(Integer, default=0, nullable=False)
+    level_1 = Column(Integer, default=0, nullable=False)
+    level_2 = Column(Integer, default=0, nullable=False)
+    level_3 = Column(Integer, default=0, nullable=False)
+    level_4 = Column(Integer, default=0, nullable=False)
+    level_5 = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class WordListStats(Base):
+    """Incrementally maintained practice counters for a single word list"""
+    __tablename__ = "word_list_stats"
+    
+    word_list_id = Column(Integer, ForeignKey("word_lists.id", ondelete="CASCADE"), primary_key=True)
+    total_words = Column(Integer, default=0, nullable=False)
+    practiced_words = Column(Integer, default=0, nullable=False)
+    familiar_words = Column(Integer, default=0, nullable=False)
+    total_correct = Column(Integer, default=0, nullable=False)
+    total_attempts = Column(Integer, default=0, nullable=False)
+    
+    # Number of words at each SRS level
+    level_0 = Column(Integer, default=0, nullable=False)
+    level_1 = Column(Integer, default=0, nullable=False)
+    level_2 = Column(Integer, default=0, nullable=False)
+    level_3 = Column(Integer, default=0, nullable=False)
+    level_4 = Column(Integer, default=0, nullable=False)
+    level_5 = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ReviewEvent(Base):
+    """Append-only log of individual practice and review attempts"""
+    __tablename__ = "review_events"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    word_id = Column(Integer, nullable=False)  # No foreign key, so events outlive a deleted word
+    reviewed_at = Column(DateTime(timezone=True), nullable=False)
+    correct = Column(Boolean, nullable=False)
+    user_spelling = Column(String, nullable=False)
+    latency_ms = Column(Integer, nullable=True)  # Time the user took to answer, if reported
+    old_level = Column(Integer, nullable=False)
+    new_level = Column(Integer, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_review_events_user_reviewed_at", "user_id", "reviewed_at"),
+    )
+
+
+class SRSParameterSet(Base):
+    """Versioned SRS review intervals fitted from the review event log"""
+    __tablename__ = "srs_parameter_sets"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    version = Column(Integer, nullable=False, unique=True)
+    intervals = Column(JSON, nullable=False)  # Review interval in hours for each SRS level
+    target_retention = Column(Float, nullable=False)
+    sample_count = Column(Integer, nullable=False, default=0)
+    is_active = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    user_parameters = relationship("SRSUserParameter", back_populates="parameter_set", cascade="all, delete-orphan")
+
+
+class SRSUserParameter(Base):
+    """Per-user interval scale belonging to a fitted parameter set"""
+    __tablename__ = "srs_user_parameters"
+    
+    parameter_set_id = Column(Integer, ForeignKey("srs_parameter_sets.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    interval_scale = Column(Float, nullable=False, default=1.0)  # Multiplier on the set's intervals
+    
+    # Relationships
+    parameter_set = relationship("SRSParameterSet", back_populates="user_parameters")
+
+
+class JobLease(Base):
+    """Time-limited claim on a periodic background job, so one server process runs it"""
+    __tablename__ = "job_leases"
+    
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=False)  # Process that holds the lease
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class MistakeAnalysis(Base):
+    """Latest LLM analysis of a user's mistake patterns, computed in the background"""
+    __tablename__ = "mistake_analyses"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    scope = Column(String, nullable=False)  # 'user', 'list:<word_list_id>' or 'word:<word_id>'
+    status = Column(String, nullable=False, default="pending")  # 'pending', 'ready' or 'failed'
+    version = Column(Integer, nullable=False, default=1)  # Bumped whenever the patterns change
+    analysis = Column(JSON, nullable=True)  # Last completed analysis, kept while a new one is pending
+    analyzed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index("uq_mistake_analyses_user_scope", "user_id", "scope", unique=True),
+    )
+
+
+class PatternExplanation(Base):
+    """Reusable explanation for a kind of mistake, keyed by its description template"""
+    __tablename__ = "pattern_explanations"
+    
+    id = Column(Integer, primary_key=True)
+    pattern_type = Column(String, nullable=False)
+    template = Column(String, nullable=False)  # Description with the concrete letters stripped
+    analysis = Column(Text, nullable=False)
+    suggestions = Column(JSON, nullable=False, default=list)
+    rule_id = Column(Integer, ForeignKey("spelling_rules.id", ondelete="SET NULL"), nullable=True)
+    rule_text = Column(Text, nullable=True)  # Rule or mnemonic suggested by the LLM, if no rule is linked
+    source = Column(String, nullable=False, default="catalogue")  # 'catalogue' or 'llm'
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    rule = relationship("SpellingRule")
+    
+    __table_args__ = (
+        Index("uq_pattern_explanations_type_template", "pattern_type", "template", unique=True),
+    )
+
+
+class LetterConfusion(Base):
+    """One non-zero cell of a user's grapheme confusion matrix"""
+    __tablename__ = "letter_confusions"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    kind = Column(String, primary_key=True)  # 'substitute', 'insert', 'delete' or 'transpose'
+    source = Column(String, primary_key=True)  # Letters of the correct spelling ('' for inserts)
+    target = Column(String, primary_key=True)  # Letters the learner wrote instead ('' for deletes)
+    count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        # Serves the top confusions of a user straight from the index
+        Index("ix_letter_confusions_user_count", "user_id", "count"),
+    )
+
+
+class WordGrapheme(Base):
+    """One entry of the inverted index from letter sequences and spelling patterns to words"""
+    __tablename__ = "word_graphemes"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String, primary_key=True)  # e.g. 'ng:ie' for letters, 'pattern:ie/ei' for a phonetic pattern
+    word_id = Column(Integer, ForeignKey("words.id", ondelete="CASCADE"), primary_key=True)
+    word_list_id = Column(Integer, ForeignKey("word_lists.id", ondelete="CASCADE"), nullable=False)
+    
+    __table_args__ = (
+        Index("ix_word_graphemes_word", "word_id"),
+        Index("ix_word_graphemes_list", "word_list_id"),
+    )
@@ -76,6 +76,25 @@ class MistakePatternResponse(BaseModel):
     count: int
     word: Optional[WordForPattern] = None
     llm_analysis: Optional[LLMAnalysis] = None
+    llm_analysis_status: Optional[str] = None  # 'pending' while a fresh analysis is computed
+
+    class Config:
+        from_attributes = True
+
+class MistakeAnalysisResponse(BaseModel):
+    scope: str
+    status: str  # 'pending', 'ready' or 'failed'
+    analysis: Optional[LLMAnalysis] = None  # Latest completed analysis, possibly stale while pending
+    analyzed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class LetterConfusionResponse(BaseModel):
+    kind: str  # 'substitute', 'insert', 'delete' or 'transpose'
+    source: str  # Letters of the correct spelling ('' for inserts)
+    target: str  # Letters written instead ('' for deletes)
+    count: int
 
     class Config:
         from_attributes = True
@@ -104,6 +123,15 @@ class PracticeRequest(BaseModel):
     word_list_id: int
     speed: str = 'normal'  # 'normal' or 'slow'
 
+class PatternPracticeRequest(BaseModel):
+    pattern: str  # A phonetic pattern such as 'ie/ei', or letters such as 'gh'
+    word_list_id: Optional[int] = None  # All of the user's lists if not set
+    speed: str = 'normal'  # 'normal' or 'slow'
+
+class PatternWordCount(BaseModel):
+    pattern: str
+    words: int
+
 class PracticeResponse(BaseModel):
     word_id: int
     word: str
@@ -113,6 +141,7 @@ class PracticeResponse(BaseModel):
 class PracticeSubmitRequest(BaseModel):
     word_id: int
     user_spelling: str
+    latency_ms: Optional[int] = Field(None, ge=0)  # Time taken to answer
 
 class PracticeResult(BaseModel):
     word_id: int
@@ -122,6 +151,7 @@ class PracticeResult(BaseModel):
     meaning: Optional[str] = None
     example: Optional[str] = None
     phonetic: Optional[str] = None
+    sounds_alike: bool = False  # Wrong, but sounds like the word
     mistake_patterns: List[MistakePatternResponse] = []
 
     class Config:
@@ -161,6 +191,44 @@ class ReviewWordResponse(BaseModel):
 
 class ReviewSubmitRequest(BaseModel):
     user_spelling: str
+    latency_ms: Optional[int] = Field(None, ge=0)  # Time taken to answer
+
+class BatchReviewItem(BaseModel):
+    word_id: int
+    user_spelling: str
+    answered_at: Optional[datetime] = None  # When the answer was given (offline clients)
+    latency_ms: Optional[int] = Field(None, ge=0)
+
+class BatchReviewRequest(BaseModel):
+    results: List[BatchReviewItem] = Field(..., min_length=1, max_length=500)
+
+class BatchReviewItemResult(BaseModel):
+    word_id: int
+    status: str  # 'ok' or 'not_found'
+    correct: Optional[bool] = None
+    correct_spelling: Optional[str] = None
+    sounds_alike: Optional[bool] = None
+    srs_level: Optional[int] = None
+    next_review: Optional[datetime] = None
+    mistake_pattern: Optional[MistakePatternResponse] = None
+
+class BatchReviewResponse(BaseModel):
+    processed: int
+    failed: int
+    results: List[BatchReviewItemResult]
+
+class ReviewEventResponse(BaseModel):
+    id: int
+    word_id: int
+    reviewed_at: datetime
+    correct: bool
+    user_spelling: str
+    latency_ms: Optional[int] = None
+    old_level: int
+    new_level: int
+
+    class Config:
+        from_attributes = True
 
 # Spelling rule schemas
 class SpellingRuleBase(BaseModel):
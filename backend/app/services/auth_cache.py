@@ -0,0 +1,137 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.models.models import User
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    """What get_current_user needs from a decoded access token"""
+    email: str
+    user_id: Optional[int]  # Missing from tokens issued before the uid claim
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Snapshot of an active user, safe to share between requests"""
+    id: int
+    email: str
+    is_active: bool
+
+    def to_user(self) -> User:
+        """A detached User instance, as if loaded by a session that has since closed"""
+        user = User(id=self.id, email=self.email, is_active=self.is_active)
+        make_transient_to_detached(user)
+        return user
+
+
+class TTLCache:
+    """A bounded mapping whose entries expire; the least recently used go first when full"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any, expires_at: Optional[float] = None) -> None:
+        """Store a value until the TTL passes, or until expires_at if that's sooner"""
+        if self.max_entries <= 0:
+            return
+        deadline = time.time() + self.ttl_seconds
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        self._entries[key] = (value, deadline)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def discard_where(self, predicate: Callable[[Any], bool]) -> None:
+        """Drop every entry whose value matches"""
+        for key in [key for key, (value, _) in self._entries.items() if predicate(value)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class AuthCache:
+    """
+    Cache of decoded access tokens and active users for get_current_user.
+
+    Tokens map to their claims until the TTL passes or the token expires,
+    whichever is first, and users are kept by id, so a request with a
+    recently seen token needs neither a JWT decode nor a query. Only active
+    users are cached. Changes to a user's email, password or active flag
+    through the ORM drop their entries (see the listeners below); code that
+    changes users with bulk UPDATE statements must call invalidate_user.
+    Each process has its own cache, so the TTL bounds how long another
+    worker can serve a stale user.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.tokens = TTLCache(max_entries, ttl_seconds)
+        self.users = TTLCache(max_entries, ttl_seconds)
+
+    def get_claims(self, token: str) -> Optional[TokenClaims]:
+        return self.tokens.get(token)
+
+    def put_claims(self, token: str, claims: TokenClaims, expires_at: Optional[float] = None) -> None:
+        self.tokens.put(token, claims, expires_at)
+
+    def get_user(self, user_id: int) -> Optional[CachedUser]:
+        return self.users.get(user_id)
+
+    def put_user(self, user: User) -> None:
+        if user.is_active:
+            self.users.put(user.id, CachedUser(id=user.id, email=user.email, is_active=user.is_active))
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Forget a user and their tokens, so the next request reads them again"""
+        self.users.pop(user_id)
+        self.tokens.discard_where(lambda claims: claims.user_id == user_id)
+
+    def clear(self) -> None:
+        self.tokens.clear()
+        self.users.clear()
+
+
+# Create singleton instance
+auth_cache = AuthCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+# Attributes whose change must not be hidden by a cached user
+_AUTH_ATTRIBUTES = ("email", "hashed_password", "is_active")
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_updated_user(mapper, connection, target: User) -> None:
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _AUTH_ATTRIBUTES):
+        auth_cache.invalidate_user(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target: User) -> None:
+    auth_cache.invalidate_user(target.id)
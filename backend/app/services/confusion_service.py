@@ -0,0 +1,74 @@
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.models import LetterConfusion
+from app.services.spelling_alignment import align, group_edits
+
+Confusion = Tuple[str, str, str]  # (kind, source, target)
+
+
+class ConfusionService:
+    """
+    Service for per-user grapheme confusion matrices.
+
+    Each wrong answer is aligned with the correct spelling and every group
+    of adjacent edits counts as one confusion, so 'ph' written as 'f' is a
+    single ph → f substitution rather than a deletion and a substitution.
+    Only non-zero cells are stored, one row each, and counts are bumped in
+    the caller's transaction.
+    """
+
+    def confusions(self, correct: str, attempt: str) -> Counter:
+        """Get the confusions one wrong attempt contains"""
+        found = Counter()
+        for group in group_edits(align(correct.lower().strip(), attempt.lower().strip())):
+            kinds = {op.kind for op in group}
+            if len(kinds) == 1 and 'transpose' not in kinds:
+                # Runs of one kind of edit are one grapheme
+                kind = group[0].kind
+            elif kinds == {'transpose'}:
+                found.update((op.kind, op.source, op.target) for op in group)
+                continue
+            else:
+                kind = 'substitute'
+            found[(kind, ''.join(op.source for op in group), ''.join(op.target for op in group))] += 1
+        return found
+
+    async def record(self, db: AsyncSession, user_id: int, correct: str, attempt: str) -> None:
+        """Count a wrong attempt's confusions in the user's matrix"""
+        found = self.confusions(correct, attempt)
+        if not found:
+            return
+        stmt = sqlite_insert(LetterConfusion).values([
+            {"user_id": user_id, "kind": kind, "source": source, "target": target, "count": count}
+            for (kind, source, target), count in found.items()
+        ])
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["user_id", "kind", "source", "target"],
+                set_={"count": LetterConfusion.count + stmt.excluded.count, "updated_at": func.now()}
+            )
+        )
+
+    async def top_confusions(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        limit: int = 10,
+        kind: Optional[str] = None
+    ) -> List[LetterConfusion]:
+        """Get the user's most frequent confusions, most frequent first"""
+        query = select(LetterConfusion).where(LetterConfusion.user_id == user_id)
+        if kind:
+            query = query.where(LetterConfusion.kind == kind)
+        result = await db.execute(query.order_by(LetterConfusion.count.desc()).limit(limit))
+        return list(result.scalars().all())
+
+
+# Create singleton instance
+confusion_service = ConfusionService()
@@ -0,0 +1,282 @@
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
+
+from app.core.clock import get_clock
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, ReadOnlySessionLocal
+from app.models.models import PatternExplanation, SpellingRule
+from app.services.llm_service import FALLBACK_ANALYSIS, llm_service, parse_analysis
+from app.services.prompt_compaction import compact_patterns
+
+logger = logging.getLogger(__name__)
+
+# Explanations for the closed set of patterns MistakePatternService detects.
+# Each entry is (pattern_type, description template, analysis, suggestions, rule title).
+EXPLANATION_CATALOGUE = [
+    ("phonetic", "ie/ei confusion",
+     "The 'ie' and 'ei' spellings sound alike, so the order of the two vowels is easy to mix up.",
+     ["Say 'i before e except after c' while writing the word.", "Group practice words by ie and ei."],
+     "I before E except after C"),
+    ("phonetic", "silent_e confusion",
+     "A final 'e' is silent but changes the vowel before it, so it is easy to drop or add by mistake.",
+     ["Read the word aloud: a long vowel before the last consonant usually needs the silent e.",
+      "Practice word pairs like hop/hope and cut/cute."],
+     "Silent E Rule"),
+    ("phonetic", "double_consonants confusion",
+     "Double consonants sound the same as single ones, so it is hard to hear whether a letter is doubled.",
+     ["Split the word into syllables and look where the double letter sits.",
+      "Write the word with the double letter highlighted a few times."],
+     "Double Consonant Rule"),
+    ("phonetic", "ph/f confusion",
+     "'ph' and 'f' make the same sound; 'ph' mostly appears in words of Greek origin.",
+     ["Learn the ph words you use often as a group (phone, photo, graph).",
+      "Check whether the word is scientific or Greek in origin."],
+     None),
+    ("phonetic", "ough confusion",
+     "'ough' can be pronounced in many ways, so the sound gives little hint of the spelling.",
+     ["Learn ough words in groups that rhyme (though/dough, through, tough/rough).",
+      "Spell the word letter by letter instead of by sound."],
+     None),
+    ("phonetic", "tion/sion confusion",
+     "The endings -tion and -sion both sound like 'shun', so the ending has to be remembered.",
+     ["Use -sion after l, n and r when the root ends in d or s (extend → extension).",
+      "Practice the ending separately from the rest of the word."],
+     "-tion vs -sion"),
+    ("phonetic", "ck/k/c confusion",
+     "The /k/ sound can be spelled c, k or ck depending on its position and the vowel before it.",
+     ["Use ck right after a short vowel at the end of a one-syllable word.",
+      "Use c before a, o and u, and k before e and i."],
+     "CK Rule"),
+    ("phonetic", "gh confusion",
+     "'gh' is often silent or sounds like 'f', so it is easy to leave out or replace.",
+     ["Look for the silent gh in words like night and thought.", "Practice gh words in rhyming groups."],
+     None),
+    ("phonetic", "sound-alike spelling",
+     "The word was spelled the way it sounds, but the letters chosen for some of its sounds are not the usual ones.",
+     ["Say the word slowly and write down which letters make each sound in the correct spelling.",
+      "Compare the word with others that share its tricky sound."],
+     None),
+    ("vowel", "schwa sound confusion",
+     "Unstressed vowels all sound like a short 'uh', so the sound doesn't tell which vowel to write.",
+     ["Say the word with exaggerated stress on every syllable.",
+      "Link the word to a related word where the vowel is stressed (definite → define)."],
+     None),
+    ("vowel", "long_a sound confusion",
+     "The long 'a' sound has several spellings (a, ai, ay, a_e, ei, ey).",
+     ["Use ay at the end of a word and ai in the middle.", "Group practice words by how they spell the sound."],
+     None),
+    ("vowel", "long_e sound confusion",
+     "The long 'e' sound has several spellings (e, ee, ea, ie, y, ey).",
+     ["Group practice words by how they spell the sound.", "Learn common ee and ea words as pairs."],
+     None),
+    ("vowel", "long_i sound confusion",
+     "The long 'i' sound has several spellings (i, i_e, y, ie, igh).",
+     ["Remember igh before t (night, light).", "Group practice words by how they spell the sound."],
+     None),
+    ("vowel", "long_o sound confusion",
+     "The long 'o' sound has several spellings (o, o_e, oa, ow, oe).",
+     ["Use ow at the end of a word and oa in the middle.", "Group practice words by how they spell the sound."],
+     None),
+    ("vowel", "long_u sound confusion",
+     "The long 'u' sound has several spellings (u, u_e, ue, ew).",
+     ["Use ew and ue at the end of a word.", "Group practice words by how they spell the sound."],
+     None),
+    ("vowel", "vowel sequence error",
+     "The vowels in the word were written in a different order or combination than the correct spelling.",
+     ["Write only the vowels of the word, then fill in the consonants.",
+      "Say each syllable slowly while spelling it."],
+     None),
+    ("doubling", "double letter omitted",
+     "A doubled letter was written only once; the double letter is not audible when speaking.",
+     ["Split the word into syllables; the double letter usually sits where two syllables meet.",
+      "Write the word with the double letter highlighted a few times."],
+     "Double Consonant Rule"),
+    ("doubling", "unnecessary letter doubling",
+     "A letter was doubled that should appear only once.",
+     ["Check whether the vowel before the letter is short and stressed; if not, don't double it.",
+      "Compare the word with similar words that keep a single letter."],
+     "Double Consonant Rule"),
+    ("substitution", "letter substitution",
+     "One letter was replaced by another, often one that sounds similar in this position.",
+     ["Look at the letter that differs and say the word slowly.", "Practice the word in short, spaced sessions."],
+     None),
+    ("substitution", "incorrect letter sequence",
+     "A group of letters was replaced by a different group that sounds similar.",
+     ["Break the word into chunks and learn the tricky chunk on its own.",
+      "Find other words that share the same chunk."],
+     None),
+    ("sequence", "letter sequence error",
+     "Several neighbouring letters were replaced, which usually means the word was spelled by sound.",
+     ["Break the word into syllables and spell each one separately.",
+      "Copy the word carefully, then write it from memory."],
+     None),
+    ("omission", "letter omitted",
+     "A letter was left out, often one that is hard to hear when the word is said quickly.",
+     ["Say the word slowly, one syllable at a time, while writing it.",
+      "Underline the letter you missed and write the word again."],
+     None),
+    ("insertion", "extra letter",
+     "An extra letter was added, often because the word was spelled the way it sounds.",
+     ["Compare your spelling with the word letter by letter.", "Count the letters in the word before writing it."],
+     None),
+    ("keyboard", "keyboard slip",
+     "A letter was replaced by the one on a neighbouring key, which points to a typing slip rather than a spelling gap.",
+     ["Type a little more slowly and check the word before submitting.",
+      "Look at the word once more after typing it."],
+     None),
+    ("transposition", "letter swap",
+     "Two neighbouring letters were written in the wrong order, often from writing quickly.",
+     ["Slow down on the swapped letters and say them in order.", "Trace the word's letters one by one."],
+     None),
+    ("other", "general spelling error",
+     "The attempt differs from the word in several places without a single clear pattern.",
+     ["Break the word into syllables and practice each one.", "Use the word in a sentence to remember it."],
+     None),
+]
+
+
+def description_template(description: str) -> str:
+    """
+    Strip the concrete letters from a pattern description
+
+    e.g. 'letter substitution: a → e' becomes 'letter substitution', and
+    'double letter ss omitted' becomes 'double letter omitted'.
+    """
+    head = description.split(":", 1)[0].strip()
+    return re.sub(r"^double letter \S+ omitted$", "double letter omitted", head)
+
+
+async def initialize_explanation_catalogue(db: AsyncSession) -> None:
+    """Add the catalogue explanations that don't exist yet, linked to their spelling rules"""
+    result = await db.execute(select(SpellingRule.title, SpellingRule.id))
+    rule_ids = dict(result.all())
+
+    await db.execute(
+        sqlite_insert(PatternExplanation)
+        .values([
+            {
+                "pattern_type": pattern_type,
+                "template": template,
+                "analysis": analysis,
+                "suggestions": suggestions,
+                "rule_id": rule_ids.get(rule_title),
+                "source": "catalogue",
+            }
+            for pattern_type, template, analysis, suggestions, rule_title in EXPLANATION_CATALOGUE
+        ])
+        .on_conflict_do_nothing(index_elements=["pattern_type", "template"])
+    )
+    await db.commit()
+
+
+class ExplanationService:
+    """
+    Service for explaining mistake patterns.
+
+    Explanations come from the catalogue of known pattern kinds. The LLM is
+    only asked about patterns the catalogue doesn't cover yet, and its answer
+    is written back so the next occurrence is served from the catalogue.
+    """
+
+    def __init__(self):
+        self._catalogue: Optional[Dict[Tuple[str, str], Dict]] = None
+
+    async def explain(self, patterns: List[Dict]) -> Optional[Dict]:
+        """
+        Explain a set of mistake patterns
+
+        Opens its own short sessions, so no connection is held while the LLM
+        is asked about a new pattern.
+
+        Args:
+            patterns: Dicts with pattern_type, description, frequency, examples
+                and optionally last_seen
+
+        Returns:
+            Dict: analysis, suggestions and rule, or None if no pattern could be explained
+        """
+        compacted = compact_patterns(
+            patterns,
+            top_k=settings.LLM_PROMPT_TOP_K,
+            max_examples=settings.LLM_PROMPT_MAX_EXAMPLES,
+            token_budget=settings.LLM_PROMPT_TOKEN_BUDGET,
+            half_life_days=settings.LLM_PROMPT_RECENCY_HALF_LIFE_DAYS,
+            now=get_clock().now()
+        )
+        catalogue = await self._get_catalogue()
+
+        explanations = []
+        for pattern in compacted.patterns:
+            key = (pattern["pattern_type"], description_template(pattern["description"]))
+            explanation = catalogue.get(key)
+            if explanation is None:
+                explanation = await self._learn(key, pattern)
+            if explanation is not None:
+                explanations.append(explanation)
+
+        if not explanations:
+            return None
+
+        # Patterns are ranked, so the most important explanations come first
+        suggestions = []
+        for explanation in explanations:
+            suggestions.extend(s for s in explanation["suggestions"] if s not in suggestions)
+        return {
+            "analysis": " ".join(explanation["analysis"] for explanation in explanations[:2]),
+            "suggestions": suggestions[:3],
+            "rule": next((e["rule"] for e in explanations if e["rule"]), None),
+        }
+
+    async def _get_catalogue(self) -> Dict[Tuple[str, str], Dict]:
+        if self._catalogue is None:
+            async with ReadOnlySessionLocal() as db:
+                result = await db.execute(
+                    select(PatternExplanation).options(joinedload(PatternExplanation.rule))
+                )
+                entries = result.scalars().all()
+            self._catalogue = {
+                (entry.pattern_type, entry.template): {
+                    "analysis": entry.analysis,
+                    "suggestions": entry.suggestions,
+                    "rule": f"{entry.rule.title}: {entry.rule.description}" if entry.rule else entry.rule_text,
+                }
+                for entry in entries
+            }
+        return self._catalogue
+
+    async def _learn(self, key: Tuple[str, str], pattern: Dict) -> Optional[Dict]:
+        """Ask the LLM about a pattern the catalogue doesn't cover and store the answer"""
+        reply = await llm_service.analyze_mistake_patterns([pattern])
+        if reply is FALLBACK_ANALYSIS:
+            return None
+        explanation = parse_analysis(reply)
+
+        pattern_type, template = key
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                sqlite_insert(PatternExplanation)
+                .values(
+                    pattern_type=pattern_type,
+                    template=template,
+                    analysis=explanation["analysis"],
+                    suggestions=explanation["suggestions"],
+                    rule_text=explanation["rule"],
+                    source="llm"
+                )
+                .on_conflict_do_nothing(index_elements=["pattern_type", "template"])
+            )
+            await db.commit()
+        logger.info(f"Added LLM explanation for {pattern_type} pattern '{template}' to the catalogue")
+
+        self._catalogue[key] = explanation
+        return explanation
+
+
+# Create singleton instance
+explanation_service = ExplanationService()
@@ -0,0 +1,158 @@
+import logging
+import random
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.models.models import Word, WordGrapheme, WordList
+from app.services.mistake_pattern_service import mistake_pattern_service
+
+logger = logging.getLogger(__name__)
+
+NGRAM_PREFIX = "ng:"
+PATTERN_PREFIX = "pattern:"
+PATTERN_KEYS_END = "pattern;"  # Sorts right after every pattern key
+
+
+class GraphemeIndexService:
+    """
+    Service for the inverted index from graphemes to words.
+
+    Every word is indexed by the letter sequences it contains and by the
+    phonetic pattern categories of MistakePatternService it matches, keyed
+    per owner. Words are added when a list is imported and removed with
+    their list, in the caller's transaction, so finding the words with
+    "ie", a double consonant or "-tion" is one index range read.
+    """
+
+    def __init__(self, min_n: int, max_n: int):
+        self.min_n = min_n
+        self.max_n = max_n
+        self.random = random.Random()  # Seed it for reproducible simulations
+
+    def keys(self, word: str) -> Set[str]:
+        """Get the index keys of a word"""
+        text = word.lower().strip()
+        keys = {
+            NGRAM_PREFIX + text[start:start + n]
+            for n in range(self.min_n, self.max_n + 1)
+            for start in range(len(text) - n + 1)
+        }
+        keys.update(
+            PATTERN_PREFIX + name
+            for name in mistake_pattern_service.word_features(text).phonetic_categories
+        )
+        return keys
+
+    def key_for(self, pattern: str) -> Optional[str]:
+        """
+        Get the index key for a drill pattern
+
+        Args:
+            pattern: A phonetic pattern category such as 'ie/ei', or a
+                sequence of letters such as 'gh'
+
+        Returns:
+            Optional[str]: The key, or None if words aren't indexed by it
+        """
+        if pattern in mistake_pattern_service.phonetic_patterns:
+            return PATTERN_PREFIX + pattern
+        letters = pattern.lower().strip()
+        if self.min_n <= len(letters) <= self.max_n:
+            return NGRAM_PREFIX + letters
+        return None
+
+    async def add_words(self, db: AsyncSession, user_id: int, words: Iterable[Word]) -> None:
+        """Index newly imported words"""
+        rows = [
+            {"user_id": user_id, "key": key, "word_id": word.id, "word_list_id": word.word_list_id}
+            for word in words
+            for key in self.keys(word.word)
+        ]
+        if rows:
+            await db.execute(sqlite_insert(WordGrapheme).on_conflict_do_nothing(), rows)
+
+    async def remove_word_list(self, db: AsyncSession, word_list_id: int) -> None:
+        """Drop a word list's entries before the list is deleted"""
+        await db.execute(delete(WordGrapheme).where(WordGrapheme.word_list_id == word_list_id))
+
+    async def sample_word(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        key: str,
+        word_list_id: int = None
+    ) -> Optional[int]:
+        """Pick a random word matching a key, preferring words that aren't familiar yet"""
+        query = (
+            select(WordGrapheme.word_id, Word.familiar)
+            .join(Word, Word.id == WordGrapheme.word_id)
+            .where(WordGrapheme.user_id == user_id, WordGrapheme.key == key)
+        )
+        if word_list_id:
+            query = query.where(WordGrapheme.word_list_id == word_list_id)
+
+        result = await db.execute(query)
+        matches = result.all()
+        if not matches:
+            return None
+        unfamiliar = [word_id for word_id, familiar in matches if not familiar]
+        return self.random.choice(unfamiliar or [word_id for word_id, _ in matches])
+
+    async def pattern_counts(self, db: AsyncSession, user_id: int, word_list_id: int = None) -> Dict[str, int]:
+        """Count the words matching each phonetic pattern category"""
+        # A range on the key, unlike LIKE, is served by the primary key index
+        query = (
+            select(WordGrapheme.key, func.count())
+            .where(
+                WordGrapheme.user_id == user_id,
+                WordGrapheme.key >= PATTERN_PREFIX,
+                WordGrapheme.key < PATTERN_KEYS_END
+            )
+            .group_by(WordGrapheme.key)
+        )
+        if word_list_id:
+            query = query.where(WordGrapheme.word_list_id == word_list_id)
+
+        result = await db.execute(query)
+        return {key[len(PATTERN_PREFIX):]: count for key, count in result.all()}
+
+    async def backfill(self, db: AsyncSession, batch_size: int = 500) -> int:
+        """Index the words that have no entries yet, e.g. from before the index existed"""
+        indexed = 0
+        last_word_id = 0
+        while True:
+            result = await db.execute(
+                select(Word.id, Word.word, Word.word_list_id, WordList.owner_id)
+                .join(WordList)
+                .where(
+                    Word.id > last_word_id,
+                    ~select(WordGrapheme.word_id).where(WordGrapheme.word_id == Word.id).exists()
+                )
+                .order_by(Word.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            last_word_id = rows[-1].id
+
+            words_by_owner: Dict[int, List] = {}
+            for row in rows:
+                words_by_owner.setdefault(row.owner_id, []).append(row)
+            for owner_id, words in words_by_owner.items():
+                await self.add_words(db, owner_id, words)
+            indexed += len(rows)
+
+        await db.commit()
+        if indexed:
+            logger.info(f"Indexed graphemes of {indexed} words")
+        return indexed
+
+
+# Create singleton instance
+grapheme_index_service = GraphemeIndexService(settings.GRAPHEME_NGRAM_MIN, settings.GRAPHEME_NGRAM_MAX)
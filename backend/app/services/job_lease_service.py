@@ -0,0 +1,48 @@
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.core.database import AsyncSessionLocal
+from app.models.models import JobLease
+
+
+class JobLeaseService:
+    """
+    Service for electing the process that runs a periodic background job.
+
+    Every server process runs the same background loops. A job that must
+    only run once per period, like the SRS optimizer, first takes a lease
+    row; it succeeds if there is none, if the previous lease expired or if
+    this process already holds it. Leases expire on their own, so the job
+    moves to another process when its holder stops.
+    """
+
+    def __init__(self):
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    async def acquire(self, name: str, seconds: float) -> bool:
+        """Take or renew the lease on a job for `seconds`; False if another process holds it"""
+        # Leases coordinate real processes, so they use wall-clock time, not the app clock
+        now = datetime.utcnow()
+        statement = sqlite_insert(JobLease).values(
+            name=name, holder=self.holder, expires_at=now + timedelta(seconds=seconds)
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"holder": statement.excluded.holder, "expires_at": statement.excluded.expires_at},
+            where=or_(JobLease.expires_at <= now, JobLease.holder == self.holder)
+        ).returning(JobLease.holder)
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(statement)
+            acquired = result.first() is not None
+            await session.commit()
+        return acquired
+
+
+# Create singleton instance
+job_lease_service = JobLeaseService()
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedCompletion:
+    content: str
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class LLMResponseCache:
+    """
+    Content-addressed disk cache for LLM completions.
+
+    Entries are keyed by a hash of the model and the whitespace-normalized
+    prompt, so repeating an identical request never reaches the provider.
+    Entries expire after `ttl_seconds`, and the oldest ones are evicted once
+    the cache grows beyond `max_bytes`.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: int, max_bytes: int):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.saved_prompt_tokens = 0
+        self.saved_completion_tokens = 0
+        self._size: Optional[int] = None  # Total bytes on disk, computed on first write
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(model: str, messages: List[Dict[str, str]]) -> str:
+        """Hash the model and the normalized prompt into a cache key"""
+        normalized = [
+            {"role": message["role"], "content": re.sub(r"\s+", " ", message["content"]).strip()}
+            for message in messages
+        ]
+        payload = json.dumps({"model": model, "messages": normalized}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedCompletion]:
+        """Get a cached completion, or None if it is missing or expired"""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                self._remove(path)
+                self.misses += 1
+                return None
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        completion = CachedCompletion(**entry)
+        self.hits += 1
+        self.saved_prompt_tokens += completion.prompt_tokens
+        self.saved_completion_tokens += completion.completion_tokens
+        return completion
+
+    def put(self, key: str, completion: CachedCompletion) -> None:
+        """Store a completion, evicting the oldest entries if the cache is full"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(completion.__dict__).encode()
+        try:
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            # Write to a temporary file first so readers never see a partial entry
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write LLM cache entry {key}: {str(e)}")
+            return
+
+        if self._size is None:
+            self._size = self._scan_size()
+        else:
+            self._size += len(data) - previous
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def stats(self) -> Dict:
+        """Hit rate and the tokens that cache hits saved since startup"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_prompt_tokens": self.saved_prompt_tokens,
+            "saved_completion_tokens": self.saved_completion_tokens,
+        }
+
+    def _path(self, key: str) -> str:
+        # Shard by the first two hex digits to keep directories small
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _entries(self) -> List[os.DirEntry]:
+        entries = []
+        for shard in os.scandir(self.directory):
+            if shard.is_dir():
+                entries.extend(entry for entry in os.scandir(shard.path) if entry.name.endswith(".json"))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def _evict(self) -> None:
+        """Delete expired entries, then the oldest ones until the cache is at 90% of its bound"""
+        now = time.time()
+        entries = sorted(
+            ((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self._entries()),
+        )
+        size = sum(entry_size for _, entry_size, _ in entries)
+        target = self.max_bytes * 0.9
+        for mtime, entry_size, path in entries:
+            if size <= target and now - mtime <= self.ttl_seconds:
+                break
+            self._remove(path)
+            size -= entry_size
+        self._size = size
+
+    def _remove(self, path: str) -> None:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        if self._size is not None:
+            self._size -= size
@@ -1,69 +1,474 @@
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict, Optional
+from contextlib import aclosing
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+import httpx
 import openai
+from app.core.clock import get_clock
 from app.core.config import settings
+from app.services.llm_cache import CachedCompletion, LLMResponseCache
+from app.services.prompt_compaction import compact_patterns, estimate_tokens, format_pattern
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are a spelling expert helping students improve their spelling skills."
+
+# Unindented, since leading whitespace is billed as prompt tokens too
+ANALYSIS_PROMPT = """Based on these spelling mistake patterns:
+{context}
+
+Please provide:
+1. A brief analysis of the underlying causes
+2. 2-3 specific practice suggestions
+3. A relevant spelling rule or mnemonic device if applicable
+
+Format the response as JSON with keys: 'analysis', 'suggestions', 'rule'
+Keep each field concise (max 2-3 sentences)."""
+
+FALLBACK_ANALYSIS = {
+    "analysis": "Unable to generate analysis at this time.",
+    "suggestions": [],
+    "rule": None
+}
+
+
+def parse_analysis(content) -> Dict:
+    """Normalize an LLM reply, JSON text or a dict, to the LLMAnalysis shape"""
+    if isinstance(content, str):
+        try:
+            content = json.loads(content)
+        except ValueError:
+            return {"analysis": content.strip(), "suggestions": [], "rule": None}
+    suggestions = content.get("suggestions") or []
+    if isinstance(suggestions, str):
+        suggestions = [suggestions]
+    rule = content.get("rule")
+    return {
+        "analysis": str(content.get("analysis", "")),
+        "suggestions": [str(suggestion) for suggestion in suggestions],
+        "rule": str(rule) if rule else None,
+    }
+
+
+class LLMBusyError(Exception):
+    """Raised when no request slot frees up before the call's deadline"""
+
+
+class LLMUnavailableError(Exception):
+    """Raised when a streamed analysis can't be produced or was cut off"""
+
+
+class LLMBackend:
+    """Interface for chat completion providers"""
+
+    async def complete(self, messages: List[Dict[str, str]], model: str) -> CachedCompletion:
+        raise NotImplementedError
+
+    async def stream(self, messages: List[Dict[str, str]], model: str) -> AsyncIterator[str]:
+        """Yield the completion text in pieces; backends without streaming yield it whole"""
+        completion = await self.complete(messages, model)
+        yield completion.content
+
+
+class OpenAIBackend(LLMBackend):
+    """
+    Chat completions from the OpenAI API, or any compatible endpoint.
+
+    One long-lived client keeps connections alive between calls. A semaphore
+    caps in-flight requests for the whole process, every completion has a
+    deadline that covers its retries, and transient errors are retried with
+    jittered exponential backoff.
+    """
+
+    RETRYABLE_ERRORS = (
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+        asyncio.TimeoutError,
+    )
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        max_concurrency: int = 8,
+        timeout: float = 20.0,
+        max_retries: int = 2
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client: Optional[openai.AsyncOpenAI] = None
+
+    @property
+    def client(self) -> openai.AsyncOpenAI:
+        # Created on first use so a missing API key only fails the calls, not the import
+        if self._client is None:
+            if not self.api_key:
+                raise openai.OpenAIError("OPENAI_API_KEY is not configured")
+            self._client = openai.AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                max_retries=0,  # Retries are handled here, within the call deadline
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.max_concurrency,
+                        max_keepalive_connections=self.max_concurrency
+                    )
+                )
+            )
+        return self._client
+
+    async def complete(self, messages: List[Dict[str, str]], model: str) -> CachedCompletion:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        attempt = 0
+        while True:
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                raise LLMBusyError(f"No free LLM slot within {self.timeout}s")
+            try:
+                remaining = deadline - loop.time()
+                response = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=model, messages=messages, timeout=remaining
+                    ),
+                    remaining
+                )
+                error = None
+            except self.RETRYABLE_ERRORS as e:
+                error = e
+            finally:
+                self._semaphore.release()
+
+            if error is None:
+                usage = response.usage
+                return CachedCompletion(
+                    content=response.choices[0].message.content,
+                    prompt_tokens=usage.prompt_tokens if usage else 0,
+                    completion_tokens=usage.completion_tokens if usage else 0
+                )
+
+            # Full jitter: sleep a random share of the exponential backoff, without holding a slot
+            backoff = random.uniform(0, 0.5 * 2 ** attempt)
+            attempt += 1
+            if attempt > self.max_retries or loop.time() + backoff >= deadline:
+                raise error
+            logger.warning(f"Retrying LLM call after {type(error).__name__} (attempt {attempt})")
+            await asyncio.sleep(backoff)
+
+    async def stream(self, messages: List[Dict[str, str]], model: str) -> AsyncIterator[str]:
+        """
+        Yield completion text as the provider produces it.
+
+        The first piece and every following one must arrive within the
+        timeout. Streams aren't retried, since the caller may already have
+        forwarded part of the text. Closing the generator early, e.g. when
+        the client disconnected, closes the upstream response.
+        """
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise LLMBusyError(f"No free LLM slot within {self.timeout}s")
+        try:
+            response = await asyncio.wait_for(
+                self.client.chat.completions.create(
+                    model=model, messages=messages, stream=True, timeout=self.timeout
+                ),
+                self.timeout
+            )
+            try:
+                chunks = response.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(anext(chunks), self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                await response.close()
+        finally:
+            self._semaphore.release()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+class CircuitBreaker:
+    """
+    Stops calling an unhealthy provider.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are refused for `reset_seconds`; then a single trial call is let
+    through, which closes the circuit again if it succeeds.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go out now"""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def abandon(self) -> None:
+        """Give up a call without a verdict, so a later call can be the trial"""
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_running or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(f"LLM circuit opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+        self._trial_running = False
+
+
+class StubBackend(LLMBackend):
+    """
+    Deterministic offline backend.
+
+    Builds a plausible analysis from the patterns named in the prompt, so
+    tests and offline environments exercise the full analysis path without
+    network access. The same prompt always gets the same answer.
+    """
+
+    async def complete(self, messages: List[Dict[str, str]], model: str) -> CachedCompletion:
+        prompt = "\n".join(message["content"] for message in messages)
+        descriptions = [
+            line.split(":", 1)[1].strip()
+            for line in prompt.splitlines()
+            if line.strip().startswith("Description:")
+        ]
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:8]
+        focus = descriptions[0] if descriptions else "general spelling errors"
+        content = json.dumps({
+            "analysis": f"Most mistakes come from {focus} ({len(descriptions)} patterns, ref {digest}).",
+            "suggestions": [f"Practice words with {description}." for description in descriptions[:3]],
+            "rule": None
+        })
+        return CachedCompletion(
+            content=content,
+            prompt_tokens=estimate_tokens(prompt),
+            completion_tokens=estimate_tokens(content)
+        )
+
+    async def stream(self, messages: List[Dict[str, str]], model: str) -> AsyncIterator[str]:
+        completion = await self.complete(messages, model)
+        # A few words at a time, like a provider's token stream
+        words = completion.content.split(" ")
+        for start in range(0, len(words), 4):
+            yield " ".join(words[start:start + 4]) + (" " if start + 4 < len(words) else "")
+            await asyncio.sleep(0)
+
+
+def create_backend(name: str) -> LLMBackend:
+    if name == "stub":
+        return StubBackend()
+    if name == "openai":
+        return OpenAIBackend(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.LLM_BASE_URL,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            timeout=settings.LLM_TIMEOUT_SECONDS,
+            max_retries=settings.LLM_MAX_RETRIES
+        )
+    raise ValueError(f"Unknown LLM backend: {name}")
+
 
 class LLMService:
     """Service for LLM-based analysis and suggestions"""
-    
-    def __init__(self):
-        openai.api_key = settings.openai_api_key
-        
+
+    def __init__(
+        self,
+        backend: LLMBackend = None,
+        cache: LLMResponseCache = None,
+        breaker: CircuitBreaker = None
+    ):
+        self.backend = backend or create_backend(settings.LLM_BACKEND)
+        self.model = settings.LLM_MODEL
+        self.breaker = breaker or CircuitBreaker(
+            settings.LLM_CIRCUIT_FAILURE_THRESHOLD, settings.LLM_CIRCUIT_RESET_SECONDS
+        )
+        self.cache = cache or LLMResponseCache(
+            settings.LLM_CACHE_DIR,
+            ttl_seconds=settings.LLM_CACHE_TTL_HOURS * 3600,
+            max_bytes=settings.LLM_CACHE_MAX_MB * 1024 * 1024
+        )
+
     async def analyze_mistake_patterns(self, patterns: List[Dict]) -> Dict:
         """
         Analyze mistake patterns using LLM and provide personalized improvement suggestions
-        
+
+        Identical prompts are answered from the response cache.
+
         Args:
             patterns: List of mistake patterns with their frequencies and examples
-            
+
         Returns:
             Dict containing analysis and suggestions
         """
-        # Prepare the context for the LLM
-        context = self._format_patterns_for_prompt(patterns)
-        
+        messages = self._build_messages(patterns)
+        key = self.cache.key(self.model, messages)
+
+        cached = self.cache.get(key)
+        if cached:
+            return cached.content
+
+        # Answer at once while the provider is unhealthy instead of queueing more calls
+        if not self.breaker.allow():
+            return FALLBACK_ANALYSIS
+
         try:
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a spelling expert helping students improve their spelling skills."},
-                    {"role": "user", "content": f"""
-                    Based on these spelling mistake patterns:
-                    {context}
-                    
-                    Please provide:
-                    1. A brief analysis of the underlying causes
-                    2. 2-3 specific practice suggestions
-                    3. A relevant spelling rule or mnemonic device if applicable
-                    
-                    Format the response as JSON with keys: 'analysis', 'suggestions', 'rule'
-                    Keep each field concise (max 2-3 sentences).
-                    """}
-                ]
-            )
-            
-            return response.choices[0].message.content
-            
+            completion = await self.backend.complete(messages, self.model)
+        except LLMBusyError as e:
+            # Local saturation says nothing about the provider's health
+            self.breaker.abandon()
+            logger.warning(str(e))
+            return FALLBACK_ANALYSIS
+        except Exception as e:
+            self.breaker.record_failure()
+            logger.error(f"Error calling LLM API: {type(e).__name__}: {str(e)}")
+            return FALLBACK_ANALYSIS
+
+        self.breaker.record_success()
+        self.cache.put(key, completion)
+        return completion.content
+
+    async def stream_mistake_patterns(self, patterns: List[Dict]) -> AsyncIterator[str]:
+        """
+        Stream the analysis of mistake patterns as it is generated
+
+        Uses the same prompt and cache as analyze_mistake_patterns. A cached
+        answer is yielded in one piece; otherwise the completion is stored in
+        the cache once the stream has finished. If the consumer stops early
+        the upstream call is closed and nothing is cached.
+
+        Args:
+            patterns: List of mistake patterns with their frequencies and examples
+
+        Yields:
+            str: Pieces of the JSON analysis text
+
+        Raises:
+            LLMUnavailableError: If the provider can't be called or the stream broke off
+        """
+        messages = self._build_messages(patterns)
+        key = self.cache.key(self.model, messages)
+
+        cached = self.cache.get(key)
+        if cached:
+            yield cached.content
+            return
+
+        if not self.breaker.allow():
+            raise LLMUnavailableError("LLM circuit is open")
+
+        pieces = []
+        try:
+            # Closed explicitly, so an early exit ends the upstream call right away
+            async with aclosing(self.backend.stream(messages, self.model)) as stream:
+                async for piece in stream:
+                    pieces.append(piece)
+                    yield piece
+        except LLMBusyError as e:
+            self.breaker.abandon()
+            logger.warning(str(e))
+            raise LLMUnavailableError(str(e)) from e
+        except (GeneratorExit, asyncio.CancelledError):
+            # The client went away; that says nothing about the provider either
+            self.breaker.abandon()
+            raise
         except Exception as e:
-            print(f"Error calling LLM API: {str(e)}")
-            return {
-                "analysis": "Unable to generate analysis at this time.",
-                "suggestions": [],
-                "rule": None
-            }
-    
+            self.breaker.record_failure()
+            logger.error(f"Error streaming from LLM API: {type(e).__name__}: {str(e)}")
+            raise LLMUnavailableError(str(e)) from e
+
+        self.breaker.record_success()
+        content = "".join(pieces)
+        self.cache.put(key, CachedCompletion(
+            content=content,
+            prompt_tokens=sum(estimate_tokens(message["content"]) for message in messages),
+            completion_tokens=estimate_tokens(content)
+        ))
+
+    async def close(self) -> None:
+        """Release the backend's connections"""
+        close = getattr(self.backend, "close", None)
+        if close:
+            await close()
+
+    def cache_stats(self) -> Dict:
+        """Response cache hit rate and token savings since startup"""
+        return self.cache.stats()
+
+    def _build_messages(self, patterns: List[Dict]) -> List[Dict[str, str]]:
+        """Build the chat messages asking for an analysis of the patterns"""
+        # Prepare the context for the LLM
+        context = self._format_patterns_for_prompt(patterns)
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": ANALYSIS_PROMPT.format(context=context)}
+        ]
+
     def _format_patterns_for_prompt(self, patterns: List[Dict]) -> str:
-        """Format mistake patterns into a clear text representation for the prompt"""
-        formatted = []
-        for pattern in patterns:
-            pattern_str = (
-                f"Type: {pattern['pattern_type']}\n"
-                f"Description: {pattern['description']}\n"
-                f"Frequency: {pattern['frequency']}\n"
-                f"Examples: {', '.join(pattern['examples'])}\n"
+        """
+        Format mistake patterns into a clear text representation for the prompt
+
+        Only the top patterns, with a few recent examples each, are included,
+        so the prompt stays within a fixed token budget however many patterns
+        the user has.
+        """
+        compacted = compact_patterns(
+            patterns,
+            top_k=settings.LLM_PROMPT_TOP_K,
+            max_examples=settings.LLM_PROMPT_MAX_EXAMPLES,
+            token_budget=settings.LLM_PROMPT_TOKEN_BUDGET,
+            half_life_days=settings.LLM_PROMPT_RECENCY_HALF_LIFE_DAYS,
+            now=get_clock().now()
+        )
+        formatted = [format_pattern(pattern) for pattern in compacted.patterns]
+        if compacted.omitted_patterns:
+            formatted.append(
+                f"Plus {compacted.omitted_patterns} less frequent patterns "
+                f"({compacted.omitted_mistakes} mistakes in total).\n"
             )
-            formatted.append(pattern_str)
-        
+
         return "\n".join(formatted)
 
 # Create singleton instance
-llm_service = LLMService()
\ No newline at end of file
+llm_service = LLMService()
@@ -0,0 +1,227 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.clock import get_clock
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, ReadOnlySessionLocal
+from app.models.models import MistakeAnalysis, MistakePattern, Word, WordList
+from app.services.explanation_service import explanation_service
+from app.services.llm_service import FALLBACK_ANALYSIS
+
+logger = logging.getLogger(__name__)
+
+USER_SCOPE = "user"
+
+
+def word_scope(word_id: int) -> str:
+    return f"word:{word_id}"
+
+
+def list_scope(word_list_id: int) -> str:
+    return f"list:{word_list_id}"
+
+
+class MistakeAnalysisService:
+    """
+    Service for LLM analyses of mistake patterns, computed off the request path.
+
+    Analyses are stored per user and scope (all of the user's patterns, one
+    word list or one word). When patterns change the stored analysis is
+    marked pending and a background worker recomputes it; responses return
+    the last completed analysis together with its status straight away.
+    """
+
+    def __init__(self, workers: int = 2):
+        self.workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._queued: Set[Tuple[int, str]] = set()
+        self._running: Set[Tuple[int, str]] = set()
+        self._finished: Dict[Tuple[int, str], asyncio.Event] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    async def invalidate(self, db: AsyncSession, user_id: int, word: Word) -> List[str]:
+        """
+        Mark the stored analyses covering a word as pending.
+
+        Returns:
+            List[str]: Scopes to pass to schedule() once the transaction committed
+        """
+        result = await db.execute(
+            update(MistakeAnalysis)
+            .where(
+                MistakeAnalysis.user_id == user_id,
+                MistakeAnalysis.scope.in_([
+                    USER_SCOPE, list_scope(word.word_list_id), word_scope(word.id)
+                ])
+            )
+            .values(status="pending", version=MistakeAnalysis.version + 1)
+            .returning(MistakeAnalysis.scope)
+        )
+        return list(result.scalars().all())
+
+    def schedule(self, user_id: int, scopes: Iterable[str]) -> None:
+        """Queue analyses for recomputation; already queued or running ones are skipped"""
+        for scope in scopes:
+            key = (user_id, scope)
+            if key in self._queued or key in self._running:
+                continue
+            self._queued.add(key)
+            self._queue.put_nowait(key)
+
+    async def request(self, db: AsyncSession, user_id: int, scope: str) -> None:
+        """Store a pending analysis for a scope that has none, in the caller's transaction"""
+        await db.execute(
+            sqlite_insert(MistakeAnalysis)
+            .values(user_id=user_id, scope=scope, status="pending", version=1)
+            .on_conflict_do_nothing(index_elements=["user_id", "scope"])
+        )
+
+    async def get_analysis(self, db: AsyncSession, user_id: int, scope: str) -> MistakeAnalysis:
+        """Get the stored analysis for a scope, requesting one if there is none yet"""
+        query = select(MistakeAnalysis).where(
+            MistakeAnalysis.user_id == user_id,
+            MistakeAnalysis.scope == scope
+        )
+        analysis = (await db.execute(query)).scalar_one_or_none()
+        if analysis is None:
+            if db.info.get("read_only"):
+                # Read endpoints can't write, so the request goes through the primary engine
+                async with AsyncSessionLocal() as session:
+                    return await self.get_analysis(session, user_id, scope)
+            await self.request(db, user_id, scope)
+            await db.commit()
+            analysis = (await db.execute(query)).scalar_one()
+
+        # Also covers jobs lost when the server restarted
+        if analysis.status == "pending":
+            self.schedule(user_id, [scope])
+        return analysis
+
+    async def wait_for(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        scope: str,
+        timeout: float
+    ) -> MistakeAnalysis:
+        """Get the analysis for a scope, waiting up to timeout seconds while it is pending"""
+        analysis = await self.get_analysis(db, user_id, scope)
+        if analysis.status != "pending" or timeout <= 0:
+            return analysis
+
+        finished = self._finished.setdefault((user_id, scope), asyncio.Event())
+        # Don't hold a database connection while waiting
+        await db.close()
+        try:
+            await asyncio.wait_for(finished.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        result = await db.execute(
+            select(MistakeAnalysis).where(MistakeAnalysis.id == analysis.id)
+        )
+        return result.scalar_one()
+
+    async def start(self) -> None:
+        """Start the background workers"""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the background workers; pending analyses are picked up again on the next read"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self) -> None:
+        while True:
+            key = await self._queue.get()
+            self._queued.discard(key)
+            self._running.add(key)
+            stored = True
+            try:
+                stored = await self._analyze(*key)
+            except Exception as e:
+                logger.error(f"Error analyzing mistake patterns for {key}: {str(e)}")
+            finally:
+                self._running.discard(key)
+
+            if stored:
+                finished = self._finished.pop(key, None)
+                if finished:
+                    finished.set()
+            else:
+                # The patterns changed while the LLM was busy; analyze the new set
+                user_id, scope = key
+                self.schedule(user_id, [scope])
+
+    async def _analyze(self, user_id: int, scope: str) -> bool:
+        """Recompute a pending analysis; returns False if it went stale meanwhile"""
+        query = select(MistakeAnalysis).where(
+            MistakeAnalysis.user_id == user_id,
+            MistakeAnalysis.scope == scope
+        )
+        async with ReadOnlySessionLocal() as session:
+            analysis = (await session.execute(query)).scalar_one_or_none()
+            if analysis is None or analysis.status != "pending":
+                return True
+            patterns = await self.load_patterns(session, user_id, scope)
+
+        # No session is open while the LLM may be asked, which can take a while
+        status = "ready"
+        content = None
+        if patterns:
+            content = await explanation_service.explain(patterns)
+            if content is None:
+                # Keep the previous analysis when nothing could be explained
+                status = "failed"
+                content = analysis.analysis or dict(FALLBACK_ANALYSIS)
+
+        # Only store the result if the patterns didn't change in the meantime
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(MistakeAnalysis)
+                .where(MistakeAnalysis.id == analysis.id, MistakeAnalysis.version == analysis.version)
+                .values(status=status, analysis=content, analyzed_at=get_clock().now())
+                .returning(MistakeAnalysis.id)
+            )
+            stored = result.scalar_one_or_none() is not None
+            await session.commit()
+        return stored
+
+    async def load_patterns(self, db: AsyncSession, user_id: int, scope: str) -> List[Dict]:
+        """Get the user's mistake patterns in a scope, most frequent first"""
+        query = (
+            select(MistakePattern)
+            .join(Word)
+            .join(WordList)
+            .where(WordList.owner_id == user_id)
+            .order_by(MistakePattern.frequency.desc(), MistakePattern.id)
+        )
+        kind, _, value = scope.partition(":")
+        if kind == "word":
+            query = query.where(MistakePattern.word_id == int(value))
+        elif kind == "list":
+            query = query.where(Word.word_list_id == int(value))
+
+        result = await db.execute(query)
+        return [
+            {
+                "pattern_type": pattern.pattern_type,
+                "description": pattern.description,
+                "frequency": pattern.frequency,
+                "examples": pattern.examples,
+                # Written from the injected clock, unlike updated_at, so simulated runs repeat
+                "last_seen": pattern.example_rows[-1].last_seen if pattern.example_rows else None,
+            }
+            for pattern in result.scalars().all()
+        ]
+
+# Create singleton instance
+mistake_analysis_service = MistakeAnalysisService(workers=settings.MISTAKE_ANALYSIS_WORKERS)
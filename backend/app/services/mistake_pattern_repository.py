@@ -0,0 +1,131 @@
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.clock import get_clock
+from app.core.config import settings
+from app.models.models import MistakeExample, MistakePattern
+
+UNIQUE_PATTERN_INDEX = "uq_mistake_patterns_word_pattern"
+
+# Fold duplicate patterns into the oldest row of each: the frequencies add up
+# there and the other rows are deleted. Shared by the startup migration and
+# the alembic revision that made patterns unique.
+MERGE_DUPLICATE_PATTERNS_SQL = """
+    UPDATE mistake_patterns
+    SET frequency = (
+            SELECT SUM(d.frequency) FROM mistake_patterns d
+            WHERE d.word_id IS mistake_patterns.word_id
+              AND d.pattern_type = mistake_patterns.pattern_type
+              AND d.description = mistake_patterns.description
+        )
+    WHERE id IN (
+        SELECT MIN(id) FROM mistake_patterns
+        GROUP BY word_id, pattern_type, description
+        HAVING COUNT(*) > 1
+    )
+"""
+DELETE_DUPLICATE_PATTERNS_SQL = """
+    DELETE FROM mistake_patterns
+    WHERE id NOT IN (
+        SELECT MIN(id) FROM mistake_patterns
+        GROUP BY word_id, pattern_type, description
+    )
+"""
+
+
+class RecordedPattern(NamedTuple):
+    id: int
+    pattern_type: str
+    description: str
+    frequency: int
+    examples: Optional[List[str]]  # Most recent distinct attempts, oldest first; None unless asked for
+
+
+async def upsert_mistake_pattern(
+    db: AsyncSession,
+    word_id: int,
+    pattern: dict,
+    user_spelling: str,
+    with_examples: bool = False
+) -> RecordedPattern:
+    """
+    Record one wrong attempt against its mistake pattern.
+
+    Inserts the pattern, or bumps the frequency of the existing one, relying
+    on the unique (word_id, pattern_type, description) index. The attempt is
+    counted in its own example row; only the MISTAKE_PATTERN_MAX_EXAMPLES
+    most recently seen attempts are kept, so the work per attempt doesn't
+    grow with how often the mistake was made. The kept examples are only
+    read back when `with_examples` is set.
+
+    Returns:
+        RecordedPattern: The pattern after recording the attempt
+    """
+    stmt = sqlite_insert(MistakePattern).values(
+        word_id=word_id,
+        pattern_type=pattern["pattern_type"],
+        description=pattern["description"],
+        frequency=1
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["word_id", "pattern_type", "description"],
+        set_={
+            "frequency": MistakePattern.frequency + 1,
+            "updated_at": func.now(),
+        }
+    ).returning(
+        MistakePattern.id,
+        MistakePattern.pattern_type,
+        MistakePattern.description,
+        MistakePattern.frequency
+    )
+    row = (await db.execute(stmt)).one()
+
+    seen_at = get_clock().now()
+    example = sqlite_insert(MistakeExample).values(
+        pattern_id=row.id,
+        spelling=user_spelling,
+        count=1,
+        last_seen=seen_at
+    )
+    example = example.on_conflict_do_update(
+        index_elements=["pattern_id", "spelling"],
+        set_={"count": MistakeExample.count + 1, "last_seen": seen_at}
+    ).returning(MistakeExample.count)
+    count = (await db.execute(example)).scalar_one()
+
+    if count == 1:
+        # A new attempt may push the least recently seen one out
+        keep = (
+            select(MistakeExample.id)
+            .where(MistakeExample.pattern_id == row.id)
+            .order_by(MistakeExample.last_seen.desc(), MistakeExample.id.desc())
+            .limit(settings.MISTAKE_PATTERN_MAX_EXAMPLES)
+        )
+        await db.execute(
+            delete(MistakeExample)
+            .where(MistakeExample.pattern_id == row.id, MistakeExample.id.not_in(keep))
+        )
+
+    examples = None
+    if with_examples:
+        result = await db.execute(
+            select(MistakeExample.spelling)
+            .where(MistakeExample.pattern_id == row.id)
+            .order_by(MistakeExample.last_seen, MistakeExample.id)
+        )
+        examples = list(result.scalars().all())
+    return RecordedPattern(row.id, row.pattern_type, row.description, row.frequency, examples)
+
+
+async def get_word_patterns(db: AsyncSession, word_id: int) -> List[MistakePattern]:
+    """Get all mistake patterns recorded for a word"""
+    result = await db.execute(
+        select(MistakePattern)
+        .where(MistakePattern.word_id == word_id)
+        .execution_options(populate_existing=True)
+    )
+    return list(result.scalars().all())
@@ -1,10 +1,38 @@
-from typing import List, Dict
-from difflib import SequenceMatcher
+from typing import Callable, List, Dict, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
 import re
-from collections import defaultdict
+
+from app.core.config import settings
+from app.services.phonetic_key import phonetic_key
+from app.services.spelling_alignment import (
+    EditOp, align, group_edits, is_doubled, is_keyboard_pair, is_phonetic_pair
+)
+
+VOWELS = frozenset('aeiou')
+
+
+@dataclass(frozen=True)
+class WordFeatures:
+    """Everything about a correct spelling the pattern checks need, computed once per word"""
+    vowels: str  # The word's vowels in order
+    # Every spelling a phonetic rule produces from the word, mapped to the first rule that does
+    phonetic_variants: Dict[str, str]
+    phonetic_categories: Tuple[str, ...]  # Names of the phonetic rules the word contains
+    phonetic_key: str  # Shared by the spellings that sound like the word
+    # (vowel pattern, variation used by the word, the pattern's other variations) in check order
+    vowel_candidates: Tuple[Tuple[str, str, Tuple[str, ...]], ...]
+
 
 class MistakePatternService:
-    """Service for analyzing spelling mistake patterns"""
+    """
+    Service for analyzing spelling mistake patterns
+
+    The pattern catalogue is compiled once. For each correct spelling, the
+    misspellings every phonetic rule would produce and the vowel variations
+    it uses are computed on first sight and cached, so analyzing an attempt
+    is mostly dictionary lookups.
+    """
 
     def __init__(self):
         # Common phonetic patterns
@@ -29,6 +57,20 @@ class MistakePatternService:
             'long_u': ['u', 'u_e', 'ue', 'ew'],
         }
 
+        # Compiled rule engine
+        self._phonetic_rules = [
+            (name, pattern, re.compile(pattern), alternatives)
+            for name, (pattern, alternatives) in self.phonetic_patterns.items()
+        ]
+        self._variation_matchers: Dict[str, Callable[[str], bool]] = {}
+        for variations in self.vowel_patterns.values():
+            for var in variations:
+                if var not in self._variation_matchers:
+                    self._variation_matchers[var] = self._compile_variation(var)
+        self.word_features = lru_cache(maxsize=settings.MISTAKE_PATTERN_FEATURE_CACHE_SIZE)(
+            self._compute_word_features
+        )
+
     def analyze_mistake(self, correct_word: str, attempt: str) -> Dict:
         """
         Analyze the spelling mistake and identify the pattern
@@ -52,167 +94,155 @@ class MistakePatternService:
         vowel_pattern = self._check_vowel_patterns(correct, user_attempt)
         if vowel_pattern:
             return vowel_pattern
+
+        # Spellings that sound right but no rule produces, e.g. 'nessesary'
+        if phonetic_key(user_attempt) == self.word_features(correct).phonetic_key:
+            return {
+                'pattern_type': 'phonetic',
+                'description': 'sound-alike spelling',
+                'examples': [attempt]
+            }
             
-        # Get sequence matcher operations for other patterns
-        matcher = SequenceMatcher(None, correct, user_attempt)
-        ops = matcher.get_opcodes()
-        return self._identify_pattern(ops, correct, user_attempt)
+        # Classify the edits of the cheapest alignment for other patterns
+        return self._identify_pattern(align(correct, user_attempt), correct, user_attempt)
+
+    @staticmethod
+    def _compile_variation(var: str) -> Callable[[str], bool]:
+        """Build a predicate for whether a word contains a vowel variation ('_' is any letter)"""
+        if '_' in var:
+            return re.compile(var.replace('_', '[a-z]')).search
+        return lambda word: var in word
+
+    def _compute_word_features(self, correct: str) -> WordFeatures:
+        phonetic_variants: Dict[str, str] = {}
+        phonetic_categories = []
+        for name, pattern, compiled, alternatives in self._phonetic_rules:
+            match = compiled.search(correct)
+            if not match:
+                continue
+            phonetic_categories.append(name)
+            correct_part = match.group(0)
+            # A pattern that matches the whole word structure, with the rule in place of the matched part
+            word_pattern = re.compile(re.escape(correct).replace(re.escape(correct_part), pattern))
+            for alt in alternatives:
+                test_word = word_pattern.sub(lambda m: compiled.sub(alt, m.group(0)), correct)
+                # Rules are checked in catalogue order, so the first one to produce a spelling wins
+                phonetic_variants.setdefault(test_word, f'{name} confusion: {correct_part} → {alt}')
+
+        vowel_candidates = []
+        for pattern_name, variations in self.vowel_patterns.items():
+            for var in variations:
+                if self._variation_matchers[var](correct):
+                    others = tuple(alt_var for alt_var in variations if alt_var != var)
+                    vowel_candidates.append((pattern_name, var, others))
+
+        return WordFeatures(
+            vowels=''.join(c for c in correct if c in VOWELS),
+            phonetic_variants=phonetic_variants,
+            phonetic_categories=tuple(phonetic_categories),
+            phonetic_key=phonetic_key(correct),
+            vowel_candidates=tuple(vowel_candidates)
+        )
 
     def _check_phonetic_patterns(self, correct: str, attempt: str) -> Dict:
         """Check for common phonetic-based spelling mistakes"""
-        for name, (pattern, alternatives) in self.phonetic_patterns.items():
-            match = re.search(pattern, correct)
-            if match:
-                # Find which alternative was used in the attempt
-                correct_part = match.group(0)
-                # Create a pattern that matches the whole word structure
-                word_pattern = re.escape(correct).replace(re.escape(correct_part), pattern)
-                
-                for alt in alternatives:
-                    # Create test word by replacing the matched part
-                    test_word = re.sub(word_pattern, lambda m: re.sub(pattern, alt, m.group(0)), correct)
-                    if test_word == attempt:
-                        return {
-                            'pattern_type': 'phonetic',
-                            'description': f'{name} confusion: {correct_part} → {alt}',
-                            'examples': [attempt]
-                        }
+        description = self.word_features(correct).phonetic_variants.get(attempt)
+        if description:
+            return {
+                'pattern_type': 'phonetic',
+                'description': description,
+                'examples': [attempt]
+            }
         return None
 
     def _check_vowel_patterns(self, correct: str, attempt: str) -> Dict:
         """Check for vowel-based spelling mistakes"""
-        # Extract vowel sequences from both words
-        correct_vowels = ''.join(c for c in correct if c in 'aeiou')
-        attempt_vowels = ''.join(c for c in attempt if c in 'aeiou')
+        features = self.word_features(correct)
+        attempt_vowels = ''.join(c for c in attempt if c in VOWELS)
         
-        if correct_vowels != attempt_vowels:
-            # Check each vowel pattern group
-            for pattern_name, variations in self.vowel_patterns.items():
-                # Check if the correct word uses this pattern
-                for var in variations:
-                    var_pattern = var.replace('_', '[a-z]')
-                    if re.search(var_pattern, correct):
-                        # See if the attempt used a different variation
-                        for alt_var in variations:
-                            if alt_var != var:
-                                alt_pattern = alt_var.replace('_', '[a-z]')
-                                if re.search(alt_pattern, attempt):
-                                    return {
-                                        'pattern_type': 'vowel',
-                                        'description': f'{pattern_name} sound confusion: {var} → {alt_var}',
-                                        'examples': [attempt]
-                                    }
+        if features.vowels != attempt_vowels:
+            # The first variation the correct word uses for which the attempt used another one
+            for pattern_name, var, others in features.vowel_candidates:
+                for alt_var in others:
+                    if self._variation_matchers[alt_var](attempt):
+                        return {
+                            'pattern_type': 'vowel',
+                            'description': f'{pattern_name} sound confusion: {var} → {alt_var}',
+                            'examples': [attempt]
+                        }
             
             # If no specific vowel pattern found but vowels differ
             return {
                 'pattern_type': 'vowel',
-                'description': f'vowel sequence error: {correct_vowels} → {attempt_vowels}',
+                'description': f'vowel sequence error: {features.vowels} → {attempt_vowels}',
                 'examples': [attempt]
             }
         
         return None
 
-    def _identify_pattern(self, opcodes, correct: str, attempt: str) -> Dict:
-        """Identify the specific mistake pattern from the sequence operations"""
-        patterns = []
-        
-        # Track character positions for each operation
-        positions = defaultdict(list)
-        
-        for tag, i1, i2, j1, j2 in opcodes:
-            if tag == 'replace':
-                old = correct[i1:i2]
-                new = attempt[j1:j2]
-                
-                # Double letter errors
-                if len(old) == 2 and old[0] == old[1] and len(new) == 1:
-                    patterns.append({
-                        'pattern_type': 'doubling',
-                        'description': f'double letter {old} omitted',
-                        'examples': [attempt]
-                    })
-                # Single to double letter
-                elif len(old) == 1 and len(new) == 2 and new[0] == new[1]:
-                    patterns.append({
-                        'pattern_type': 'doubling',
-                        'description': f'unnecessary letter doubling: {old} → {new}',
-                        'examples': [attempt]
-                    })
-                # Common letter substitutions
-                elif len(old) == 1 and len(new) == 1:
-                    positions['replace'].append((i1, old, new))
-                else:
-                    patterns.append({
-                        'pattern_type': 'substitution',
-                        'description': f'incorrect letter sequence: {old} → {new}',
-                        'examples': [attempt]
-                    })
-                    
-            elif tag == 'delete':
-                deleted = correct[i1:i2]
-                positions['delete'].append((i1, deleted))
-                
-            elif tag == 'insert':
-                inserted = attempt[j1:j2]
-                positions['insert'].append((j1, inserted))
-
-        # Analyze position-based patterns
-        if positions['replace']:
-            # Group adjacent replacements
-            grouped = self._group_adjacent_operations(positions['replace'])
-            for group in grouped:
-                if len(group) > 1:
-                    old = ''.join(op[1] for op in group)
-                    new = ''.join(op[2] for op in group)
-                    patterns.append({
-                        'pattern_type': 'sequence',
-                        'description': f'letter sequence error: {old} → {new}',
-                        'examples': [attempt]
-                    })
-                else:
-                    op = group[0]
-                    patterns.append({
-                        'pattern_type': 'substitution',
-                        'description': f'letter substitution: {op[1]} → {op[2]}',
-                        'examples': [attempt]
-                    })
-
-        # Check for letter transpositions
-        if len(patterns) == 0 and len(correct) == len(attempt):
-            transpositions = []
-            for i in range(len(correct)-1):
-                if correct[i:i+2] == attempt[i+1] + attempt[i]:
-                    transpositions.append(correct[i:i+2])
-            if transpositions:
-                patterns.append({
-                    'pattern_type': 'transposition',
-                    'description': f'letter swap: {", ".join(transpositions)}',
-                    'examples': [attempt]
-                })
+    def _identify_pattern(self, script: List[EditOp], correct: str, attempt: str) -> Dict:
+        """Identify the specific mistake pattern from the alignment's edit script"""
+        patterns = [
+            self._classify_edits(group, correct, attempt)
+            for group in group_edits(script)
+        ]
 
         # If no specific pattern found, mark as general error
         if not patterns:
-            patterns.append({
+            return {
                 'pattern_type': 'other',
                 'description': 'general spelling error',
                 'examples': [attempt]
-            })
+            }
+
+        # Several swaps are one habit; otherwise the first mistake in the word counts
+        if len(patterns) > 1 and all(p['pattern_type'] == 'transposition' for p in patterns):
+            swaps = [p['description'].split(': ', 1)[1] for p in patterns]
+            return {
+                'pattern_type': 'transposition',
+                'description': f'letter swap: {", ".join(swaps)}',
+                'examples': [attempt]
+            }
+        return patterns[0]
 
-        # Return the most specific pattern found
-        return sorted(patterns, key=lambda x: x['pattern_type'] != 'other')[0]
+    def _classify_edits(self, group: List[EditOp], correct: str, attempt: str) -> Dict:
+        """Name the mistake made by a group of adjacent edits"""
+        if len(group) > 1:
+            old = ''.join(op.source for op in group)
+            new = ''.join(op.target for op in group)
+            kinds = {op.kind for op in group}
+            if kinds == {'substitute'}:
+                pattern_type, description = 'sequence', f'letter sequence error: {old} → {new}'
+            elif kinds == {'delete'}:
+                pattern_type, description = 'omission', f'letter omitted: {old}'
+            elif kinds == {'insert'}:
+                pattern_type, description = 'insertion', f'extra letter: {new}'
+            elif kinds == {'transpose'}:
+                swaps = ', '.join(op.source for op in group)
+                pattern_type, description = 'transposition', f'letter swap: {swaps}'
+            else:
+                pattern_type, description = 'substitution', f'incorrect letter sequence: {old} → {new}'
+            return {'pattern_type': pattern_type, 'description': description, 'examples': [attempt]}
 
-    def _group_adjacent_operations(self, operations):
-        """Group adjacent operations together"""
-        if not operations:
-            return []
-            
-        groups = [[operations[0]]]
-        for op in operations[1:]:
-            if op[0] == groups[-1][-1][0] + 1:
-                groups[-1].append(op)
+        op = group[0]
+        if op.kind == 'transpose':
+            pattern_type, description = 'transposition', f'letter swap: {op.source}'
+        elif op.kind == 'delete':
+            if is_doubled(correct, op.i):
+                pattern_type, description = 'doubling', f'double letter {op.source * 2} omitted'
+            else:
+                pattern_type, description = 'omission', f'letter omitted: {op.source}'
+        elif op.kind == 'insert':
+            if is_doubled(attempt, op.j):
+                pattern_type, description = 'doubling', f'unnecessary letter doubling: {op.target} → {op.target * 2}'
             else:
-                groups.append([op])
-        return groups
+                pattern_type, description = 'insertion', f'extra letter: {op.target}'
+        elif is_keyboard_pair(op.source, op.target) and not is_phonetic_pair(op.source, op.target):
+            # A neighbouring key that doesn't sound alike is a slip of the finger
+            pattern_type, description = 'keyboard', f'keyboard slip: {op.source} → {op.target}'
+        else:
+            pattern_type, description = 'substitution', f'letter substitution: {op.source} → {op.target}'
+        return {'pattern_type': pattern_type, 'description': description, 'examples': [attempt]}
 
 # Create singleton instance
 mistake_pattern_service = MistakePatternService()
\ No newline at end of file
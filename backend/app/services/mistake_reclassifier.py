@@ -0,0 +1,351 @@
+"""
+Bulk reclassification of stored mistake patterns.
+
+Patterns are classified once, when the attempt is submitted, so rows keep
+the classification of whatever MistakePatternService version was running
+then. The examples stored with each pattern, with how often each attempt
+was made, are the only record of the attempts, so this job re-runs the
+current analysis on every example and rebuilds each word's pattern rows
+from the result.
+
+Users are processed one at a time, each in its own transaction. Their
+words are read in pages by word id, so memory stays bounded by the batch
+size however many examples are stored, and the analysis of a page is
+spread over a process pool. Stored LLM analyses of users whose patterns
+changed are marked pending so they are recomputed on the next read.
+
+Run it from the backend directory:
+
+    python -m app.services.mistake_reclassifier --workers 4 --dry-run
+"""
+import argparse
+import asyncio
+import logging
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.models import MistakeAnalysis, MistakeExample, MistakePattern, User, Word, WordList
+from app.services.mistake_pattern_service import mistake_pattern_service
+
+logger = logging.getLogger(__name__)
+
+
+def classify_attempts(attempts: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Classify (correct word, attempt) pairs; runs in the worker processes"""
+    results = []
+    for word, attempt in attempts:
+        pattern = mistake_pattern_service.analyze_mistake(word, attempt)
+        results.append((pattern["pattern_type"], pattern["description"]))
+    return results
+
+
+@dataclass
+class ReclassificationSummary:
+    users: int = 0
+    users_changed: int = 0
+    users_failed: int = 0
+    words: int = 0
+    words_changed: int = 0
+    patterns_before: int = 0
+    patterns_after: int = 0
+    attempts: int = 0
+    attempts_moved: int = 0  # Attempts whose pattern changed
+    # (old pattern type, new pattern type) -> attempts that moved between them
+    transitions: Counter = field(default_factory=Counter)
+
+    def add(self, other: "ReclassificationSummary") -> None:
+        for name in (
+            "users", "users_changed", "users_failed", "words", "words_changed",
+            "patterns_before", "patterns_after", "attempts", "attempts_moved"
+        ):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.transitions.update(other.transitions)
+
+
+def assign_frequency(frequency: int, counts: List[int]) -> List[int]:
+    """
+    Share a pattern's frequency among its examples.
+
+    Each example carries how often it was made, but attempts that fell out
+    of the bounded example list are only counted in the frequency; they are
+    given to the most common example, which keeps the word's total.
+    """
+    counts = list(counts)
+    remainder = (frequency or 0) - sum(counts)
+    if remainder > 0:
+        counts[counts.index(max(counts))] += remainder
+    return counts
+
+
+def rebuild_word_patterns(
+    word_id: int,
+    rows: List,
+    examples: Dict[int, List],
+    classifications: Dict[Tuple[str, str], Tuple[str, str]],
+    summary: ReclassificationSummary
+) -> Optional[List[Dict]]:
+    """
+    Build a word's new pattern rows from its current ones
+
+    Returns:
+        Optional[List[Dict]]: Rows to insert, each with its "examples" as
+            {spelling: (count, last seen)}, or None if nothing changed
+    """
+    patterns: Dict[Tuple[str, str], Dict] = {}
+    changed = False
+    for row in rows:
+        row_examples = examples.get(row.id, [])
+        # Nothing to reclassify; keep the pattern as it is
+        assignments = (
+            [((row.pattern_type, row.description), example, count)
+             for example, count in zip(
+                 row_examples, assign_frequency(row.frequency, [e.count for e in row_examples])
+             )]
+            if row_examples else [((row.pattern_type, row.description), None, row.frequency or 0)]
+        )
+        last_seen = row.updated_at or row.created_at
+        for key, example, count in assignments:
+            if example is not None:
+                key = classifications[(row.word, example.spelling)]
+                summary.attempts += 1
+                if key != (row.pattern_type, row.description):
+                    changed = True
+                    summary.attempts_moved += 1
+                    summary.transitions[(row.pattern_type, key[0])] += 1
+
+            pattern = patterns.get(key)
+            if pattern is None:
+                pattern = patterns[key] = {
+                    "word_id": word_id,
+                    "pattern_type": key[0],
+                    "description": key[1],
+                    "frequency": 0,
+                    "examples": {},
+                    "created_at": row.created_at,
+                    "updated_at": last_seen,
+                }
+            pattern["frequency"] += count
+            if example is not None:
+                seen_count, seen_at = pattern["examples"].get(example.spelling, (0, example.last_seen))
+                pattern["examples"][example.spelling] = (seen_count + count, max(seen_at, example.last_seen))
+            if row.created_at and (pattern["created_at"] is None or row.created_at < pattern["created_at"]):
+                pattern["created_at"] = row.created_at
+            if last_seen and (pattern["updated_at"] is None or last_seen > pattern["updated_at"]):
+                pattern["updated_at"] = last_seen
+
+    summary.words += 1
+    summary.patterns_before += len(rows)
+    summary.patterns_after += len(patterns)
+    if not changed and len(patterns) == len(rows):
+        return None
+    summary.words_changed += 1
+    return list(patterns.values())
+
+
+async def replace_word_patterns(db: AsyncSession, word_ids: List[int], patterns: List[Dict]) -> None:
+    """Replace the pattern rows of words, keeping each pattern's most recent examples"""
+    # Foreign keys aren't enforced by SQLite, so examples are removed explicitly
+    old_patterns = select(MistakePattern.id).where(MistakePattern.word_id.in_(word_ids))
+    await db.execute(delete(MistakeExample).where(MistakeExample.pattern_id.in_(old_patterns)))
+    await db.execute(delete(MistakePattern).where(MistakePattern.word_id.in_(word_ids)))
+
+    result = await db.execute(
+        insert(MistakePattern).returning(MistakePattern.id, sort_by_parameter_order=True),
+        [{name: value for name, value in pattern.items() if name != "examples"} for pattern in patterns]
+    )
+    example_rows = []
+    for pattern_id, pattern in zip(result.scalars().all(), patterns):
+        recent = sorted(pattern["examples"].items(), key=lambda item: item[1][1])
+        for spelling, (count, last_seen) in recent[-settings.MISTAKE_PATTERN_MAX_EXAMPLES:]:
+            example_rows.append({
+                "pattern_id": pattern_id,
+                "spelling": spelling,
+                "count": count,
+                "last_seen": last_seen,
+            })
+    if example_rows:
+        await db.execute(insert(MistakeExample), example_rows)
+
+
+async def classify_in_pool(
+    executor: Executor,
+    attempts: List[Tuple[str, str]],
+    workers: int
+) -> Dict[Tuple[str, str], Tuple[str, str]]:
+    """Classify distinct attempts, split evenly over the pool's workers"""
+    loop = asyncio.get_running_loop()
+    chunk_size = max(1, -(-len(attempts) // workers))
+    chunks = [attempts[start:start + chunk_size] for start in range(0, len(attempts), chunk_size)]
+    results = await asyncio.gather(*(
+        loop.run_in_executor(executor, classify_attempts, chunk) for chunk in chunks
+    ))
+    return {
+        attempt: classification
+        for chunk, classifications in zip(chunks, results)
+        for attempt, classification in zip(chunk, classifications)
+    }
+
+
+async def reclassify_user(
+    db: AsyncSession,
+    user_id: int,
+    executor: Executor,
+    workers: int,
+    batch_size: int,
+    dry_run: bool = False
+) -> ReclassificationSummary:
+    """Rebuild all of a user's mistake patterns in one transaction"""
+    summary = ReclassificationSummary(users=1)
+    last_word_id = 0
+    while True:
+        # Pages are keyed by word id, so rows rewritten in this transaction are never read again
+        result = await db.execute(
+            select(MistakePattern.word_id)
+            .join(Word)
+            .join(WordList)
+            .where(WordList.owner_id == user_id, MistakePattern.word_id > last_word_id)
+            .distinct()
+            .order_by(MistakePattern.word_id)
+            .limit(batch_size)
+        )
+        word_ids = list(result.scalars().all())
+        if not word_ids:
+            break
+        last_word_id = word_ids[-1]
+
+        result = await db.execute(
+            select(
+                MistakePattern.id,
+                MistakePattern.word_id,
+                Word.word,
+                MistakePattern.pattern_type,
+                MistakePattern.description,
+                MistakePattern.frequency,
+                MistakePattern.created_at,
+                MistakePattern.updated_at
+            )
+            .join(Word)
+            .where(MistakePattern.word_id.in_(word_ids))
+            .order_by(MistakePattern.word_id, MistakePattern.id)
+        )
+        rows_by_word: Dict[int, List] = {}
+        for row in result.all():
+            rows_by_word.setdefault(row.word_id, []).append(row)
+
+        result = await db.execute(
+            select(
+                MistakeExample.pattern_id,
+                MistakeExample.spelling,
+                MistakeExample.count,
+                MistakeExample.last_seen
+            )
+            .join(MistakePattern)
+            .where(MistakePattern.word_id.in_(word_ids))
+            .order_by(MistakeExample.pattern_id, MistakeExample.last_seen, MistakeExample.id)
+        )
+        examples: Dict[int, List] = {}
+        for example in result.all():
+            examples.setdefault(example.pattern_id, []).append(example)
+
+        attempts = list(dict.fromkeys(
+            (row.word, example.spelling)
+            for rows in rows_by_word.values()
+            for row in rows
+            for example in examples.get(row.id, [])
+        ))
+        classifications = await classify_in_pool(executor, attempts, workers)
+
+        replacements = []
+        changed_word_ids = []
+        for word_id, rows in rows_by_word.items():
+            patterns = rebuild_word_patterns(word_id, rows, examples, classifications, summary)
+            if patterns is not None:
+                changed_word_ids.append(word_id)
+                replacements.extend(patterns)
+
+        if changed_word_ids and not dry_run:
+            await replace_word_patterns(db, changed_word_ids, replacements)
+
+    if summary.words_changed:
+        summary.users_changed = 1
+        if not dry_run:
+            await db.execute(
+                update(MistakeAnalysis)
+                .where(MistakeAnalysis.user_id == user_id)
+                .values(status="pending", version=MistakeAnalysis.version + 1)
+            )
+    if dry_run:
+        await db.rollback()
+    else:
+        await db.commit()
+    return summary
+
+
+async def reclassify_all(
+    workers: int = None,
+    batch_size: int = None,
+    dry_run: bool = False
+) -> ReclassificationSummary:
+    """Reclassify every user's mistake patterns with the current MistakePatternService"""
+    workers = workers or settings.MISTAKE_RECLASSIFY_WORKERS
+    batch_size = batch_size or settings.MISTAKE_RECLASSIFY_BATCH_SIZE
+    summary = ReclassificationSummary()
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(User.id).order_by(User.id))
+        user_ids = list(result.scalars().all())
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for user_id in user_ids:
+            async with AsyncSessionLocal() as session:
+                try:
+                    user_summary = await reclassify_user(
+                        session, user_id, executor, workers, batch_size, dry_run
+                    )
+                except Exception as e:
+                    # The user's transaction is rolled back; their patterns stay as they were
+                    await session.rollback()
+                    logger.error(f"Error reclassifying mistake patterns of user {user_id}: {str(e)}")
+                    summary.users += 1
+                    summary.users_failed += 1
+                    continue
+            summary.add(user_summary)
+            if user_summary.words_changed:
+                logger.info(
+                    f"User {user_id}: {user_summary.attempts_moved} of {user_summary.attempts} attempts "
+                    f"reclassified in {user_summary.words_changed} words"
+                )
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reclassify stored mistake patterns with the current rules")
+    parser.add_argument("--workers", type=int, default=settings.MISTAKE_RECLASSIFY_WORKERS, help="Analysis processes")
+    parser.add_argument("--batch-size", type=int, default=settings.MISTAKE_RECLASSIFY_BATCH_SIZE, help="Words per batch")
+    parser.add_argument("--dry-run", action="store_true", help="Report the changes without storing them")
+    parser.add_argument("--top", type=int, default=10, help="Pattern type changes to list")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    summary = asyncio.run(reclassify_all(args.workers, args.batch_size, args.dry_run))
+    print(f"Users: {summary.users} ({summary.users_changed} changed, {summary.users_failed} failed)")
+    print(f"Words: {summary.words} ({summary.words_changed} changed)")
+    print(f"Patterns: {summary.patterns_before} -> {summary.patterns_after}")
+    print(f"Attempts: {summary.attempts} ({summary.attempts_moved} moved to another pattern)")
+    for (old_type, new_type), count in summary.transitions.most_common(args.top):
+        print(f"  {old_type} -> {new_type}: {count}")
+    if args.dry_run:
+        print("Dry run, nothing was stored")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+import asyncio
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when too many password checks are already waiting, or one waited too long"""
+
+
+class PasswordHasher:
+    """
+    Bcrypt hashing and verification off the event loop.
+
+    Each hash or check costs a few hundred milliseconds of CPU, so they run
+    in a small thread pool of their own (bcrypt releases the GIL while it
+    works) and never on the loop or in the default executor the dictionary
+    lookups use. A semaphore lets as many calls in as there are threads;
+    up to max_pending more wait for a slot, for at most max_wait_seconds,
+    and the rest are turned away with PasswordHasherBusyError, so a login
+    burst queues or sheds instead of piling up work nobody waits for.
+
+    New hashes use the configured number of rounds. A hash with fewer
+    rounds still verifies, and verify returns its replacement so the caller
+    can store the upgraded hash.
+    """
+
+    def __init__(self, rounds: int = 12, workers: int = 2, max_pending: int = 32, max_wait_seconds: float = 5.0):
+        self.context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=rounds,
+            bcrypt__min_rounds=rounds  # Hashes below this need an update
+        )
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_wait_seconds = max_wait_seconds
+        self._semaphore = asyncio.Semaphore(workers)
+        self._pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Created on first use so the threads only exist in processes that check passwords
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hasher")
+        return self._executor
+
+    async def _run(self, function: Callable[..., T], *args) -> T:
+        if self._pending >= self.max_pending:
+            raise PasswordHasherBusyError(f"{self._pending} password checks already waiting")
+        self._pending += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            raise PasswordHasherBusyError(f"No free password hashing slot within {self.max_wait_seconds}s")
+        finally:
+            self._pending -= 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+        finally:
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        """Hash a password"""
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password against its hash
+
+        Returns:
+            Whether the password matches, and a new hash to store if the old
+            one uses fewer rounds than configured
+        """
+        return await self._run(self.context.verify_and_update, password, hashed_password)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Create singleton instance
+password_hasher = PasswordHasher(
+    rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    max_wait_seconds=settings.PASSWORD_HASH_MAX_WAIT_SECONDS
+)
@@ -0,0 +1,141 @@
+"""
+Phonetic keys for telling sound-alike spellings from typos.
+
+A Metaphone-style key: letters are mapped to the consonant sounds they
+stand for, silent letters are dropped and a sound written twice in a row
+counts once. Unlike Metaphone, which drops vowels, every run of vowels is
+kept as one 'A', so dropping or adding a syllable changes the key but
+writing a vowel sound with other vowels doesn't. Spellings that sound the
+same share a key ('necessary' and 'nessesary' are both NASASARA). Keys of
+correct spellings are stored with each word; an attempt's key is computed
+in a single pass.
+"""
+import re
+from typing import Optional
+
+VOWELS = frozenset('aeiou')
+FRONT_VOWELS = frozenset('eiy')  # Soften c and g
+# Letters after which an h is silent or part of a digraph
+H_DIGRAPHS = frozenset('csptgr')
+# First two letters of which the first is silent
+SILENT_STARTS = ('kn', 'gn', 'pn', 'ae', 'wr')
+
+_NOT_LETTERS = re.compile('[^a-z]+')
+# Letters that sound as they are written
+_PLAIN = {letter: letter.upper() for letter in 'fjlmnr'}
+
+
+def _simplify(word: str) -> str:
+    """Lowercase letters only, without repeats of the same letter except 'cc'"""
+    letters = []
+    previous = ''
+    for letter in _NOT_LETTERS.sub('', word.lower()):
+        # 'cc' can be two sounds (accident)
+        if letter != previous or letter == 'c':
+            letters.append(letter)
+        previous = letter
+    text = ''.join(letters)
+
+    if text[:2] in SILENT_STARTS:
+        return text[1:]
+    if text[:1] == 'x':
+        return 's' + text[1:]
+    if text[:2] == 'wh':
+        return 'w' + text[2:]
+    return text
+
+
+def phonetic_key(word: str) -> str:
+    """Get the phonetic key of a spelling"""
+    text = _simplify(word)
+    length = len(text)
+    key = []
+    for index, letter in enumerate(text):
+        previous = text[index - 1] if index else ''
+        following = text[index + 1] if index + 1 < length else ''
+        after = text[index + 2] if index + 2 < length else ''
+
+        if letter in VOWELS:
+            # One marker per run of vowels, none for a final silent e
+            if previous not in VOWELS and not (letter == 'e' and index == length - 1 and index > 1):
+                key.append('A')
+        elif letter in _PLAIN:
+            key.append(_PLAIN[letter])
+        elif letter == 'b':
+            # Silent in a final 'mb' (lamb, climb)
+            if not (previous == 'm' and index == length - 1):
+                key.append('B')
+        elif letter == 'c':
+            if following == 'i' and after == 'a':
+                key.append('X')
+            elif following == 'h':
+                key.append('K' if previous == 's' else 'X')
+            elif following in FRONT_VOWELS:
+                # Silent in 'sce', 'sci' and 'scy' (scene, science)
+                if previous != 's':
+                    key.append('S')
+            else:
+                key.append('K')
+        elif letter == 'd':
+            key.append('J' if following == 'g' and after in FRONT_VOWELS else 'T')
+        elif letter == 'g':
+            if previous == 'd' and following in FRONT_VOWELS:
+                continue  # Part of 'dge' (judge)
+            if following == 'h' and after not in VOWELS:
+                continue  # Silent 'gh' (night, though)
+            if following == 'n' and (index + 2 == length or (text[index + 2:] == 'ed')):
+                continue  # Silent in a final 'gn' or 'gned' (sign, signed)
+            key.append('J' if following in FRONT_VOWELS else 'K')
+        elif letter == 'h':
+            # Part of a digraph, or silent after a vowel (oh, ahmed)
+            if previous not in H_DIGRAPHS and not (previous in VOWELS and following not in VOWELS):
+                key.append('H')
+        elif letter == 'k':
+            if previous != 'c':
+                key.append('K')
+        elif letter == 'p':
+            key.append('F' if following == 'h' else 'P')
+        elif letter == 'q':
+            key.append('K')
+        elif letter == 's':
+            if following == 'h' or (following == 'i' and after in ('o', 'a')):
+                key.append('X')
+            else:
+                key.append('S')
+        elif letter == 't':
+            if following == 'i' and after in ('o', 'a'):
+                key.append('X')
+            elif following == 'h':
+                key.append('0')  # 'th'
+            elif not (following == 'c' and after == 'h'):
+                key.append('T')
+        elif letter == 'v':
+            key.append('F')
+        elif letter in 'wy':
+            if following in VOWELS:
+                key.append(letter.upper())
+            elif letter == 'y' and index and previous not in VOWELS:
+                key.append('A')  # Sounds as a vowel (rhythm, happy)
+        elif letter == 'x':
+            key.append('KS')
+        elif letter == 'z':
+            key.append('S')
+
+    # A sound written twice in a row is heard once (accommodate, necessary)
+    sounds = []
+    for sound in ''.join(key):
+        if not sounds or sounds[-1] != sound:
+            sounds.append(sound)
+    return ''.join(sounds)
+
+
+def sounds_alike(correct: str, attempt: str, correct_key: Optional[str] = None) -> bool:
+    """
+    Whether an attempt sounds like the correct spelling
+
+    Args:
+        correct: The correct spelling
+        attempt: The attempted spelling
+        correct_key: The stored key of the correct spelling, if known
+    """
+    return phonetic_key(attempt) == (correct_key if correct_key is not None else phonetic_key(correct))
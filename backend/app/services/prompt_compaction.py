@@ -0,0 +1,103 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English text, about four characters per token"""
+    return max(1, len(text) // 4)
+
+
+def format_pattern(pattern: Dict) -> str:
+    """Format one mistake pattern as a block of the analysis prompt"""
+    return (
+        f"Type: {pattern['pattern_type']}\n"
+        f"Description: {pattern['description']}\n"
+        f"Frequency: {pattern['frequency']}\n"
+        f"Examples: {', '.join(pattern['examples'])}\n"
+    )
+
+
+@dataclass
+class CompactedPatterns:
+    patterns: List[Dict] = field(default_factory=list)
+    omitted_patterns: int = 0  # Patterns left out by the top-K cut or the token budget
+    omitted_mistakes: int = 0  # Summed frequency of the omitted patterns
+
+
+def compact_patterns(
+    patterns: List[Dict],
+    top_k: int,
+    max_examples: int,
+    token_budget: int,
+    half_life_days: float,
+    now: Optional[datetime] = None
+) -> CompactedPatterns:
+    """
+    Reduce mistake patterns to a bounded prompt-ready summary.
+
+    Patterns with the same type and description (e.g. from different words)
+    are merged. They are ranked by frequency, decayed by how long ago they
+    were last seen, and the top K are kept with at most max_examples of
+    their most recent examples each, for as long as they fit in token_budget.
+
+    Args:
+        patterns: Dicts with pattern_type, description, frequency, examples
+            and optionally last_seen
+        top_k: Most patterns to keep
+        max_examples: Most examples to keep per pattern
+        token_budget: Estimated tokens the formatted patterns may take
+        half_life_days: Age at which a pattern counts half as much
+        now: Reference time for the recency decay
+
+    Returns:
+        CompactedPatterns: Kept patterns, best first, and what was left out
+    """
+    groups: Dict[tuple, List[Dict]] = {}
+    for pattern in patterns:
+        groups.setdefault((pattern["pattern_type"], pattern["description"]), []).append(pattern)
+
+    merged = []
+    for (pattern_type, description), group in groups.items():
+        # Oldest first, so the most recent examples end up last
+        group.sort(key=lambda p: p.get("last_seen") or datetime.min)
+        examples = [example for p in group for example in p["examples"]]
+        latest_first = list(dict.fromkeys(reversed(examples)))
+        merged.append({
+            "pattern_type": pattern_type,
+            "description": description,
+            "frequency": sum(p["frequency"] or 0 for p in group),
+            "examples": latest_first[::-1],
+            "last_seen": group[-1].get("last_seen"),
+        })
+
+    def score(entry: Dict) -> float:
+        if now is None or entry["last_seen"] is None:
+            return entry["frequency"]
+        age_days = max(0.0, (now - entry["last_seen"]).total_seconds() / 86400)
+        return entry["frequency"] * 0.5 ** (age_days / half_life_days)
+
+    ranked = sorted(merged, key=lambda entry: (-score(entry), entry["pattern_type"], entry["description"]))
+
+    result = CompactedPatterns()
+    used = 0
+    for entry in ranked:
+        if len(result.patterns) < top_k:
+            # Examples are appended chronologically; keep the latest ones
+            candidate = {
+                "pattern_type": entry["pattern_type"],
+                "description": entry["description"],
+                "frequency": entry["frequency"],
+                "examples": entry["examples"][-max_examples:] if max_examples > 0 else [],
+            }
+            cost = estimate_tokens(format_pattern(candidate))
+            if used + cost > token_budget and result.patterns:
+                candidate["examples"] = candidate["examples"][-1:]
+                cost = estimate_tokens(format_pattern(candidate))
+            if used + cost <= token_budget or not result.patterns:
+                result.patterns.append(candidate)
+                used += cost
+                continue
+        result.omitted_patterns += 1
+        result.omitted_mistakes += entry["frequency"]
+    return result
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.models import ReviewEvent, Word
+
+logger = logging.getLogger(__name__)
+
+
+class ReviewEventService:
+    """
+    Service for the append-only review event log.
+
+    Submit handlers only enqueue events; a background task writes them in
+    batches of up to `batch_size` rows, or after `flush_interval_ms`
+    milliseconds, so the hot path pays no extra commit.
+    """
+
+    def __init__(self, batch_size: int = 200, flush_interval_ms: int = 500, max_pending: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        user_id: int,
+        word: Word,
+        correct: bool,
+        user_spelling: str,
+        old_level: int,
+        reviewed_at: datetime,
+        latency_ms: Optional[int] = None,
+        new_level: Optional[int] = None
+    ) -> None:
+        """
+        Queue an attempt for writing; call after the attempt's transaction committed.
+        
+        new_level defaults to the word's current SRS level.
+        """
+        event = {
+            "user_id": user_id,
+            "word_id": word.id,
+            "reviewed_at": reviewed_at,
+            "correct": correct,
+            "user_spelling": user_spelling,
+            "latency_ms": latency_ms,
+            "old_level": old_level,
+            "new_level": word.srs_level if new_level is None else new_level,
+        }
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning(f"Review event queue full, dropping event for word {word.id}")
+
+    async def start(self) -> None:
+        """Start the background writer"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background writer after flushing whatever is still queued"""
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+            self._task = None
+
+    async def get_events(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 1000
+    ) -> List[ReviewEvent]:
+        """Get a user's review events in a time range, oldest first"""
+        query = select(ReviewEvent).where(ReviewEvent.user_id == user_id)
+        if start is not None:
+            query = query.where(ReviewEvent.reviewed_at >= start)
+        if end is not None:
+            query = query.where(ReviewEvent.reviewed_at < end)
+        query = query.order_by(ReviewEvent.reviewed_at, ReviewEvent.id).limit(limit)
+
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            # Wait for the first event, then collect until the batch is full or the deadline passes
+            batch = []
+            event = await self._queue.get()
+            deadline = loop.time() + self.flush_interval
+            while event is not None:
+                batch.append(event)
+                timeout = deadline - loop.time()
+                if len(batch) >= self.batch_size or timeout <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                # A None event is the shutdown signal, queued after every pending event
+                stopping = True
+
+            if batch:
+                await self._write(batch)
+
+    async def _write(self, batch: List[Dict]) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(insert(ReviewEvent), batch)
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} review events: {str(e)}")
+
+
+# Create singleton instance
+review_event_service = ReviewEventService(
+    batch_size=settings.REVIEW_EVENT_BATCH_SIZE,
+    flush_interval_ms=settings.REVIEW_EVENT_FLUSH_MS
+)
@@ -0,0 +1,279 @@
+"""
+Alignment of a misspelling against the correct spelling.
+
+A weighted Damerau-Levenshtein (optimal string alignment) distance where
+the edits people actually make are cheap: swapping letters that sound
+alike or sit next to each other on the keyboard, doubling or undoubling a
+letter, and swapping two neighbouring letters. The result is an edit
+script of typed operations that the mistake classifier reads.
+
+Most attempts are a single edit away from the word, which is confirmed
+without a table. The rest differ in a few letters in the middle; the
+same confusions ('ph' for 'f', 'sion' for 'tion') come up again and
+again, so the table for each middle is computed once and cached.
+"""
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Tuple
+
+INSERT_COST = 1.0
+DELETE_COST = 1.0
+SUBSTITUTE_COST = 1.0
+DOUBLING_COST = 0.5  # Adding or dropping a copy of a neighbouring letter
+PHONETIC_COST = 0.5  # Substituting a letter that sounds alike
+KEYBOARD_COST = 0.6  # Substituting a letter from a neighbouring key
+TRANSPOSE_COST = 0.7
+
+# Letters that stand for the same or a similar sound
+PHONETIC_GROUPS = ("aeiouy", "ckqs", "csz", "fv", "gj", "mn", "bp", "dt", "xz")
+
+KEYBOARD_ROWS = ("qwertyuiop", "asdfghjkl", "zxcvbnm")
+KEYBOARD_ROW_OFFSETS = (0.0, 0.25, 0.75)
+
+
+class EditOp(NamedTuple):
+    """One edit turning the correct spelling into the attempt"""
+    kind: str  # 'substitute', 'insert', 'delete' or 'transpose'
+    i: int  # Position in the correct spelling
+    j: int  # Position in the attempt
+    source: str  # Letters of the correct spelling involved ('' for inserts)
+    target: str  # Letters of the attempt involved ('' for deletes)
+    cost: float
+
+
+# Builds an EditOp from a tuple in C, skipping the namedtuple's Python __new__
+_new_op = tuple.__new__
+
+MIDDLE_CACHE_SIZE = 4096
+
+
+def _build_phonetic_pairs() -> frozenset:
+    return frozenset(
+        (a, b) for group in PHONETIC_GROUPS for a in group for b in group if a != b
+    )
+
+
+def _build_keyboard_pairs() -> frozenset:
+    positions = {
+        key: (row, column + KEYBOARD_ROW_OFFSETS[row])
+        for row, keys in enumerate(KEYBOARD_ROWS)
+        for column, key in enumerate(keys)
+    }
+    return frozenset(
+        (a, b)
+        for a, (row_a, x_a) in positions.items()
+        for b, (row_b, x_b) in positions.items()
+        if a != b and abs(row_a - row_b) <= 1 and abs(x_a - x_b) < 1.0 + (row_a == row_b)
+    )
+
+
+PHONETIC_PAIRS = _build_phonetic_pairs()
+KEYBOARD_PAIRS = _build_keyboard_pairs()
+
+SUBSTITUTION_COSTS: Dict[Tuple[str, str], float] = {
+    **{pair: KEYBOARD_COST for pair in KEYBOARD_PAIRS},
+    **{pair: PHONETIC_COST for pair in PHONETIC_PAIRS},
+}
+
+
+_substitution_cost = SUBSTITUTION_COSTS.get
+
+
+def is_phonetic_pair(a: str, b: str) -> bool:
+    return (a, b) in PHONETIC_PAIRS
+
+
+def is_keyboard_pair(a: str, b: str) -> bool:
+    return (a, b) in KEYBOARD_PAIRS
+
+
+def is_doubled(word: str, index: int) -> bool:
+    """Whether the letter at index repeats one of its neighbours"""
+    letter = word[index]
+    return (index > 0 and word[index - 1] == letter) or (index + 1 < len(word) and word[index + 1] == letter)
+
+
+def _delete_op(correct: str, i: int, j: int) -> EditOp:
+    return EditOp('delete', i, j, correct[i], '', DOUBLING_COST if is_doubled(correct, i) else DELETE_COST)
+
+
+def _insert_op(attempt: str, i: int, j: int) -> EditOp:
+    return EditOp('insert', i, j, '', attempt[j], DOUBLING_COST if is_doubled(attempt, j) else INSERT_COST)
+
+
+def _substitute_op(correct: str, attempt: str, i: int, j: int) -> EditOp:
+    source, target = correct[i], attempt[j]
+    return EditOp('substitute', i, j, source, target, SUBSTITUTION_COSTS.get((source, target), SUBSTITUTE_COST))
+
+
+def align(correct: str, attempt: str) -> List[EditOp]:
+    """
+    Align an attempt with the correct spelling
+
+    Returns:
+        List[EditOp]: The cheapest edits turning correct into attempt, in
+            order; empty if the spellings are equal
+    """
+    if correct == attempt:
+        return []
+    length = len(correct)
+    difference = len(attempt) - length
+
+    # Letters both spellings share at the start are matched as they are. An
+    # index loop is cheaper than zip here; it stops at the end of the
+    # shorter spelling with an IndexError.
+    start = 0
+    try:
+        while correct[start] == attempt[start]:
+            start += 1
+    except IndexError:
+        pass
+
+    # Fast path: a single edit at the first difference, checked by comparing
+    # the rest of both spellings at once instead of aligning them. The edits
+    # are built inline; this path handles most attempts.
+    if difference == 0:
+        source, target = correct[start], attempt[start]
+        # Swapped neighbours rule out a substitution, so they are checked first
+        if start + 1 < length and correct[start + 1] == target and attempt[start + 1] == source:
+            if correct.endswith(attempt[start + 2:]):
+                return [_new_op(EditOp, (
+                    'transpose', start, start, source + target, target + source, TRANSPOSE_COST
+                ))]
+        elif correct.endswith(attempt[start + 1:]):
+            return [_new_op(EditOp, (
+                'substitute', start, start, source, target, _substitution_cost((source, target), SUBSTITUTE_COST)
+            ))]
+    elif difference == -1:
+        if correct.endswith(attempt[start:]):
+            letter = correct[start]
+            doubled = (start > 0 and correct[start - 1] == letter) or (start + 1 < length and correct[start + 1] == letter)
+            return [_new_op(EditOp, ('delete', start, start, letter, '', DOUBLING_COST if doubled else DELETE_COST))]
+    elif difference == 1:
+        if attempt.endswith(correct[start:]):
+            letter = attempt[start]
+            doubled = (start > 0 and attempt[start - 1] == letter) or (start < length and attempt[start + 1] == letter)
+            return [_new_op(EditOp, ('insert', start, start, '', letter, DOUBLING_COST if doubled else INSERT_COST))]
+
+    # Letters shared at the end are matched too, which leaves a few
+    # letters in the middle to align
+    correct_end = length
+    attempt_end = len(attempt)
+    while (
+        correct_end > start and attempt_end > start
+        and correct[correct_end - 1] == attempt[attempt_end - 1]
+    ):
+        correct_end -= 1
+        attempt_end -= 1
+
+    # The middle's costs only depend on its letters and their neighbours, so
+    # it is aligned in a window with one letter of context on each side
+    offset = 1 if start else 0
+    window = start - offset
+    return list(_align_window(
+        correct[window:correct_end + 1], attempt[window:attempt_end + 1],
+        window, offset, correct_end - start, attempt_end - start
+    ))
+
+
+@lru_cache(maxsize=MIDDLE_CACHE_SIZE)
+def _align_window(
+    correct: str, attempt: str, window: int, start: int, rows: int, columns: int
+) -> Tuple[EditOp, ...]:
+    """Align the middle of a window that starts at `window` in both spellings"""
+    script = _align_middle(correct, attempt, start, start + rows, start + columns)
+    return tuple(
+        _new_op(EditOp, (op.kind, op.i + window, op.j + window, op.source, op.target, op.cost))
+        for op in script
+    )
+
+
+# Back-pointers of the alignment table
+_MATCH, _SUBSTITUTE, _DELETE, _INSERT, _TRANSPOSE = range(5)
+
+
+def _align_middle(correct: str, attempt: str, start: int, correct_end: int, attempt_end: int) -> List[EditOp]:
+    """Weighted optimal string alignment of correct[start:correct_end] with attempt[start:attempt_end]"""
+    rows = correct_end - start
+    columns = attempt_end - start
+    # Runs of letters only left out or only added need no table
+    if columns == 0:
+        return [_delete_op(correct, i, start) for i in range(start, correct_end)]
+    if rows == 0:
+        return [_insert_op(attempt, start, j) for j in range(start, attempt_end)]
+
+    source = correct[start:correct_end]
+    target = attempt[start:attempt_end]
+    delete_costs = [DOUBLING_COST if is_doubled(correct, i) else DELETE_COST for i in range(start, correct_end)]
+    insert_costs = [DOUBLING_COST if is_doubled(attempt, j) else INSERT_COST for j in range(start, attempt_end)]
+    substitution_costs = SUBSTITUTION_COSTS
+
+    # cost[r][c]: cheapest edits turning the first r middle letters of correct into the first c of attempt
+    cost = [[0.0] * (columns + 1) for _ in range(rows + 1)]
+    back = [[_INSERT] * (columns + 1) for _ in range(rows + 1)]
+    for c in range(1, columns + 1):
+        cost[0][c] = cost[0][c - 1] + insert_costs[c - 1]
+    for r in range(1, rows + 1):
+        cost[r][0] = cost[r - 1][0] + delete_costs[r - 1]
+        back[r][0] = _DELETE
+
+    for r in range(1, rows + 1):
+        letter = source[r - 1]
+        previous_row, row, back_row = cost[r - 1], cost[r], back[r]
+        delete_cost = delete_costs[r - 1]
+        for c in range(1, columns + 1):
+            other = target[c - 1]
+            if letter == other:
+                best, move = previous_row[c - 1], _MATCH
+            else:
+                best, move = previous_row[c - 1] + substitution_costs.get((letter, other), SUBSTITUTE_COST), _SUBSTITUTE
+            candidate = previous_row[c] + delete_cost
+            if candidate < best:
+                best, move = candidate, _DELETE
+            candidate = row[c - 1] + insert_costs[c - 1]
+            if candidate < best:
+                best, move = candidate, _INSERT
+            if (
+                r > 1 and c > 1 and letter == target[c - 2] and source[r - 2] == other and letter != other
+                and cost[r - 2][c - 2] + TRANSPOSE_COST < best
+            ):
+                best, move = cost[r - 2][c - 2] + TRANSPOSE_COST, _TRANSPOSE
+            row[c] = best
+            back_row[c] = move
+
+    # Walk back from the end, collecting the edits
+    script = []
+    r, c = rows, columns
+    while r > 0 or c > 0:
+        move = back[r][c]
+        i, j = start + r - 1, start + c - 1
+        if move == _MATCH:
+            r, c = r - 1, c - 1
+        elif move == _SUBSTITUTE:
+            script.append(_substitute_op(correct, attempt, i, j))
+            r, c = r - 1, c - 1
+        elif move == _DELETE:
+            script.append(EditOp('delete', i, j + 1, correct[i], '', delete_costs[r - 1]))
+            r -= 1
+        elif move == _INSERT:
+            script.append(EditOp('insert', i + 1, j, '', attempt[j], insert_costs[c - 1]))
+            c -= 1
+        else:
+            script.append(EditOp('transpose', i - 1, j - 1, correct[i - 1:i + 1], attempt[j - 1:j + 1], TRANSPOSE_COST))
+            r, c = r - 2, c - 2
+    script.reverse()
+    return script
+
+
+def group_edits(script: List[EditOp]) -> List[List[EditOp]]:
+    """Group edits that touch each other, e.g. the two edits turning 'ph' into 'f'"""
+    if not script:
+        return []
+
+    groups = [[script[0]]]
+    for op in script[1:]:
+        previous = groups[-1][-1]
+        if op.i <= previous.i + len(previous.source):
+            groups[-1].append(op)
+        else:
+            groups.append([op])
+    return groups
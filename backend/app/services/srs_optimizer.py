@@ -0,0 +1,329 @@
+"""
+Offline optimizer for the SRS review intervals.
+
+Fits an exponential forgetting curve, p(recall) = exp(-t / S), to the
+review event log for every SRS level, then picks the interval at which
+recall drops to the target retention. Users with enough history also get
+a personal multiplier on those intervals. Results are stored as a new,
+active SRSParameterSet that SRSService loads.
+
+Every server process runs the periodic loop, but only the one holding the
+"srs_optimizer" job lease fits and stores a new set; the others pick it up
+through SRSService.run_parameter_refresh.
+
+Run it from the backend directory:
+
+    python -m app.services.srs_optimizer --target-retention 0.9
+"""
+import argparse
+import asyncio
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, ReadOnlySessionLocal
+from app.models.models import ReviewEvent, SRSParameterSet, SRSUserParameter
+from app.services.job_lease_service import job_lease_service
+from app.services.srs_service import SRSService, srs_service
+
+logger = logging.getLogger(__name__)
+
+LEVELS = 6
+MAX_INTERVAL_HOURS = 24 * 365
+
+# Elapsed time bin edges in hours, log-spaced from 6 minutes to two years
+TIME_BIN_EDGES = np.geomspace(0.1, 24 * 730, 48)
+# Candidate memory stabilities in hours for the per-level fit
+STABILITY_GRID = np.geomspace(0.5, 24 * 3650, 400)
+# Candidate per-user multipliers on the level stabilities
+USER_SCALE_GRID = np.geomspace(0.25, 4.0, 33)
+
+
+class ReviewHistogram:
+    """
+    Success and trial counts per user, SRS level and elapsed-time bin.
+
+    Events must be added sorted by user, word and time. Chunks can be added
+    one after another; the last event of a chunk is carried over so the
+    interval spanning two chunks is not lost.
+    """
+
+    def __init__(self, levels: int = LEVELS):
+        self.levels = levels
+        self.bins = len(TIME_BIN_EDGES) + 1
+        self.trials = np.zeros((0, levels, self.bins))
+        self.successes = np.zeros((0, levels, self.bins))
+        self.elapsed = np.zeros((levels, self.bins))  # Summed hours, for the bin centers
+        self._last = None
+
+    @property
+    def sample_count(self) -> int:
+        return int(self.trials.sum())
+
+    def add(
+        self,
+        user_ids: np.ndarray,
+        word_ids: np.ndarray,
+        hours: np.ndarray,
+        correct: np.ndarray,
+        levels: np.ndarray
+    ) -> None:
+        """Add a chunk of events; each event after the first for a word is one sample"""
+        if len(user_ids) == 0:
+            return
+        if self._last is not None:
+            last_user, last_word, last_hours = self._last
+            user_ids = np.concatenate(([last_user], user_ids))
+            word_ids = np.concatenate(([last_word], word_ids))
+            hours = np.concatenate(([last_hours], hours))
+            correct = np.concatenate(([False], correct))
+            levels = np.concatenate(([0], levels))
+        self._last = (user_ids[-1], word_ids[-1], hours[-1])
+
+        # The level a word was at when reviewed decides which interval was tested
+        same_word = (user_ids[1:] == user_ids[:-1]) & (word_ids[1:] == word_ids[:-1])
+        elapsed = (hours[1:] - hours[:-1])[same_word]
+        users = user_ids[1:][same_word].astype(np.int64)
+        outcome = correct[1:][same_word].astype(float)
+        level = np.clip(levels[1:][same_word], 0, self.levels - 1).astype(np.int64)
+        if len(users) == 0:
+            return
+
+        time_bin = np.digitize(elapsed, TIME_BIN_EDGES)
+        self._grow(int(users.max()) + 1)
+
+        cells = (users * self.levels + level) * self.bins + time_bin
+        size = self.trials.size
+        self.trials += np.bincount(cells, minlength=size).reshape(self.trials.shape)
+        self.successes += np.bincount(cells, weights=outcome, minlength=size).reshape(self.trials.shape)
+
+        level_cells = level * self.bins + time_bin
+        self.elapsed += np.bincount(
+            level_cells, weights=elapsed, minlength=self.elapsed.size
+        ).reshape(self.elapsed.shape)
+
+    def _grow(self, user_capacity: int) -> None:
+        if user_capacity <= self.trials.shape[0]:
+            return
+        # Grow geometrically so sparse, increasing user ids don't reallocate per chunk
+        capacity = max(user_capacity, 2 * self.trials.shape[0])
+        padding = ((0, capacity - self.trials.shape[0]), (0, 0), (0, 0))
+        self.trials = np.pad(self.trials, padding)
+        self.successes = np.pad(self.successes, padding)
+
+
+@dataclass
+class FitResult:
+    intervals: List[int]
+    stabilities: List[Optional[float]]  # Fitted stability per level, None if not enough data
+    sample_count: int
+    user_scales: Dict[int, float] = field(default_factory=dict)
+
+
+def _log_likelihoods(successes: np.ndarray, failures: np.ndarray, ratio: np.ndarray) -> np.ndarray:
+    """Bernoulli log-likelihood terms for p = exp(-ratio), summed by the caller"""
+    ratio = np.maximum(ratio, 1e-9)
+    return successes * -ratio + failures * np.log(-np.expm1(-ratio))
+
+
+def fit_intervals(
+    histogram: ReviewHistogram,
+    target_retention: float,
+    default_intervals: Sequence[int],
+    min_samples: int,
+    min_user_samples: int
+) -> FitResult:
+    """
+    Fit per-level review intervals, and per-user scales, to a review histogram
+
+    Args:
+        histogram: Accumulated review outcomes
+        target_retention: Recall probability at which a word is due again
+        default_intervals: Intervals kept for levels without enough samples
+        min_samples: Samples needed before a level's interval is fitted
+        min_user_samples: Samples needed before a user gets their own scale
+
+    Returns:
+        FitResult: Intervals in hours per level, plus per-user multipliers
+    """
+    log_retention = -math.log(target_retention)
+    trials = histogram.trials.sum(axis=0)
+    successes = histogram.successes.sum(axis=0)
+    failures = trials - successes
+    centers = np.divide(
+        histogram.elapsed, trials, out=np.zeros_like(histogram.elapsed), where=trials > 0
+    )
+
+    # Log-likelihood of every candidate stability for every level at once
+    ratio = centers[:, :, None] / STABILITY_GRID[None, None, :]
+    scores = _log_likelihoods(successes[:, :, None], failures[:, :, None], ratio).sum(axis=1)
+    best = STABILITY_GRID[scores.argmax(axis=1)]
+
+    fitted = trials.sum(axis=1) >= min_samples
+    default_stabilities = np.asarray(default_intervals, dtype=float) / log_retention
+    stabilities = np.where(fitted, best, default_stabilities)
+
+    # Higher levels never come back sooner than lower ones
+    intervals = np.clip(np.rint(stabilities * log_retention), 1, MAX_INTERVAL_HOURS)
+    intervals = np.maximum.accumulate(intervals)
+
+    result = FitResult(
+        intervals=[int(interval) for interval in intervals],
+        stabilities=[float(s) if ok else None for s, ok in zip(best, fitted)],
+        sample_count=histogram.sample_count
+    )
+    if histogram.trials.shape[0] == 0:
+        return result
+
+    user_trials = histogram.trials.reshape(histogram.trials.shape[0], -1)
+    eligible = np.flatnonzero(user_trials.sum(axis=1) >= min_user_samples)
+    if len(eligible) == 0:
+        return result
+
+    user_successes = histogram.successes.reshape(user_trials.shape)[eligible]
+    user_failures = user_trials[eligible] - user_successes
+    user_scores = np.empty((len(eligible), len(USER_SCALE_GRID)))
+    for index, scale in enumerate(USER_SCALE_GRID):
+        ratio = (centers / (scale * stabilities[:, None])).ravel()
+        ratio = np.maximum(ratio, 1e-9)
+        user_scores[:, index] = user_successes @ -ratio + user_failures @ np.log(-np.expm1(-ratio))
+
+    best_scales = USER_SCALE_GRID[user_scores.argmax(axis=1)]
+    result.user_scales = {
+        int(user_id): round(float(scale), 3)
+        for user_id, scale in zip(eligible, best_scales)
+    }
+    return result
+
+
+async def load_review_histogram(db: AsyncSession, chunk_size: int = 100_000) -> ReviewHistogram:
+    """Stream the review event log into a histogram without loading it all at once"""
+    histogram = ReviewHistogram()
+    query = (
+        select(
+            ReviewEvent.user_id,
+            ReviewEvent.word_id,
+            func.julianday(ReviewEvent.reviewed_at) * 24.0,
+            ReviewEvent.correct,
+            ReviewEvent.old_level
+        )
+        .order_by(ReviewEvent.user_id, ReviewEvent.word_id, ReviewEvent.reviewed_at, ReviewEvent.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    result = await db.stream(query)
+    async for rows in result.partitions():
+        data = np.array(rows, dtype=float)
+        histogram.add(
+            user_ids=data[:, 0].astype(np.int64),
+            word_ids=data[:, 1].astype(np.int64),
+            hours=data[:, 2],
+            correct=data[:, 3] > 0,
+            levels=data[:, 4].astype(np.int64)
+        )
+    return histogram
+
+
+async def save_parameter_set(
+    db: AsyncSession,
+    fit: FitResult,
+    target_retention: float
+) -> SRSParameterSet:
+    """Store a fit as the new active, versioned parameter set"""
+    result = await db.execute(select(func.max(SRSParameterSet.version)))
+    version = (result.scalar() or 0) + 1
+
+    await db.execute(update(SRSParameterSet).values(is_active=False))
+    parameter_set = SRSParameterSet(
+        version=version,
+        intervals=fit.intervals,
+        target_retention=target_retention,
+        sample_count=fit.sample_count,
+        is_active=True
+    )
+    db.add(parameter_set)
+    await db.flush()
+
+    if fit.user_scales:
+        await db.execute(
+            insert(SRSUserParameter),
+            [
+                {"parameter_set_id": parameter_set.id, "user_id": user_id, "interval_scale": scale}
+                for user_id, scale in fit.user_scales.items()
+            ]
+        )
+    await db.commit()
+    return parameter_set
+
+
+async def optimize(target_retention: Optional[float] = None, dry_run: bool = False) -> FitResult:
+    """Fit intervals from the review event log and, unless dry_run, store them"""
+    target_retention = target_retention or settings.SRS_TARGET_RETENTION
+    # Read and write in separate sessions, so the fit doesn't hold the write lock
+    async with ReadOnlySessionLocal() as session:
+        histogram = await load_review_histogram(session)
+    fit = fit_intervals(
+        histogram,
+        target_retention,
+        SRSService.INTERVALS,
+        settings.SRS_OPTIMIZER_MIN_SAMPLES,
+        settings.SRS_OPTIMIZER_MIN_USER_SAMPLES
+    )
+    logger.info(
+        f"Fitted SRS intervals {fit.intervals} from {fit.sample_count} reviews "
+        f"({len(fit.user_scales)} user scales)"
+    )
+
+    if not dry_run and fit.sample_count > 0:
+        async with AsyncSessionLocal() as session:
+            parameter_set = await save_parameter_set(session, fit, target_retention)
+        logger.info(f"Stored SRS parameter set version {parameter_set.version}")
+    return fit
+
+
+async def run_periodically(interval_hours: int) -> None:
+    """Refit the intervals on a schedule in the process that holds the job lease"""
+    while True:
+        await asyncio.sleep(interval_hours * 3600)
+        try:
+            # The lease outlives one period so its holder renews it before it runs out
+            if not await job_lease_service.acquire("srs_optimizer", interval_hours * 3600 * 2):
+                continue
+            await optimize()
+            async with ReadOnlySessionLocal() as session:
+                await srs_service.load_parameters(session)
+        except Exception as e:
+            logger.error(f"Error optimizing SRS intervals: {str(e)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fit SRS review intervals from the review history")
+    parser.add_argument(
+        "--target-retention",
+        type=float,
+        default=settings.SRS_TARGET_RETENTION,
+        help="Recall probability at which a word becomes due"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Print the fit without storing it")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    async def run():
+        fit = await optimize(args.target_retention, args.dry_run)
+        print(f"Intervals (hours): {fit.intervals}")
+        print(f"Stabilities (hours): {fit.stabilities}")
+        print(f"Samples: {fit.sample_count}, user scales: {len(fit.user_scales)}")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
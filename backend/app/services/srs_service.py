@@ -1,13 +1,26 @@
+import asyncio
+import logging
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
+from typing import List, Dict, Sequence, Tuple, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_, func, desc, text
+from sqlalchemy import Float, and_, case, cast, func, desc, update
 from sqlalchemy.orm import joinedload
-from functools import lru_cache
+from sqlalchemy.orm.attributes import set_committed_value
 import json
+import random
 
-from app.models.models import Word, WordList
+from app.core.clock import get_clock
+from app.core.config import settings
+from app.core.database import ReadOnlySessionLocal
+from app.models.models import Word, WordList, SRSParameterSet, SRSUserParameter
+from app.services.stats_service import stats_service
+
+logger = logging.getLogger(__name__)
+
+class WordNotFoundError(Exception):
+    """Raised when an answered word was deleted before its answer was recorded"""
 
 class SRSService:
     """Service for managing spaced repetition learning"""
@@ -19,21 +32,62 @@ class SRSService:
     # Level 3: 72 hours (3 days)
     # Level 4: 168 hours (1 week)
     # Level 5: 720 hours (30 days)
+    # These defaults are replaced by the active fitted parameter set, if any
     INTERVALS = [4, 8, 24, 72, 168, 720]
     
-    # Cache for 1 hour
-    @lru_cache(maxsize=128)
-    def get_review_interval(self, level: int) -> int:
-        """Get the review interval in hours for a given SRS level"""
+    def __init__(self):
+        self.random = random.Random()  # Seed it for reproducible simulations
+        self.intervals = list(self.INTERVALS)
+        self.user_scales: Dict[int, float] = {}
+        self.parameter_version: Optional[int] = None
+    
+    def get_review_interval(self, level: int, user_id: Optional[int] = None) -> int:
+        """Get the review interval in hours for a given SRS level and user"""
         if level < 0:
             level = 0
-        elif level >= len(self.INTERVALS):
-            level = len(self.INTERVALS) - 1
-        return self.INTERVALS[level]
+        elif level >= len(self.intervals):
+            level = len(self.intervals) - 1
+        interval = self.intervals[level]
+        if user_id is not None:
+            interval = round(interval * self.user_scales.get(user_id, 1.0))
+        return max(1, int(interval))
+    
+    async def load_parameters(self, db: AsyncSession) -> None:
+        """Load the active fitted parameter set, keeping the defaults if there is none"""
+        result = await db.execute(
+            select(SRSParameterSet).where(SRSParameterSet.is_active == True)
+            .order_by(desc(SRSParameterSet.version)).limit(1)
+        )
+        parameter_set = result.scalar_one_or_none()
+        if parameter_set is None or parameter_set.version == self.parameter_version:
+            return
+        
+        result = await db.execute(
+            select(SRSUserParameter.user_id, SRSUserParameter.interval_scale)
+            .where(SRSUserParameter.parameter_set_id == parameter_set.id)
+        )
+        self.intervals = list(parameter_set.intervals)
+        self.user_scales = dict(result.all())
+        self.parameter_version = parameter_set.version
+
+    async def run_parameter_refresh(self, interval_minutes: int) -> None:
+        """Load the parameter set stored by whichever process runs the optimizer"""
+        while True:
+            await asyncio.sleep(interval_minutes * 60)
+            try:
+                async with ReadOnlySessionLocal() as session:
+                    await self.load_parameters(session)
+            except Exception as e:
+                logger.error(f"Error loading SRS parameters: {str(e)}")
+
+    def _shuffled(self, column):
+        """Pseudo-random SQL ordering drawn from self.random, so seeded runs repeat"""
+        modulus = 2**31 - 1
+        return (column * self.random.randrange(1, modulus) + self.random.randrange(modulus)) % modulus
 
     async def get_due_words(self, db: AsyncSession, user_id: int, limit: int = 20) -> List[Word]:
         """Get words that are due for review using an optimized query"""
-        current_time = datetime.utcnow()
+        current_time = get_clock().now()
         
         # Use a properly constructed SQLAlchemy query instead of raw SQL
         # First get due words
@@ -56,7 +110,7 @@ class SRSService:
                     Word.next_review == None,
                     Word.srs_level == 0
                 )
-            ).order_by(func.random()).limit(new_words_limit)
+            ).order_by(self._shuffled(Word.id)).limit(new_words_limit)
             
             new_result = await db.execute(new_query)
             new_words = new_result.scalars().all()
@@ -66,54 +120,126 @@ class SRSService:
         
         return list(due_words)
 
-    async def process_review_result(self, db: AsyncSession, word: Word, correct: bool) -> None:
-        """Process the result of a word review and update SRS accordingly"""
-        current_time = datetime.utcnow()
+    async def record_answer(
+        self,
+        db: AsyncSession,
+        word: Word,
+        correct: bool,
+        answered_at: datetime,
+        levels: Optional[Sequence[int]] = None,
+        intervals: Optional[Sequence[int]] = None,
+        familiar_min_level: int = 0
+    ) -> Tuple[int, Counter]:
+        """
+        Count an answer to a word with a single UPDATE ... RETURNING.
+        
+        The counters are incremented in SQL, so concurrent answers to the
+        same word never overwrite each other. `levels[old]` is the SRS level
+        the answer moves the word to from level `old`, and `intervals[new]`
+        the hours until its next review at level `new`; without them the
+        schedule is left alone. The update only matches while the word still
+        has the level and familiar flag `word` holds, so the stats delta is
+        exact; if another answer changed them first they are read again.
+        Raises WordNotFoundError if the word was deleted in the meantime.
+        
+        Returns:
+            Tuple[int, Counter]: The word's previous SRS level and the change in its
+            stats contribution, for the caller to apply in the same transaction.
+            `word` is updated with the stored values.
+        """
+        practice_count = func.coalesce(Word.practice_count, 0) + 1
+        correct_count = func.coalesce(Word.correct_count, 0) + (1 if correct else 0)
+        values = {
+            "practice_count": practice_count,
+            "correct_count": correct_count,
+            "incorrect_count": func.coalesce(Word.incorrect_count, 0) + (0 if correct else 1),
+            "last_practiced": answered_at,
+        }
+        
+        level = Word.srs_level
+        if levels is not None:
+            level = case(dict(enumerate(levels)), value=Word.srs_level, else_=Word.srs_level)
+            values["srs_level"] = level
+        if intervals is not None:
+            values["review_interval"] = case(dict(enumerate(intervals)), value=level)
+            values["next_review"] = case(
+                {new_level: answered_at + timedelta(hours=hours) for new_level, hours in enumerate(intervals)},
+                value=level
+            )
+        
+        # Familiarity is only ever gained, once the word is practiced enough and mostly right
+        familiar = [
+            practice_count >= settings.MIN_PRACTICE_COUNT,
+            cast(correct_count, Float) / practice_count >= settings.MIN_ACCURACY,
+        ]
+        if familiar_min_level:
+            familiar.append(level >= familiar_min_level)
+        values["familiar"] = case((and_(*familiar), True), else_=Word.familiar)
+        
+        columns = [
+            Word.practice_count, Word.correct_count, Word.incorrect_count, Word.srs_level,
+            Word.review_interval, Word.next_review, Word.last_practiced, Word.familiar
+        ]
+        old_level, old_familiar = word.srs_level, word.familiar
+        while True:
+            result = await db.execute(
+                update(Word)
+                .where(Word.id == word.id, Word.srs_level == old_level, Word.familiar == old_familiar)
+                .values(values)
+                .returning(*columns)
+                .execution_options(synchronize_session=False)
+            )
+            row = result.first()
+            if row is not None:
+                break
+            result = await db.execute(select(Word.srs_level, Word.familiar).where(Word.id == word.id))
+            current = result.first()
+            if current is None:
+                raise WordNotFoundError(f"Word {word.id} no longer exists")
+            old_level, old_familiar = current
         
-        # Initialize stats if this is the first review
-        if word.practice_count is None:
-            word.practice_count = 0
-            word.correct_count = 0
-            word.incorrect_count = 0
+        for column, value in zip(columns, row):
+            set_committed_value(word, column.key, value)
         
-        # Update practice statistics
-        word.practice_count += 1
-        word.last_practiced = current_time
+        delta = Counter({
+            "practiced_words": 1 if row.practice_count == 1 else 0,
+            "familiar_words": int(bool(row.familiar)) - int(bool(old_familiar)),
+            "total_correct": 1 if correct else 0,
+            "total_attempts": 1,
+        })
+        delta[f"level_{old_level}"] -= 1
+        delta[f"level_{row.srs_level}"] += 1
+        return old_level, delta
+
+    async def process_review_result(self, db: AsyncSession, word: Word, correct: bool, user_id: int) -> int:
+        """Process the result of a word review and update SRS accordingly, returning the previous level"""
+        current_time = get_clock().now()
         
         if correct:
-            word.correct_count += 1
-            # Use exponential backoff for higher levels
-            if word.srs_level < 5:
-                word.srs_level += 1
-            elif word.review_interval:
-                # Exponential increase for mature words
-                word.review_interval = int(word.review_interval * 1.5)
+            levels = [min(level + 1, 5) for level in range(6)]
         else:
-            word.incorrect_count += 1
             # Implement smart level regression
-            word.srs_level = max(0, word.srs_level - 2)  # Drop by 2 levels instead of reset
+            levels = [max(0, level - 2) for level in range(6)]  # Drop by 2 levels instead of reset
         
-        # Update review interval with optimized spacing
-        base_interval = self.get_review_interval(word.srs_level)
-        # Add graduated jitter based on level
-        jitter_factor = 0.1 + (0.05 * word.srs_level)  # More variation for higher levels
-        jitter = base_interval * jitter_factor
-        final_interval = base_interval + (jitter * (0.5 - func.random()))
-        
-        word.review_interval = int(final_interval)
-        word.next_review = current_time + timedelta(hours=word.review_interval)
-        
-        # Smarter familiarity algorithm
-        if (word.practice_count >= 3 and 
-            (word.correct_count / word.practice_count) >= 0.8 and
-            word.srs_level >= 3):  # Must be at least level 3
-            word.familiar = True
+        # Optimized spacing with graduated jitter, drawn once for whichever level the word ends at
+        spread = 0.5 - self.random.random()
+        intervals = []
+        for level in range(6):
+            base_interval = self.get_review_interval(level, user_id)
+            jitter_factor = 0.1 + (0.05 * level)  # More variation for higher levels
+            intervals.append(int(base_interval + base_interval * jitter_factor * spread))
         
+        # Smarter familiarity algorithm: must also be at least level 3
+        old_level, delta = await self.record_answer(
+            db, word, correct, current_time, levels=levels, intervals=intervals, familiar_min_level=3
+        )
+        await stats_service.apply_delta(db, user_id, word.word_list_id, delta)
         await db.commit()
+        return old_level
 
-    async def initialize_word(self, db: AsyncSession, word: Word) -> None:
-        """Initialize SRS for a new word"""
-        current_time = datetime.utcnow()
+    def initialize_word(self, word: Word) -> None:
+        """Initialize SRS for a new word; the caller commits it with the rest of its import"""
+        current_time = get_clock().now()
         word.srs_level = 0
         word.review_interval = self.get_review_interval(0)
         word.next_review = current_time + timedelta(hours=word.review_interval)
@@ -121,48 +247,27 @@ class SRSService:
         word.correct_count = 0
         word.incorrect_count = 0
         word.familiar = False
-        await db.commit()
 
     async def get_user_stats(self, db: AsyncSession, user_id: int) -> Dict:
         """Get SRS statistics for the user with optimized query"""
-        current_time = datetime.utcnow()
-        
-        # First query to get basic stats
-        query = text("""
-            SELECT 
-                COUNT(*) as total_words,
-                COUNT(CASE WHEN next_review <= :current_time THEN 1 END) as total_due,
-                COUNT(CASE WHEN practice_count > 0 THEN 1 END) as total_practiced,
-                COALESCE(SUM(correct_count), 0) as total_correct,
-                COALESCE(SUM(practice_count), 0) as total_attempts
-            FROM words w
-            JOIN word_lists wl ON w.word_list_id = wl.id
-            WHERE wl.owner_id = :user_id
-        """)
-        
-        result = await db.execute(query, {"user_id": user_id, "current_time": current_time})
-        stats = result.first()
-        
-        # Second query to get level counts
-        level_query = text("""
-            SELECT 
-                COALESCE(srs_level, 0) as level, 
-                COUNT(*) as count
-            FROM words w
-            JOIN word_lists wl ON w.word_list_id = wl.id
-            WHERE wl.owner_id = :user_id
-            GROUP BY COALESCE(srs_level, 0)
-        """)
-        
-        level_result = await db.execute(level_query, {"user_id": user_id})
-        level_rows = level_result.all()
-        
-        # Convert level counts to dictionary
-        level_counts = {str(i): 0 for i in range(6)}
-        for row in level_rows:
-            level_counts[str(row.level)] = row.count
-        
-        if not stats or stats.total_words == 0:
+        current_time = get_clock().now()
+        
+        # Totals and level counts come from the incrementally maintained counters
+        stats = await stats_service.get_user_stats(db, user_id)
+        
+        # Due counts depend on the current time, so they use the next_review index
+        due_query = select(func.count()).select_from(Word).join(
+            WordList, Word.word_list_id == WordList.id
+        ).where(
+            and_(
+                WordList.owner_id == user_id,
+                Word.next_review <= current_time
+            )
+        )
+        due_result = await db.execute(due_query)
+        total_due = due_result.scalar() or 0
+        
+        if stats.total_words == 0:
             return {
                 "total_words": 0,
                 "total_due": 0,
@@ -173,10 +278,10 @@ class SRSService:
         
         return {
             "total_words": stats.total_words,
-            "total_due": stats.total_due,
-            "level_counts": level_counts,
+            "total_due": total_due,
+            "level_counts": {str(i): getattr(stats, f"level_{i}") for i in range(6)},
             "accuracy": stats.total_correct / stats.total_attempts if stats.total_attempts > 0 else 0,
-            "words_studied": stats.total_practiced
+            "words_studied": stats.practiced_words
         }
 
 # Create singleton instance
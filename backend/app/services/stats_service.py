@@ -0,0 +1,270 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Dict, Iterable, Optional, Type, Union
+
+from sqlalchemy import case, delete, func, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.database import AsyncSessionLocal
+from app.models.models import Word, WordList, UserStats, WordListStats
+
+logger = logging.getLogger(__name__)
+
+LEVEL_COLUMNS = [f"level_{level}" for level in range(6)]
+COUNTER_COLUMNS = [
+    "total_words",
+    "practiced_words",
+    "familiar_words",
+    "total_correct",
+    "total_attempts",
+] + LEVEL_COLUMNS
+
+StatsModel = Type[Union[UserStats, WordListStats]]
+
+
+class StatsService:
+    """
+    Service for maintaining per-user and per-list practice counters.
+
+    Write paths take a snapshot of a word's contribution before changing it
+    and apply the difference afterwards, in the caller's transaction. Rows
+    that don't exist yet are backfilled from the aggregates on first read.
+    """
+
+    def contribution(self, word: Word) -> Counter:
+        """Get the counters a single word contributes to its list and owner"""
+        practice_count = word.practice_count or 0
+        return Counter({
+            "total_words": 1,
+            "practiced_words": 1 if practice_count > 0 else 0,
+            "familiar_words": 1 if word.familiar else 0,
+            "total_correct": word.correct_count or 0,
+            "total_attempts": practice_count,
+            f"level_{word.srs_level or 0}": 1,
+        })
+
+    def diff(self, before: Counter, word: Word) -> Counter:
+        """Get the change in a word's contribution since the `before` snapshot"""
+        delta = self.contribution(word)
+        delta.subtract(before)
+        return delta
+
+    async def apply_delta(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        word_list_id: int,
+        delta: Counter
+    ) -> None:
+        """Add a counter delta to the user's and the word list's stats rows"""
+        await self._increment(db, UserStats, UserStats.user_id == user_id, delta)
+        await self._increment(db, WordListStats, WordListStats.word_list_id == word_list_id, delta)
+
+    async def add_words(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        word_list_id: int,
+        words: Iterable[Word]
+    ) -> None:
+        """Count newly imported words towards their list and owner"""
+        delta = Counter()
+        for word in words:
+            delta.update(self.contribution(word))
+
+        await self._increment(db, UserStats, UserStats.user_id == user_id, delta)
+        await self._insert_or_increment(db, WordListStats, "word_list_id", word_list_id, delta)
+
+    async def remove_word_list(self, db: AsyncSession, user_id: int, word_list_id: int) -> None:
+        """Subtract a word list's counters from its owner before the list is deleted"""
+        result = await db.execute(
+            self._aggregate_query().where(Word.word_list_id == word_list_id)
+        )
+        row = result.first()
+        if row:
+            delta = Counter({name: -getattr(row, name) for name in COUNTER_COLUMNS})
+            await self._increment(db, UserStats, UserStats.user_id == user_id, delta)
+
+        await db.execute(delete(WordListStats).where(WordListStats.word_list_id == word_list_id))
+
+    async def get_user_stats(self, db: AsyncSession, user_id: int) -> UserStats:
+        """Get the counters for a user, backfilling them on first access"""
+        stats = await db.get(UserStats, user_id, populate_existing=True)
+        if stats is None:
+            stats = await self._backfill(db, UserStats, "user_id", user_id, WordList.owner_id == user_id)
+        return stats
+
+    async def get_word_list_stats(self, db: AsyncSession, word_list_id: int) -> WordListStats:
+        """Get the counters for a word list, backfilling them on first access"""
+        stats = await db.get(WordListStats, word_list_id, populate_existing=True)
+        if stats is None:
+            stats = await self._backfill(
+                db, WordListStats, "word_list_id", word_list_id, Word.word_list_id == word_list_id
+            )
+        return stats
+
+    async def reconcile(self, db: AsyncSession) -> Dict[str, int]:
+        """
+        Recompute every stored counter row from the words table and fix drift
+
+        The aggregate and the corrections share one write transaction, which
+        takes the write lock before the aggregate is read, so an answer can't
+        commit an increment in between and have it overwritten.
+
+        Returns:
+            dict: Number of user and word list rows that had to be corrected
+        """
+        if db.info.get("read_only"):
+            raise ValueError("Stats can only be reconciled in a write session")
+        result = await db.execute(self._aggregate_query())
+        list_counters: Dict[int, Counter] = {}
+        user_counters: Dict[int, Counter] = {}
+        for row in result.all():
+            counters = self._row_counters(row)
+            list_counters[row.word_list_id] = counters
+            user_counters.setdefault(row.owner_id, Counter()).update(counters)
+
+        lists_corrected = await self._correct_rows(
+            db, WordListStats, "word_list_id", list_counters
+        )
+        users_corrected = await self._correct_rows(
+            db, UserStats, "user_id", user_counters
+        )
+        await db.commit()
+
+        return {
+            "users_corrected": users_corrected,
+            "lists_corrected": lists_corrected
+        }
+
+    async def run_reconciliation(self, interval_minutes: int) -> None:
+        """Periodically reconcile the counters with the aggregates"""
+        while True:
+            await asyncio.sleep(interval_minutes * 60)
+            try:
+                async with AsyncSessionLocal() as session:
+                    corrected = await self.reconcile(session)
+                if corrected["users_corrected"] or corrected["lists_corrected"]:
+                    logger.warning(f"Stats counters drifted and were corrected: {corrected}")
+                else:
+                    logger.info("Stats counters reconciled, no drift found")
+            except Exception as e:
+                logger.error(f"Error reconciling stats counters: {str(e)}")
+
+    def _aggregate_query(self):
+        """Full aggregate of word counters, grouped by word list"""
+        level = func.coalesce(Word.srs_level, 0)
+        return (
+            select(
+                Word.word_list_id,
+                WordList.owner_id,
+                func.count().label("total_words"),
+                func.sum(case((Word.practice_count > 0, 1), else_=0)).label("practiced_words"),
+                func.sum(case((Word.familiar == True, 1), else_=0)).label("familiar_words"),
+                func.coalesce(func.sum(Word.correct_count), 0).label("total_correct"),
+                func.coalesce(func.sum(Word.practice_count), 0).label("total_attempts"),
+                *[
+                    func.sum(case((level == index, 1), else_=0)).label(name)
+                    for index, name in enumerate(LEVEL_COLUMNS)
+                ]
+            )
+            .join(WordList, Word.word_list_id == WordList.id)
+            .group_by(Word.word_list_id, WordList.owner_id)
+        )
+
+    def _row_counters(self, row) -> Counter:
+        return Counter({name: getattr(row, name) or 0 for name in COUNTER_COLUMNS})
+
+    async def _increment(self, db: AsyncSession, model: StatsModel, condition, delta: Counter) -> None:
+        values = {
+            name: getattr(model, name) + amount
+            for name, amount in delta.items()
+            if amount
+        }
+        if values:
+            await db.execute(update(model).where(condition).values(**values))
+
+    async def _upsert(
+        self,
+        db: AsyncSession,
+        model: StatsModel,
+        key_name: str,
+        key: int,
+        counters: Counter
+    ) -> None:
+        values = {name: counters.get(name, 0) for name in COUNTER_COLUMNS}
+        stmt = sqlite_insert(model).values(**{key_name: key}, **values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[key_name],
+            set_={name: stmt.excluded[name] for name in COUNTER_COLUMNS}
+        )
+        await db.execute(stmt)
+
+    async def _insert_or_increment(
+        self,
+        db: AsyncSession,
+        model: StatsModel,
+        key_name: str,
+        key: int,
+        delta: Counter
+    ) -> None:
+        values = {name: delta.get(name, 0) for name in COUNTER_COLUMNS}
+        stmt = sqlite_insert(model).values(**{key_name: key}, **values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[key_name],
+            set_={name: getattr(model, name) + stmt.excluded[name] for name in COUNTER_COLUMNS}
+        )
+        await db.execute(stmt)
+
+    async def _backfill(
+        self,
+        db: AsyncSession,
+        model: StatsModel,
+        key_name: str,
+        key: int,
+        condition
+    ) -> Optional[Union[UserStats, WordListStats]]:
+        """
+        Store a missing counter row computed from the aggregates
+
+        The aggregate is read inside the write transaction, which holds the
+        write lock, and an existing row is never overwritten, so an answer
+        committed in the meantime is neither dropped nor double counted.
+        """
+        if db.info.get("read_only"):
+            # Read endpoints can't write, so the backfill goes through the primary engine
+            async with AsyncSessionLocal() as session:
+                return await self._backfill(session, model, key_name, key, condition)
+
+        result = await db.execute(self._aggregate_query().where(condition))
+        counters = Counter()
+        for row in result.all():
+            counters.update(self._row_counters(row))
+        values = {name: counters.get(name, 0) for name in COUNTER_COLUMNS}
+        stmt = sqlite_insert(model).values(**{key_name: key}, **values)
+        await db.execute(stmt.on_conflict_do_nothing(index_elements=[key_name]))
+        await db.commit()
+        return await db.get(model, key, populate_existing=True)
+
+    async def _correct_rows(
+        self,
+        db: AsyncSession,
+        model: StatsModel,
+        key_name: str,
+        expected: Dict[int, Counter]
+    ) -> int:
+        corrected = 0
+        result = await db.execute(select(model))
+        for stats in result.scalars().all():
+            counters = expected.get(getattr(stats, key_name), Counter())
+            if any(getattr(stats, name) != counters.get(name, 0) for name in COUNTER_COLUMNS):
+                await self._upsert(db, model, key_name, getattr(stats, key_name), counters)
+                corrected += 1
+        return corrected
+
+
+# Create singleton instance
+stats_service = StatsService()
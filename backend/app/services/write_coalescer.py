@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WriteJob = Callable[[AsyncSession], Awaitable[T]]
+
+
+class WriteCoalescer:
+    """
+    Group commit for the writes of concurrent requests.
+
+    A request hands its writes to submit() as a function of a session and
+    waits. One background task collects jobs for up to `max_delay_ms`
+    milliseconds, or until `max_batch` are waiting, runs them one after the
+    other in a single session and commits once, so a burst of answers costs
+    one transaction and one sync instead of one each. Each submit() returns
+    its job's result once the batch committed, or raises its job's error.
+
+    A job that raises is dropped and the rest of its batch is run again
+    without it, so jobs must only change the database. Other code paths
+    still commit on their own; jobs that read a row before changing it are
+    safe from them only because every write transaction takes the write
+    lock before its first statement. Without a running writer, e.g. in
+    scripts, a job runs and commits on its own.
+    """
+
+    def __init__(self, max_delay_ms: float = 5, max_batch: int = 100, max_pending: int = 10000):
+        self.max_delay = max_delay_ms / 1000
+        self.max_batch = max_batch
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.jobs = 0
+
+    async def submit(self, job: WriteJob) -> T:
+        """Run a write job in the next batch and return its result once it's committed"""
+        if self._task is None:
+            async with AsyncSessionLocal() as session:
+                result = await job(session)
+                await session.commit()
+                return result
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((job, future))
+        return await future
+
+    async def start(self) -> None:
+        """Start the background writer"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background writer after committing whatever is still queued"""
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            # Wait for the first job, then collect until the batch is full or the deadline passes
+            batch = []
+            entry = await self._queue.get()
+            deadline = loop.time() + self.max_delay
+            while entry is not None:
+                batch.append(entry)
+                timeout = deadline - loop.time()
+                if len(batch) >= self.max_batch or timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                # A None entry is the shutdown signal, queued after every pending job
+                stopping = True
+
+            if batch:
+                try:
+                    await self._write(batch)
+                except Exception as e:
+                    logger.error(f"Error writing a batch of {len(batch)} jobs: {str(e)}")
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+
+    async def _write(self, batch: List[Tuple[WriteJob, asyncio.Future]]) -> None:
+        # Requests that gave up waiting don't need their writes
+        pending = [(job, future) for job, future in batch if not future.done()]
+        while pending:
+            results = []
+            async with AsyncSessionLocal() as session:
+                try:
+                    for job, future in pending:
+                        results.append(await job(session))
+                except Exception as e:
+                    # Drop the failed job and run the others again in a fresh transaction
+                    await session.rollback()
+                    _, future = pending.pop(len(results))
+                    if not future.done():
+                        future.set_exception(e)
+                    continue
+
+                try:
+                    await session.commit()
+                except Exception as e:
+                    logger.error(f"Error committing a batch of {len(pending)} writes: {str(e)}")
+                    for _, future in pending:
+                        if not future.done():
+                            future.set_exception(e)
+                    return
+
+            self.batches += 1
+            self.jobs += len(pending)
+            for (_, future), result in zip(pending, results):
+                if not future.done():
+                    future.set_result(result)
+            return
+
+
+# Create singleton instance
+write_coalescer = WriteCoalescer(
+    max_delay_ms=settings.WRITE_COALESCE_MS,
+    max_batch=settings.WRITE_COALESCE_MAX_BATCH
+)
@@ -0,0 +1,132 @@
+"""
+Measure the authentication overhead of a request.
+
+Creates users in a scratch database and resolves their access tokens with
+get_current_user, the dependency every authenticated endpoint runs, in:
+
+- email: a token without the uid claim, looked up by email, as before the
+  auth cache; the cache is cleared before every call
+- uid: a token with the uid claim, looked up by primary key, with the
+  cache cleared before every call
+- cached: the same tokens with a warm cache
+
+Each call opens its own session, like a request does. It reports the
+time per call and the SQL statements per call, then the end-to-end
+latency of a small authenticated endpoint with the cache cleared per
+request and with a warm cache.
+
+Run it from the backend directory:
+
+    python -m benchmarks.auth_benchmark --users 50 --calls 5000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+async def run(args) -> None:
+    # The app resolves its database path relative to the working directory
+    os.chdir(tempfile.mkdtemp(prefix="spelling-auth-"))
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    import httpx
+    from sqlalchemy import event
+    from app.api.deps import get_current_user
+    from app.api.endpoints.auth import create_access_token
+    from app.core.config import settings
+    from app.core.database import AsyncSessionLocal, engine
+    from app.core.init_db import init_db
+    from app.models.models import User
+    from app.services.auth_cache import auth_cache
+    import main
+
+    engine.echo = False
+    await init_db()
+
+    statements = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    async with AsyncSessionLocal() as session:
+        users = [User(email=f"learner{index}@example.com", hashed_password="x", is_active=True)
+                 for index in range(args.users)]
+        session.add_all(users)
+        await session.commit()
+        expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        email_tokens = [create_access_token({"sub": user.email}, expires) for user in users]
+        uid_tokens = [create_access_token({"sub": user.email, "uid": user.id}, expires) for user in users]
+
+    async def resolve(tokens, clear: bool):
+        nonlocal statements
+        statements = 0
+        started = time.perf_counter()
+        for call in range(args.calls):
+            if clear:
+                auth_cache.clear()
+            async with AsyncSessionLocal() as session:
+                await get_current_user(tokens[call % len(tokens)], session)
+        return time.perf_counter() - started, statements
+
+    await resolve(uid_tokens, True)  # Warm up the connection pool
+    timings = [
+        ("email", *await resolve(email_tokens, True)),
+        ("uid", *await resolve(uid_tokens, True)),
+    ]
+    await resolve(uid_tokens, False)  # Fill the cache
+    timings.append(("cached", *await resolve(uid_tokens, False)))
+
+    print(f"users                  {args.users:>10}")
+    print(f"calls                  {args.calls:>10}")
+    print(f"{'lookup':<10} {'us/call':>10} {'queries/call':>13} {'speedup':>8}")
+    for name, seconds, queries in timings:
+        print(
+            f"{name:<10} {seconds / args.calls * 1e6:>10.1f} {queries / args.calls:>13.2f} "
+            f"{timings[0][1] / seconds:>7.1f}x"
+        )
+
+    # End to end through the ASGI app, on an endpoint that does little besides auth
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        async def requests(clear: bool):
+            latencies = []
+            for call in range(args.requests):
+                if clear:
+                    auth_cache.clear()
+                headers = {"Authorization": f"Bearer {uid_tokens[call % len(uid_tokens)]}"}
+                started = time.perf_counter()
+                response = await client.get("/api/v1/word-lists/", headers=headers)
+                latencies.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+            return latencies
+
+        await requests(False)
+        uncached = await requests(True)
+        cached = await requests(False)
+
+    print()
+    print(f"{'GET /word-lists':<16} {'p50 ms':>8} {'mean ms':>8}")
+    for name, latencies in (("cache cleared", uncached), ("cached", cached)):
+        print(f"{name:<16} {statistics.median(latencies):>8.2f} {statistics.mean(latencies):>8.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report the authentication overhead per request")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=5000, help="get_current_user calls per lookup kind")
+    parser.add_argument("--requests", type=int, default=1000, help="HTTP requests per run")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Deterministic workload simulator for the SRS review loop.
+
+Drives synthetic learners through the real ASGI app over simulated days:
+each learner registers, uploads one of the bundled example word lists and
+then works through their due queue every day, spelling words right with a
+probability that grows with the word's SRS level. Time is a SimulatedClock,
+so weeks of usage run in minutes, and every learner decision comes from
+one seeded RNG.
+
+Audio generation and dictionary lookups are replaced by offline stand-ins,
+so the run needs no network access. The database is created in a scratch
+directory and never touches the development database.
+
+Run it from the backend directory:
+
+    python -m benchmarks.learner_simulator --learners 20 --days 14 --seed 1
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+EXAMPLES_DIR = BACKEND_DIR.parent / "examples"
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    """Produce a plausible misspelling: a dropped, doubled, swapped or replaced letter"""
+    if len(word) < 2:
+        return word + rng.choice(ALPHABET)
+    i = rng.randrange(len(word) - 1)
+    kind = rng.randrange(4)
+    if kind == 0:
+        return word[:i] + word[i + 1:]
+    if kind == 1:
+        return word[:i] + word[i] + word[i:]
+    if kind == 2:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice(ALPHABET.replace(word[i], "")) + word[i + 1:]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Learner:
+    def __init__(self, index: int, rng: random.Random):
+        self.email = f"learner{index}@example.com"
+        self.ability = rng.uniform(0.75, 1.1)  # Multiplier on the chance of recalling a word
+        self.daily_limit = rng.choice([10, 20, 30, 50])
+        self.token = None
+
+
+async def simulate(args) -> None:
+    # The app resolves its database and static paths relative to the working directory
+    workdir = args.workdir or tempfile.mkdtemp(prefix="spelling-sim-")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    import httpx
+    from app.core.clock import SimulatedClock, set_clock
+    from app.core.database import engine
+    from app.services.dictionary_service import dictionary_service
+    from app.services.grapheme_index_service import grapheme_index_service
+    from app.services.srs_service import srs_service
+    from app.services.tts_service import tts_service
+    import main
+
+    engine.echo = False
+    rng = random.Random(args.seed)
+    srs_service.random.seed(args.seed)
+    grapheme_index_service.random.seed(args.seed)
+    clock = SimulatedClock(datetime(2024, 1, 1, 8, 0))
+    set_clock(clock)
+
+    # Offline stand-ins for the network-backed services
+    tts_service.synthesize_speech = lambda text, speed="normal": f"/audio/{tts_service.get_audio_filename(text, speed)}"
+
+    async def offline_word_details(word):
+        return None, None, None
+
+    dictionary_service.get_word_details = offline_word_details
+
+    csv_files = sorted(EXAMPLES_DIR.glob("*.csv"))
+    latencies: Dict[str, List[float]] = defaultdict(list)
+
+    async def call(client, label, method, url, learner=None, **kwargs):
+        headers = {"Authorization": f"Bearer {learner.token}"} if learner else {}
+        started = time.perf_counter()
+        response = await client.request(method, url, headers=headers, **kwargs)
+        latencies[label].append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        return response.json()
+
+    for handler in main.app.router.on_startup:
+        await handler()
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://simulator") as client:
+        learners = [Learner(index, rng) for index in range(args.learners)]
+        for learner in learners:
+            data = await call(client, "register", "POST", "/api/v1/auth/register", json={
+                "email": learner.email, "password": "simulated-password"
+            })
+            learner.token = data["access_token"]
+
+            csv_path = rng.choice(csv_files)
+            lines = csv_path.read_text(encoding="utf-8-sig").splitlines()
+            content = "\n".join([lines[0]] + lines[1:args.words_per_learner + 1])
+            await call(
+                client, "upload", "POST", "/api/v1/word-lists/upload", learner,
+                data={"name": csv_path.stem},
+                files={"file": (csv_path.name, content.encode(), "text/csv")}
+            )
+
+        print(f"{'day':>4} {'reviews':>8} {'accuracy':>9} {'due avg':>8} {'due max':>8} {'db MB':>7}")
+        for day in range(1, args.days + 1):
+            reviews = correct = 0
+            due_counts = []
+            for learner in rng.sample(learners, len(learners)):
+                words = await call(
+                    client, "review queue", "GET", "/api/v1/srs/review", learner,
+                    params={"limit": learner.daily_limit}
+                )
+                for word in words:
+                    recall = min(0.98, (0.55 + 0.08 * word["srs_level"]) * learner.ability)
+                    spelling = word["word"] if rng.random() < recall else misspell(word["word"].lower(), rng)
+                    result = await call(
+                        client, "submit", "POST", f"/api/v1/srs/review/{word['id']}/submit", learner,
+                        json={"user_spelling": spelling, "latency_ms": rng.randint(1500, 9000)}
+                    )
+                    reviews += 1
+                    correct += result["correct"]
+                    clock.advance(timedelta(seconds=rng.randint(5, 30)))
+
+                stats = await call(client, "stats", "GET", "/api/v1/srs/stats", learner)
+                due_counts.append(stats["total_due"])
+
+            db_size = sum(
+                os.path.getsize(path) for path in Path(workdir).glob("spelling_teacher.db*")
+            ) / 1e6
+            print(
+                f"{day:>4} {reviews:>8} {correct / max(reviews, 1):>9.2%} "
+                f"{statistics.mean(due_counts):>8.1f} {max(due_counts):>8} {db_size:>7.2f}"
+            )
+            clock.advance(timedelta(days=1))
+
+    for handler in main.app.router.on_shutdown:
+        await handler()
+
+    print(f"\n{'endpoint':<14} {'calls':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for label, values in latencies.items():
+        print(
+            f"{label:<14} {len(values):>7} {percentile(values, 0.5):>8.1f} "
+            f"{percentile(values, 0.95):>8.1f} {percentile(values, 0.99):>8.1f}"
+        )
+    print(f"\nDatabase: {Path(workdir) / 'spelling_teacher.db'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate learners using the SRS review loop")
+    parser.add_argument("--learners", type=int, default=20)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--words-per-learner", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workdir", help="Directory for the simulation database (default: a new temp dir)")
+    asyncio.run(simulate(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Replay a mistake analysis workload against the LLM response cache.
+
+Synthetic learners misspell words from the bundled example lists. After
+every mistake the word's and the learner's pattern sets are analyzed, as
+the background analysis job does, and now and then the learner opens the
+mistake pattern overview without having made new mistakes. Requests go
+through LLMService with the deterministic stub backend, so the run is
+offline and reproducible, and the report shows how many completions and
+tokens the cache saved, and how much prompt compaction shrank the pattern
+section of the prompts.
+
+Run it from the backend directory:
+
+    python -m benchmarks.llm_cache_report --learners 50 --mistakes 40
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+EXAMPLES_DIR = BACKEND_DIR.parent / "examples"
+
+
+async def replay(args) -> None:
+    # Keep the cache out of the working tree and never call a real provider
+    os.chdir(tempfile.mkdtemp(prefix="llm-cache-"))
+    os.environ["LLM_BACKEND"] = "stub"
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    from app.services.llm_cache import LLMResponseCache
+    from app.services.llm_service import LLMService, StubBackend
+    from app.services.prompt_compaction import estimate_tokens, format_pattern
+    from app.services.mistake_pattern_service import mistake_pattern_service
+    from benchmarks.learner_simulator import misspell
+
+    rng = random.Random(args.seed)
+    cache = LLMResponseCache(
+        "cache/llm", ttl_seconds=args.ttl_hours * 3600, max_bytes=args.max_mb * 1024 * 1024
+    )
+    service = LLMService(backend=StubBackend(), cache=cache)
+
+    words = []
+    for csv_path in sorted(EXAMPLES_DIR.glob("*.csv")):
+        lines = csv_path.read_text(encoding="utf-8-sig").splitlines()[1:]
+        words.extend(line.split(",")[0].strip().lower() for line in lines if line.strip())
+
+    requests = 0
+    prompt_tokens = 0
+    full_pattern_tokens = 0
+    compacted_pattern_tokens = 0
+
+    async def analyze(patterns):
+        nonlocal requests, prompt_tokens, full_pattern_tokens, compacted_pattern_tokens
+        requests += 1
+        messages = service._build_messages(patterns)
+        prompt_tokens += sum(estimate_tokens(message["content"]) for message in messages)
+        full_pattern_tokens += estimate_tokens("\n".join(format_pattern(pattern) for pattern in patterns))
+        compacted_pattern_tokens += estimate_tokens(service._format_patterns_for_prompt(patterns))
+        await service.analyze_mistake_patterns(patterns)
+
+    for _ in range(args.learners):
+        vocabulary = rng.sample(words, min(len(words), args.vocabulary))
+        patterns = defaultdict(dict)  # word -> (type, description) -> pattern
+        for _ in range(args.mistakes):
+            word = rng.choice(vocabulary)
+            attempt = misspell(word, rng)
+            found = mistake_pattern_service.analyze_mistake(word, attempt)
+            pattern = patterns[word].setdefault(
+                (found["pattern_type"], found["description"]),
+                {**found, "frequency": 0, "examples": []}
+            )
+            pattern["frequency"] += 1
+            if attempt not in pattern["examples"]:
+                pattern["examples"].append(attempt)
+
+            await analyze(list(patterns[word].values()))
+            await analyze([p for word_patterns in patterns.values() for p in word_patterns.values()])
+            if rng.random() < args.overview_rate:
+                await analyze([p for word_patterns in patterns.values() for p in word_patterns.values()])
+
+    stats = service.cache_stats()
+    saved = stats["saved_prompt_tokens"] + stats["saved_completion_tokens"]
+    print(f"analysis requests      {requests:>10}")
+    print(f"backend calls          {stats['misses']:>10}")
+    print(f"cache hit rate         {stats['hit_rate']:>10.1%}")
+    print(f"pattern tokens, full   {full_pattern_tokens:>10}")
+    print(f"pattern tokens, compact{compacted_pattern_tokens:>10}")
+    print(f"prompt tokens needed   {prompt_tokens:>10}")
+    print(f"prompt tokens saved    {stats['saved_prompt_tokens']:>10}")
+    print(f"completion tokens saved{stats['saved_completion_tokens']:>10}")
+    print(f"total tokens saved     {saved:>10}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report LLM response cache hit rate and token savings")
+    parser.add_argument("--learners", type=int, default=50)
+    parser.add_argument("--mistakes", type=int, default=40, help="Mistakes per learner")
+    parser.add_argument("--vocabulary", type=int, default=30, help="Words each learner practices")
+    parser.add_argument("--overview-rate", type=float, default=0.5, help="Chance of viewing the overview after a mistake")
+    parser.add_argument("--ttl-hours", type=int, default=168)
+    parser.add_argument("--max-mb", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(replay(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
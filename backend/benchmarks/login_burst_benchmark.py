@@ -0,0 +1,158 @@
+"""
+Load test practice latency during a login burst.
+
+Seeds a scratch database with a learner who practices a word list and a
+class of students who all sign in at once, then submits practice attempts
+back to back through the ASGI app:
+
+- quiet: practice alone
+- burst (inline): practice while the class signs in, with bcrypt run on
+  the event loop, as the auth endpoints did before the password hasher
+- burst: practice while the class signs in, with bcrypt in the password
+  hasher's thread pool
+
+It reports practice latency percentiles for each, the sign-ins served and
+turned away, and how many stored hashes with an outdated work factor were
+upgraded during the burst.
+
+Run it from the backend directory:
+
+    python -m benchmarks.login_burst_benchmark --logins 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+PASSWORD = "class-password"
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run(args) -> None:
+    # The app resolves its database path relative to the working directory
+    os.chdir(tempfile.mkdtemp(prefix="spelling-logins-"))
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    import httpx
+    from passlib.context import CryptContext
+    from sqlalchemy import select
+    from app.core.config import settings
+    from app.core.database import AsyncSessionLocal, engine
+    from app.core.init_db import init_db
+    from app.models.models import User, Word, WordList
+    from app.services.password_service import password_hasher
+    import main
+
+    engine.echo = False
+    await init_db()
+
+    # Half of the class still has hashes from before the work factor was raised
+    current_hash = password_hasher.context.hash(PASSWORD)
+    outdated_hash = CryptContext(
+        schemes=["bcrypt"], bcrypt__default_rounds=max(4, settings.PASSWORD_BCRYPT_ROUNDS - 2)
+    ).hash(PASSWORD)
+    async with AsyncSessionLocal() as session:
+        learner = User(email="learner@example.com", hashed_password=current_hash, is_active=True)
+        word_list = WordList(name="Practice", owner=learner)
+        words = [Word(word=f"word{index}", word_list=word_list) for index in range(20)]
+        students = [
+            User(
+                email=f"student{index}@example.com",
+                hashed_password=outdated_hash if index % 2 else current_hash,
+                is_active=True
+            )
+            for index in range(args.logins)
+        ]
+        session.add_all([learner, word_list, *words, *students])
+        await session.commit()
+        word_ids = [word.id for word in words]
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+        response = await client.post(
+            "/api/v1/auth/login", data={"username": "learner@example.com", "password": PASSWORD}
+        )
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        async def practice(stop: asyncio.Event) -> List[float]:
+            latencies = []
+            while not stop.is_set() or len(latencies) < args.attempts:
+                started = time.perf_counter()
+                response = await client.post("/api/v1/practice/submit", headers=headers, json={
+                    "word_id": word_ids[len(latencies) % len(word_ids)], "user_spelling": "wrod"
+                })
+                latencies.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+            return latencies
+
+        async def login(index: int) -> int:
+            response = await client.post("/api/v1/auth/login", data={
+                "username": f"student{index}@example.com", "password": PASSWORD
+            })
+            return response.status_code
+
+        async def scenario(burst: bool):
+            stop = asyncio.Event()
+            practicing = asyncio.create_task(practice(stop))
+            statuses = []
+            started = time.perf_counter()
+            if burst:
+                await asyncio.sleep(0.05)
+                statuses = await asyncio.gather(*(login(index) for index in range(args.logins)))
+            stop.set()
+            latencies = await practicing
+            return latencies, statuses, time.perf_counter() - started
+
+        async def run_inline(function, *args):
+            return function(*args)
+
+        results = [("quiet", *await scenario(False))]
+        offloaded = password_hasher._run
+        password_hasher._run = run_inline
+        results.append(("burst (inline)", *await scenario(True)))
+        password_hasher._run = offloaded
+        results.append(("burst", *await scenario(True)))
+
+    async with AsyncSessionLocal() as session:
+        hashes = (await session.execute(
+            select(User.hashed_password).filter(User.email.like("student%"))
+        )).scalars().all()
+    outdated = sum(1 for hashed in hashes if password_hasher.context.needs_update(hashed))
+    password_hasher.close()
+
+    print(f"bcrypt rounds          {settings.PASSWORD_BCRYPT_ROUNDS:>10}")
+    print(f"hashing threads        {password_hasher.workers:>10}")
+    print(f"logins per burst       {args.logins:>10}")
+    print()
+    print(f"{'scenario':<16} {'attempts':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} "
+          f"{'logins ok':>10} {'busy':>5} {'seconds':>8}")
+    for name, latencies, statuses, seconds in results:
+        print(
+            f"{name:<16} {len(latencies):>8} {statistics.median(latencies):>8.1f} "
+            f"{percentile(latencies, 0.95):>8.1f} {max(latencies):>8.1f} "
+            f"{statuses.count(200):>10} {statuses.count(503):>5} {seconds:>8.1f}"
+        )
+    print()
+    print(f"outdated hashes left   {outdated:>10} of {len(hashes)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure practice latency during a login burst")
+    parser.add_argument("--logins", type=int, default=20, help="Students signing in at once")
+    parser.add_argument("--attempts", type=int, default=50, help="Least practice attempts per scenario")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
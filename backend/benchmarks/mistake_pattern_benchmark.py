@@ -0,0 +1,172 @@
+"""
+Measure MistakePatternService throughput on a replayed corpus of attempts.
+
+Builds a seeded corpus of misspellings of the words in the bundled example
+lists, using the learner simulator's typos plus swaps between the spellings
+the phonetic and vowel rules know about, and analyzes it with:
+
+- before: the original phonetic and vowel checks, which rebuild the rule
+  regexes for every attempt (kept below as ReferenceMistakePatternService)
+- cold: the compiled rule engine with an empty per-word feature cache
+- warm: the compiled rule engine replaying the corpus again
+
+Every analysis is compared against the reference, so the run also checks
+that the rule engine returns identical patterns.
+
+It then times the alignment the remaining patterns are classified from:
+difflib's SequenceMatcher, which the classifier used to read, against the
+weighted Damerau-Levenshtein alignment, and reports how often the fast
+path for single edits applied.
+
+Run it from the backend directory:
+
+    python -m benchmarks.mistake_pattern_benchmark --attempts 20000
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+EXAMPLES_DIR = BACKEND_DIR.parent / "examples"
+
+# Spellings the rules confuse, swapped both ways to build rule-shaped mistakes
+CONFUSIONS = [
+    ("ie", "ei"), ("ph", "f"), ("tion", "sion"), ("ck", "k"), ("ough", "off"),
+    ("ai", "ay"), ("ee", "ea"), ("oa", "ow"), ("igh", "y"), ("ue", "ew"),
+]
+
+
+def build_corpus(words: List[str], attempts: int, rng: random.Random) -> List[Tuple[str, str]]:
+    from benchmarks.learner_simulator import misspell
+
+    corpus = []
+    while len(corpus) < attempts:
+        word = rng.choice(words)
+        swaps = [(a, b) for pair in CONFUSIONS for a, b in (pair, pair[::-1]) if a in word]
+        if swaps and rng.random() < 0.4:
+            a, b = rng.choice(swaps)
+            attempt = word.replace(a, b, 1)
+        else:
+            attempt = misspell(word, rng)
+        if attempt != word:
+            corpus.append((word, attempt))
+    return corpus
+
+
+def create_reference_service():
+    from app.services.mistake_pattern_service import MistakePatternService
+
+    class ReferenceMistakePatternService(MistakePatternService):
+        """The analysis as it was before the rule engine, for comparison"""
+
+        def _check_phonetic_patterns(self, correct: str, attempt: str) -> Dict:
+            for name, (pattern, alternatives) in self.phonetic_patterns.items():
+                match = re.search(pattern, correct)
+                if match:
+                    correct_part = match.group(0)
+                    word_pattern = re.escape(correct).replace(re.escape(correct_part), pattern)
+                    for alt in alternatives:
+                        test_word = re.sub(word_pattern, lambda m: re.sub(pattern, alt, m.group(0)), correct)
+                        if test_word == attempt:
+                            return {
+                                'pattern_type': 'phonetic',
+                                'description': f'{name} confusion: {correct_part} → {alt}',
+                                'examples': [attempt]
+                            }
+            return None
+
+        def _check_vowel_patterns(self, correct: str, attempt: str) -> Dict:
+            correct_vowels = ''.join(c for c in correct if c in 'aeiou')
+            attempt_vowels = ''.join(c for c in attempt if c in 'aeiou')
+            if correct_vowels != attempt_vowels:
+                for pattern_name, variations in self.vowel_patterns.items():
+                    for var in variations:
+                        var_pattern = var.replace('_', '[a-z]')
+                        if re.search(var_pattern, correct):
+                            for alt_var in variations:
+                                if alt_var != var:
+                                    alt_pattern = alt_var.replace('_', '[a-z]')
+                                    if re.search(alt_pattern, attempt):
+                                        return {
+                                            'pattern_type': 'vowel',
+                                            'description': f'{pattern_name} sound confusion: {var} → {alt_var}',
+                                            'examples': [attempt]
+                                        }
+                return {
+                    'pattern_type': 'vowel',
+                    'description': f'vowel sequence error: {correct_vowels} → {attempt_vowels}',
+                    'examples': [attempt]
+                }
+            return None
+
+    return ReferenceMistakePatternService()
+
+
+def timed(service, corpus: List[Tuple[str, str]]) -> Tuple[float, List[Dict]]:
+    started = time.perf_counter()
+    results = [service.analyze_mistake(word, attempt) for word, attempt in corpus]
+    return time.perf_counter() - started, results
+
+
+def run(args) -> None:
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app.services.mistake_pattern_service import MistakePatternService
+    from app.services.spelling_alignment import align
+
+    words = []
+    for csv_path in sorted(EXAMPLES_DIR.glob("*.csv")):
+        lines = csv_path.read_text(encoding="utf-8-sig").splitlines()[1:]
+        words.extend(line.split(",")[0].strip().lower() for line in lines if line.strip())
+    corpus = build_corpus(words, args.attempts, random.Random(args.seed))
+
+    reference_seconds, expected = timed(create_reference_service(), corpus)
+    engine = MistakePatternService()
+    cold_seconds, cold = timed(engine, corpus)
+    warm_seconds, warm = timed(engine, corpus)
+
+    mismatches = sum(1 for a, b, c in zip(expected, cold, warm) if not a == b == c)
+    cache = engine.word_features.cache_info()
+
+    print(f"attempts               {len(corpus):>10}")
+    print(f"distinct words         {len({word for word, _ in corpus}):>10}")
+    print(f"{'run':<10} {'seconds':>10} {'per second':>12} {'speedup':>8}")
+    for name, seconds in (("before", reference_seconds), ("cold", cold_seconds), ("warm", warm_seconds)):
+        print(f"{name:<10} {seconds:>10.3f} {len(corpus) / seconds:>12.0f} {reference_seconds / seconds:>7.1f}x")
+    print(f"feature cache          {cache.hits} hits, {cache.misses} misses")
+    print(f"mismatched analyses    {mismatches:>10}")
+
+    def best_of(function) -> float:
+        # Alignments take microseconds, so take the least disturbed of a few runs
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    matcher_seconds = best_of(lambda: [SequenceMatcher(None, word, attempt).get_opcodes() for word, attempt in corpus])
+    align_seconds = best_of(lambda: [align(word, attempt) for word, attempt in corpus])
+    single_edits = sum(1 for word, attempt in corpus if len(align(word, attempt)) == 1)
+
+    print()
+    print(f"{'alignment':<16} {'us/attempt':>10} {'speedup':>8}")
+    for name, seconds in (("SequenceMatcher", matcher_seconds), ("weighted DL", align_seconds)):
+        print(f"{name:<16} {seconds / len(corpus) * 1e6:>10.2f} {matcher_seconds / seconds:>7.1f}x")
+    print(f"single-edit attempts   {single_edits / len(corpus):>10.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report MistakePatternService analyses per second")
+    parser.add_argument("--attempts", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5, help="Alignment timing runs; the fastest counts")
+    parser.add_argument("--seed", type=int, default=1)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Measure sound-alike detection by phonetic key against the phonetic rules.
+
+Takes the words of the bundled example lists, computes their phonetic
+keys as the import does, and replays the misspelling corpus of the mistake
+pattern benchmark. Each attempt is checked for being a sound-alike
+spelling of its word with:
+
+- rules: the phonetic rules tried one regex substitution at a time, as
+  MistakePatternService did before its rule engine
+- rules (cached): the compiled rule engine with warm per-word features
+- key: one comparison of the attempt's key with the stored word key
+
+It reports attempts per second for each, and how many attempts the rules
+and the key flag, so the two can be compared.
+
+Run it from the backend directory:
+
+    python -m benchmarks.phonetic_key_benchmark --attempts 20000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+EXAMPLES_DIR = BACKEND_DIR.parent / "examples"
+
+
+def run(args) -> None:
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app.services.mistake_pattern_service import MistakePatternService
+    from app.services.phonetic_key import phonetic_key
+    from benchmarks.mistake_pattern_benchmark import build_corpus, create_reference_service
+
+    words = []
+    for csv_path in sorted(EXAMPLES_DIR.glob("*.csv")):
+        lines = csv_path.read_text(encoding="utf-8-sig").splitlines()[1:]
+        words.extend(line.split(",")[0].strip().lower() for line in lines if line.strip())
+    corpus = build_corpus(words, args.attempts, random.Random(args.seed))
+    distinct_words = sorted(set(words))
+
+    def best_of(function) -> float:
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    key_seconds = best_of(lambda: [phonetic_key(word) for word in distinct_words])
+    stored_keys = {word: phonetic_key(word) for word in distinct_words}
+
+    reference = create_reference_service()
+    engine = MistakePatternService()
+    for word, _ in corpus:
+        engine.word_features(word)
+
+    rules_seconds = best_of(lambda: [reference._check_phonetic_patterns(word, attempt) for word, attempt in corpus])
+    cached_seconds = best_of(lambda: [engine._check_phonetic_patterns(word, attempt) for word, attempt in corpus])
+    compare_seconds = best_of(lambda: [phonetic_key(attempt) == stored_keys[word] for word, attempt in corpus])
+
+    by_rules = {(word, attempt) for word, attempt in corpus if engine._check_phonetic_patterns(word, attempt)}
+    by_key = {(word, attempt) for word, attempt in corpus if phonetic_key(attempt) == stored_keys[word]}
+
+    print(f"distinct words         {len(distinct_words):>10}")
+    print(f"keys per second        {len(distinct_words) / key_seconds:>10.0f}")
+    print(f"attempts               {len(corpus):>10}")
+    print()
+    print(f"{'check':<16} {'us/attempt':>10} {'per second':>12} {'speedup':>8}")
+    for name, seconds in (("rules", rules_seconds), ("rules (cached)", cached_seconds), ("key", compare_seconds)):
+        print(
+            f"{name:<16} {seconds / len(corpus) * 1e6:>10.2f} "
+            f"{len(corpus) / seconds:>12.0f} {rules_seconds / seconds:>7.1f}x"
+        )
+    print()
+    distinct_attempts = len(set(corpus))
+    print(f"distinct attempts      {distinct_attempts:>10}")
+    print(f"flagged by rules       {len(by_rules):>10} ({len(by_rules) / distinct_attempts:.1%})")
+    print(f"flagged by key         {len(by_key):>10} ({len(by_key) / distinct_attempts:.1%})")
+    print(f"rule matches with key  {len(by_rules & by_key):>10} ({len(by_rules & by_key) / max(len(by_rules), 1):.1%})")
+    print(f"sound-alike, no rule   {len(by_key - by_rules):>10}")
+    for word, attempt in sorted(by_key - by_rules)[:args.show]:
+        print(f"  {word} -> {attempt} ({stored_keys[word]})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare phonetic key and rule based sound-alike detection")
+    parser.add_argument("--attempts", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs; the fastest counts")
+    parser.add_argument("--show", type=int, default=10, help="Sound-alike attempts no rule produces to list")
+    parser.add_argument("--seed", type=int, default=1)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Measure practice submit throughput with and without the SQLite tuning.
+
+Runs the same workload twice, each in a fresh process and scratch
+database, because the engine is built once from the settings at import:
+
+- default: connections as SQLAlchemy opens them, with a rollback journal,
+  full syncs, no pragmas, deferred transactions and a new connection per
+  session, as before the engine took its settings
+- tuned: the pragmas from app/core/database.py (WAL, synchronous=NORMAL,
+  busy timeout, page cache and mmap), write transactions that start with
+  BEGIN IMMEDIATE and the pooled write connection
+
+Statement logging is off in both, so only the connection setup differs.
+
+Each run seeds learners with a word list and has them submit practice
+attempts concurrently through the ASGI app, with the background review
+event writer running. The write coalescer is stopped, so every submit
+commits on its own and the learners contend for the write lock. It
+reports submits per second, latency percentiles and failed submits, such
+as "database is locked".
+
+Run it from the backend directory:
+
+    python -m benchmarks.sqlite_pragma_benchmark --learners 8 --submits 100
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def workload(args) -> dict:
+    # The app resolves its database path relative to the working directory
+    os.chdir(tempfile.mkdtemp(prefix="spelling-sqlite-"))
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    import httpx
+    from sqlalchemy import event
+    from app.api.endpoints.auth import create_access_token
+    from app.core import database
+    from app.core.database import AsyncSessionLocal, engine
+    from app.models.models import User, Word, WordList
+    from app.services.write_coalescer import write_coalescer
+    import main
+
+    if not args.tuned:
+        event.remove(engine.sync_engine, "connect", database._set_sqlite_pragmas)
+        event.remove(engine.sync_engine, "begin", database._begin_immediate)
+
+    for handler in main.app.router.on_startup:
+        await handler()
+    # Group commit would hide the contention between submits
+    await write_coalescer.stop()
+
+    rng = random.Random(args.seed)
+    async with AsyncSessionLocal() as session:
+        learners = []
+        for index in range(args.learners):
+            user = User(email=f"learner{index}@example.com", hashed_password="x", is_active=True)
+            word_list = WordList(name="Practice", owner=user)
+            # Meanings are filled in so the submit doesn't look them up
+            words = [
+                Word(word=f"spelling{letter}{index}", meaning="-", word_list=word_list)
+                for letter in "abcdefghijklmnopqrst"
+            ]
+            session.add_all([user, word_list, *words])
+            learners.append((user, words))
+        await session.commit()
+        learners = [
+            (create_access_token({"sub": user.email, "uid": user.id}, timedelta(hours=1)), [w.id for w in words])
+            for user, words in learners
+        ]
+
+    latencies = []
+    failures = 0
+    # A failed submit, e.g. "database is locked", counts as a 500 instead of ending the run
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+        async def learn(token: str, word_ids: List[int]) -> None:
+            nonlocal failures
+            headers = {"Authorization": f"Bearer {token}"}
+            for _ in range(args.submits):
+                word_id = rng.choice(word_ids)
+                started = time.perf_counter()
+                response = await client.post("/api/v1/practice/submit", headers=headers, json={
+                    "word_id": word_id, "user_spelling": rng.choice(["spelling", "speling", "spellling"])
+                })
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    failures += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(learn(token, word_ids) for token, word_ids in learners))
+        seconds = time.perf_counter() - started
+
+    for handler in main.app.router.on_shutdown:
+        await handler()
+
+    async with engine.connect() as conn:
+        journal_mode = (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar()
+        synchronous = (await conn.exec_driver_sql("PRAGMA synchronous")).scalar()
+    await engine.dispose()
+
+    return {
+        "journal_mode": journal_mode,
+        "synchronous": synchronous,
+        "submits": len(latencies),
+        "seconds": seconds,
+        "failures": failures,
+        "p50": percentile(latencies, 0.5),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+    }
+
+
+def run(args) -> None:
+    results = {}
+    for name, tuned in (("default", False), ("tuned", True)):
+        command = [
+            sys.executable, "-m", "benchmarks.sqlite_pragma_benchmark", "--child",
+            "--learners", str(args.learners), "--submits", str(args.submits), "--seed", str(args.seed)
+        ]
+        if tuned:
+            command.append("--tuned")
+        env = {**os.environ, "LLM_BACKEND": "stub"}
+        if not tuned:
+            env["SQLITE_WRITE_POOL_SIZE"] = "0"
+        output = subprocess.run(
+            command, cwd=BACKEND_DIR, check=True, capture_output=True, text=True, env=env
+        ).stdout
+        results[name] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"learners               {args.learners:>10}")
+    print(f"submits per learner    {args.submits:>10}")
+    print()
+    print(f"{'engine':<8} {'journal':>8} {'sync':>5} {'submits/s':>10} {'p50 ms':>8} "
+          f"{'p95 ms':>8} {'p99 ms':>8} {'failed':>7} {'speedup':>8}")
+    baseline = results["default"]["submits"] / results["default"]["seconds"]
+    for name, result in results.items():
+        throughput = result["submits"] / result["seconds"]
+        print(
+            f"{name:<8} {result['journal_mode']:>8} {result['synchronous']:>5} {throughput:>10.1f} "
+            f"{result['p50']:>8.1f} {result['p95']:>8.1f} {result['p99']:>8.1f} "
+            f"{result['failures']:>7} {throughput / baseline:>7.1f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare submit throughput with default and tuned SQLite settings")
+    parser.add_argument("--learners", type=int, default=8, help="Learners submitting concurrently")
+    parser.add_argument("--submits", type=int, default=100, help="Practice attempts per learner")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--tuned", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(asyncio.run(workload(args))))
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Measure answer submit throughput with and without group commit.
+
+Runs the same workload twice, each in a fresh process and scratch database:
+
+- per request: every submit commits its own transaction, as before the
+  write coalescer (the coalescer is stopped after startup, so submit()
+  commits each job on its own)
+- coalesced: submits are committed in batches by the write coalescer
+
+Each run seeds learners with a word list, then all of them answer at once
+through the ASGI app, alternating /practice/submit and
+/srs/review/{id}/submit, with a share of the answers wrong. It reports
+answers per second, latency percentiles, failed submits and the average
+number of answers per commit.
+
+Run it from the backend directory:
+
+    python -m benchmarks.write_coalescer_benchmark --learners 500 --answers 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+WORDS = ["necessary", "separate", "rhythm", "receive", "believe", "definitely", "occasion", "tomorrow"]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    i = rng.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+async def workload(args) -> dict:
+    # The app resolves its database path relative to the working directory
+    os.chdir(tempfile.mkdtemp(prefix="spelling-coalesce-"))
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    import httpx
+    from sqlalchemy import insert, select
+    from app.api.endpoints.auth import create_access_token
+    from app.core.database import AsyncSessionLocal, engine
+    from app.models.models import User, Word, WordList
+    from app.services.write_coalescer import write_coalescer
+    import main
+
+    for handler in main.app.router.on_startup:
+        await handler()
+    if not args.coalesced:
+        await write_coalescer.stop()
+
+    rng = random.Random(args.seed)
+    async with AsyncSessionLocal() as session:
+        user_ids = (await session.execute(
+            insert(User).returning(User.id),
+            [{"email": f"learner{index}@example.com", "hashed_password": "x", "is_active": True}
+             for index in range(args.learners)]
+        )).scalars().all()
+        list_ids = (await session.execute(
+            insert(WordList).returning(WordList.id),
+            [{"name": "Practice", "owner_id": user_id} for user_id in user_ids]
+        )).scalars().all()
+        # Meanings are filled in so the submits don't look them up
+        await session.execute(insert(Word), [
+            {"word": word, "meaning": "-", "word_list_id": list_id, "srs_level": 0,
+             "practice_count": 0, "correct_count": 0, "incorrect_count": 0}
+            for list_id in list_ids for word in WORDS
+        ])
+        await session.commit()
+        rows = (await session.execute(
+            select(Word.id, Word.word, WordList.owner_id).join(WordList)
+        )).all()
+    words_by_user = {}
+    for row in rows:
+        words_by_user.setdefault(row.owner_id, []).append((row.id, row.word))
+    tokens = {
+        user_id: create_access_token({"sub": f"learner{index}@example.com", "uid": user_id}, timedelta(hours=1))
+        for index, user_id in enumerate(user_ids)
+    }
+
+    latencies = []
+    failures = 0
+    # A failed submit, e.g. "database is locked", counts as a 500 instead of ending the run
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    limits = httpx.Limits(max_connections=None)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=300, limits=limits) as client:
+        async def learn(user_id: int) -> None:
+            nonlocal failures
+            headers = {"Authorization": f"Bearer {tokens[user_id]}"}
+            for answer in range(args.answers):
+                word_id, word = rng.choice(words_by_user[user_id])
+                spelling = word if rng.random() < 0.7 else misspell(word, rng)
+                if answer % 2:
+                    url, body = f"/api/v1/srs/review/{word_id}/submit", {"user_spelling": spelling}
+                else:
+                    url, body = "/api/v1/practice/submit", {"word_id": word_id, "user_spelling": spelling}
+                started = time.perf_counter()
+                response = await client.post(url, headers=headers, json=body)
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    failures += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(learn(user_id) for user_id in user_ids))
+        seconds = time.perf_counter() - started
+        batches, jobs = write_coalescer.batches, write_coalescer.jobs
+
+    for handler in main.app.router.on_shutdown:
+        await handler()
+    await engine.dispose()
+
+    return {
+        "answers": len(latencies),
+        "seconds": seconds,
+        "failures": failures,
+        "p50": percentile(latencies, 0.5),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "per_commit": jobs / batches if batches else 1.0,
+    }
+
+
+def run(args) -> None:
+    results = {}
+    for name, coalesced in (("per request", False), ("coalesced", True)):
+        command = [
+            sys.executable, "-m", "benchmarks.write_coalescer_benchmark", "--child",
+            "--learners", str(args.learners), "--answers", str(args.answers), "--seed", str(args.seed)
+        ]
+        if coalesced:
+            command.append("--coalesced")
+        output = subprocess.run(
+            command, cwd=BACKEND_DIR, check=True, capture_output=True, text=True,
+            env={**os.environ, "LLM_BACKEND": "stub"}
+        ).stdout
+        results[name] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"learners               {args.learners:>10}")
+    print(f"answers per learner    {args.answers:>10}")
+    print()
+    print(f"{'commits':<12} {'answers/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'failed':>7} {'per commit':>11} {'speedup':>8}")
+    baseline = results["per request"]["answers"] / results["per request"]["seconds"]
+    for name, result in results.items():
+        throughput = result["answers"] / result["seconds"]
+        print(
+            f"{name:<12} {throughput:>10.1f} {result['p50']:>8.0f} {result['p95']:>8.0f} "
+            f"{result['p99']:>8.0f} {result['failures']:>7} {result['per_commit']:>11.1f} "
+            f"{throughput / baseline:>7.1f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare answer submit throughput with and without group commit")
+    parser.add_argument("--learners", type=int, default=500, help="Learners answering concurrently")
+    parser.add_argument("--answers", type=int, default=4, help="Answers per learner")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--coalesced", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(asyncio.run(workload(args))))
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
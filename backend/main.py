@@ -1,5 +1,6 @@
 import uvicorn
 import os
+import asyncio
 import logging
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -9,6 +10,15 @@ from fastapi.responses import JSONResponse
 from app.api.api import api_router
 from app.core.config import settings
 from app.core.init_db import init_db
+from app.services.stats_service import stats_service
+from app.services.review_event_service import review_event_service
+from app.services.write_coalescer import write_coalescer
+from app.services.mistake_analysis_service import mistake_analysis_service
+from app.services.llm_service import llm_service
+from app.services.password_service import password_hasher
+from app.services.srs_service import srs_service
+from app.services import srs_optimizer
+from app.core.database import AsyncSessionLocal, optimize_database, run_optimize
 
 # Setup logging
 logging.basicConfig(
@@ -68,6 +78,57 @@ async def startup_event():
     logger.info("Initializing database")
     await init_db()
     logger.info("Database initialized")
+    await optimize_database()
+    
+    await review_event_service.start()
+    await mistake_analysis_service.start()
+    await write_coalescer.start()
+    
+    # Use the latest fitted SRS intervals, pick up new ones and refit them periodically
+    async with AsyncSessionLocal() as session:
+        await srs_service.load_parameters(session)
+    app.state.srs_parameter_refresh = asyncio.create_task(
+        srs_service.run_parameter_refresh(settings.SRS_PARAMETER_REFRESH_MINUTES)
+    )
+    app.state.srs_optimizer = None
+    if settings.SRS_OPTIMIZER_INTERVAL_HOURS > 0:
+        app.state.srs_optimizer = asyncio.create_task(
+            srs_optimizer.run_periodically(settings.SRS_OPTIMIZER_INTERVAL_HOURS)
+        )
+    
+    # Keep the query planner's statistics current as the data grows
+    app.state.database_optimizer = None
+    if settings.SQLITE_OPTIMIZE_INTERVAL_HOURS > 0:
+        app.state.database_optimizer = asyncio.create_task(
+            run_optimize(settings.SQLITE_OPTIMIZE_INTERVAL_HOURS)
+        )
+    
+    # Keep the incrementally maintained stats counters honest
+    app.state.stats_reconciliation = asyncio.create_task(
+        stats_service.run_reconciliation(settings.STATS_RECONCILE_INTERVAL_MINUTES)
+    )
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background jobs"""
+    app.state.stats_reconciliation.cancel()
+    app.state.srs_parameter_refresh.cancel()
+    if app.state.srs_optimizer:
+        app.state.srs_optimizer.cancel()
+    if app.state.database_optimizer:
+        app.state.database_optimizer.cancel()
+    await write_coalescer.stop()
+    await mistake_analysis_service.stop()
+    await review_event_service.stop()
+    await llm_service.close()
+    password_hasher.close()
+    
+    cache_stats = llm_service.cache_stats()
+    logger.info(
+        f"LLM response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+        f"({cache_stats['hit_rate']:.1%}), saved {cache_stats['saved_prompt_tokens']} prompt "
+        f"and {cache_stats['saved_completion_tokens']} completion tokens"
+    )
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -33,7 +33,7 @@ target_metadata = Base.metadata
 
 def get_url():
     # Use regular SQLite for migrations, not aiosqlite
-    return "sqlite:///./spelling_teacher.db"
+    return SQLALCHEMY_DATABASE_URL.replace("+aiosqlite", "")
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
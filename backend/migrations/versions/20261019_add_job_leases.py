@@ -0,0 +1,28 @@
+"""add leases for periodic background jobs
+
+Revision ID: 20261019_add_job_leases
+Revises: 20261019_add_word_phonetic_keys
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_add_job_leases'
+down_revision: Union[str, None] = '20261019_add_word_phonetic_keys'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table(
+        'job_leases',
+        sa.Column('name', sa.String(), primary_key=True),
+        sa.Column('holder', sa.String(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    )
+
+def downgrade() -> None:
+    op.drop_table('job_leases')
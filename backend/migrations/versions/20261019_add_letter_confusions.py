@@ -0,0 +1,33 @@
+"""add per-user letter confusion matrices
+
+Revision ID: 20261019_add_letter_confusions
+Revises: 20261019_add_pattern_explanations
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_add_letter_confusions'
+down_revision: Union[str, None] = '20261019_add_pattern_explanations'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table(
+        'letter_confusions',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('kind', sa.String(), primary_key=True),
+        sa.Column('source', sa.String(), primary_key=True),
+        sa.Column('target', sa.String(), primary_key=True),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_letter_confusions_user_count', 'letter_confusions', ['user_id', 'count'])
+
+def downgrade() -> None:
+    op.drop_index('ix_letter_confusions_user_count', table_name='letter_confusions')
+    op.drop_table('letter_confusions')
@@ -0,0 +1,34 @@
+"""add background LLM mistake analyses cached per user
+
+Revision ID: 20261019_add_mistake_analyses
+Revises: 20261019_unique_mistake_patterns
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_add_mistake_analyses'
+down_revision: Union[str, None] = '20261019_unique_mistake_patterns'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table(
+        'mistake_analyses',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('scope', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False, server_default='pending'),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('analysis', sa.JSON(), nullable=True),
+        sa.Column('analyzed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('uq_mistake_analyses_user_scope', 'mistake_analyses', ['user_id', 'scope'], unique=True)
+
+def downgrade() -> None:
+    op.drop_index('uq_mistake_analyses_user_scope', table_name='mistake_analyses')
+    op.drop_table('mistake_analyses')
@@ -0,0 +1,42 @@
+"""add the mistake pattern explanation catalogue
+
+Revision ID: 20261019_add_pattern_explanations
+Revises: 20261019_add_mistake_analyses
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_add_pattern_explanations'
+down_revision: Union[str, None] = '20261019_add_mistake_analyses'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # The catalogue entries themselves are seeded by init_db on startup
+    op.create_table(
+        'pattern_explanations',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('pattern_type', sa.String(), nullable=False),
+        sa.Column('template', sa.String(), nullable=False),
+        sa.Column('analysis', sa.Text(), nullable=False),
+        sa.Column('suggestions', sa.JSON(), nullable=False),
+        sa.Column('rule_id', sa.Integer(), sa.ForeignKey('spelling_rules.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('rule_text', sa.Text(), nullable=True),
+        sa.Column('source', sa.String(), nullable=False, server_default='catalogue'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index(
+        'uq_pattern_explanations_type_template',
+        'pattern_explanations',
+        ['pattern_type', 'template'],
+        unique=True
+    )
+
+def downgrade() -> None:
+    op.drop_index('uq_pattern_explanations_type_template', table_name='pattern_explanations')
+    op.drop_table('pattern_explanations')
@@ -0,0 +1,40 @@
+"""add append-only review events table
+
+Revision ID: 20261019_add_review_events
+Revises: 20261019_add_stats_counters
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_add_review_events'
+down_revision: Union[str, None] = '20261019_add_stats_counters'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table(
+        'review_events',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('word_id', sa.Integer(), nullable=False),
+        sa.Column('reviewed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('correct', sa.Boolean(), nullable=False),
+        sa.Column('user_spelling', sa.String(), nullable=False),
+        sa.Column('latency_ms', sa.Integer(), nullable=True),
+        sa.Column('old_level', sa.Integer(), nullable=False),
+        sa.Column('new_level', sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        'ix_review_events_user_reviewed_at',
+        'review_events',
+        ['user_id', 'reviewed_at']
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_review_events_user_reviewed_at', table_name='review_events')
+    op.drop_table('review_events')
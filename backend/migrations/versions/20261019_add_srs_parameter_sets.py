@@ -0,0 +1,41 @@
+"""add versioned SRS parameter sets fitted by the optimizer
+
+Revision ID: 20261019_add_srs_parameter_sets
+Revises: 20261019_add_review_events
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_add_srs_parameter_sets'
+down_revision: Union[str, None] = '20261019_add_review_events'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    op.create_table(
+        'srs_parameter_sets',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('version', sa.Integer(), nullable=False, unique=True),
+        sa.Column('intervals', sa.JSON(), nullable=False),
+        sa.Column('target_retention', sa.Float(), nullable=False),
+        sa.Column('sample_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_srs_parameter_sets_id', 'srs_parameter_sets', ['id'])
+    op.create_table(
+        'srs_user_parameters',
+        sa.Column('parameter_set_id', sa.Integer(), sa.ForeignKey('srs_parameter_sets.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('interval_scale', sa.Float(), nullable=False, server_default='1.0'),
+    )
+
+def downgrade() -> None:
+    op.drop_table('srs_user_parameters')
+    op.drop_index('ix_srs_parameter_sets_id', table_name='srs_parameter_sets')
+    op.drop_table('srs_parameter_sets')
@@ -0,0 +1,47 @@
+"""add incrementally maintained stats counter tables
+
+Revision ID: 20261019_add_stats_counters
+Revises: 16c2e78ef4bf
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_add_stats_counters'
+down_revision: Union[str, None] = '16c2e78ef4bf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTER_COLUMNS = [
+    'total_words', 'practiced_words', 'familiar_words', 'total_correct', 'total_attempts',
+    'level_0', 'level_1', 'level_2', 'level_3', 'level_4', 'level_5',
+]
+
+def counter_columns():
+    return [
+        sa.Column(name, sa.Integer(), nullable=False, server_default='0')
+        for name in COUNTER_COLUMNS
+    ]
+
+def upgrade() -> None:
+    # Rows are backfilled from the aggregates on first read
+    op.create_table(
+        'user_stats',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        *counter_columns(),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_table(
+        'word_list_stats',
+        sa.Column('word_list_id', sa.Integer(), sa.ForeignKey('word_lists.id', ondelete='CASCADE'), primary_key=True),
+        *counter_columns(),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+def downgrade() -> None:
+    op.drop_table('word_list_stats')
+    op.drop_table('user_stats')
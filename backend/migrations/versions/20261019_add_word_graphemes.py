@@ -0,0 +1,37 @@
+"""add the grapheme inverted index for pattern drills
+
+Revision ID: 20261019_add_word_graphemes
+Revises: 20261019_mistake_pattern_examples
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_add_word_graphemes'
+down_revision: Union[str, None] = '20261019_mistake_pattern_examples'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Existing words are indexed by init_db on the next start
+    op.create_table(
+        'word_graphemes',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('key', sa.String(), primary_key=True),
+        sa.Column('word_id', sa.Integer(), sa.ForeignKey('words.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column(
+            'word_list_id', sa.Integer(),
+            sa.ForeignKey('word_lists.id', ondelete='CASCADE'), nullable=False
+        ),
+    )
+    op.create_index('ix_word_graphemes_word', 'word_graphemes', ['word_id'])
+    op.create_index('ix_word_graphemes_list', 'word_graphemes', ['word_list_id'])
+
+def downgrade() -> None:
+    op.drop_index('ix_word_graphemes_list', table_name='word_graphemes')
+    op.drop_index('ix_word_graphemes_word', table_name='word_graphemes')
+    op.drop_table('word_graphemes')
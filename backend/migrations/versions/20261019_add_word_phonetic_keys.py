@@ -0,0 +1,25 @@
+"""add phonetic keys to words
+
+Revision ID: 20261019_add_word_phonetic_keys
+Revises: 20261019_add_word_graphemes
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_add_word_phonetic_keys'
+down_revision: Union[str, None] = '20261019_add_word_graphemes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Keys of existing words are computed by init_db on the next start
+    op.add_column('words', sa.Column('phonetic_key', sa.String(), nullable=True))
+
+def downgrade() -> None:
+    with op.batch_alter_table('words') as batch_op:
+        batch_op.drop_column('phonetic_key')
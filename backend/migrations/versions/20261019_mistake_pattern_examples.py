@@ -0,0 +1,84 @@
+"""store mistake pattern examples in their own bounded table
+
+Revision ID: 20261019_mistake_pattern_examples
+Revises: 20261019_add_letter_confusions
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_mistake_pattern_examples'
+down_revision: Union[str, None] = '20261019_add_letter_confusions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Matches the MISTAKE_PATTERN_MAX_EXAMPLES default
+MAX_EXAMPLES = 10
+
+def upgrade() -> None:
+    op.create_table(
+        'mistake_pattern_examples',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column(
+            'pattern_id', sa.Integer(),
+            sa.ForeignKey('mistake_patterns.id', ondelete='CASCADE'), nullable=False
+        ),
+        sa.Column('spelling', sa.String(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('last_seen', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        'uq_mistake_pattern_examples_pattern_spelling', 'mistake_pattern_examples',
+        ['pattern_id', 'spelling'], unique=True
+    )
+    op.create_index(
+        'ix_mistake_pattern_examples_pattern_seen', 'mistake_pattern_examples',
+        ['pattern_id', 'last_seen']
+    )
+
+    # How often each attempt was made wasn't recorded, so each counts once
+    op.execute("""
+        INSERT OR IGNORE INTO mistake_pattern_examples (pattern_id, spelling, count, last_seen)
+        SELECT p.id, e.value, 1, COALESCE(p.updated_at, p.created_at, CURRENT_TIMESTAMP)
+        FROM mistake_patterns p, json_each(p.examples) e
+        WHERE p.examples IS NOT NULL
+        ORDER BY p.id, e.key
+    """)
+    op.execute(f"""
+        DELETE FROM mistake_pattern_examples
+        WHERE id NOT IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY pattern_id ORDER BY last_seen DESC, id DESC
+                ) AS position
+                FROM mistake_pattern_examples
+            )
+            WHERE position <= {MAX_EXAMPLES}
+        )
+    """)
+
+    with op.batch_alter_table('mistake_patterns') as batch_op:
+        batch_op.drop_column('examples')
+
+def downgrade() -> None:
+    with op.batch_alter_table('mistake_patterns') as batch_op:
+        batch_op.add_column(sa.Column('examples', sa.JSON(), nullable=True))
+
+    op.execute("""
+        UPDATE mistake_patterns
+        SET examples = (
+            SELECT json_group_array(spelling) FROM (
+                SELECT spelling FROM mistake_pattern_examples
+                WHERE pattern_id = mistake_patterns.id
+                ORDER BY last_seen, id
+            )
+        )
+    """)
+
+    op.drop_index('ix_mistake_pattern_examples_pattern_seen', table_name='mistake_pattern_examples')
+    op.drop_index('uq_mistake_pattern_examples_pattern_spelling', table_name='mistake_pattern_examples')
+    op.drop_table('mistake_pattern_examples')
@@ -0,0 +1,48 @@
+"""merge duplicate mistake patterns and make them unique per word
+
+Revision ID: 20261019_unique_mistake_patterns
+Revises: 20261019_add_srs_parameter_sets
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.services.mistake_pattern_repository import (
+    DELETE_DUPLICATE_PATTERNS_SQL, MERGE_DUPLICATE_PATTERNS_SQL, UNIQUE_PATTERN_INDEX
+)
+
+# revision identifiers, used by Alembic.
+revision: str = '20261019_unique_mistake_patterns'
+down_revision: Union[str, None] = '20261019_add_srs_parameter_sets'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    # Fold duplicates into the oldest row: frequencies add up, examples are merged
+    op.execute(MERGE_DUPLICATE_PATTERNS_SQL)
+    op.execute("""
+        UPDATE mistake_patterns
+        SET examples = (
+                SELECT json_group_array(DISTINCT e.value) FROM mistake_patterns d, json_each(d.examples) e
+                WHERE d.word_id IS mistake_patterns.word_id
+                  AND d.pattern_type = mistake_patterns.pattern_type
+                  AND d.description = mistake_patterns.description
+            )
+        WHERE id IN (
+            SELECT MIN(id) FROM mistake_patterns
+            GROUP BY word_id, pattern_type, description
+            HAVING COUNT(*) > 1
+        )
+    """)
+    op.execute(DELETE_DUPLICATE_PATTERNS_SQL)
+    op.create_index(
+        UNIQUE_PATTERN_INDEX,
+        'mistake_patterns',
+        ['word_id', 'pattern_type', 'description'],
+        unique=True
+    )
+
+def downgrade() -> None:
+    op.drop_index(UNIQUE_PATTERN_INDEX, table_name='mistake_patterns')
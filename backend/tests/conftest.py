@@ -0,0 +1,77 @@
+"""
+Shared fixtures.
+
+The app builds its engines from the settings when it's imported, so the
+database is pointed at a scratch directory before anything from the app is
+imported. The tests also run in that directory, because static files and
+caches are created relative to the working directory.
+"""
+import itertools
+import os
+import tempfile
+
+WORK_DIR = tempfile.mkdtemp(prefix="spelling-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{WORK_DIR}/spelling_teacher.db"
+os.environ["LLM_BACKEND"] = "stub"
+
+import httpx
+import pytest
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models.models import User, Word, WordList
+from app.services.stats_service import stats_service
+
+_emails = itertools.count()
+
+
+def pytest_configure(config):
+    os.chdir(WORK_DIR)
+
+
+@pytest.fixture(scope="session", autouse=True)
+async def app():
+    """The application after its startup handlers ran, i.e. with tables and background jobs"""
+    import main
+
+    for handler in main.app.router.on_startup:
+        await handler()
+    yield main.app
+    for handler in main.app.router.on_shutdown:
+        await handler()
+    await engine.dispose()
+
+
+@pytest.fixture
+def make_word_list():
+    """Create a learner with a word list of the given words, returning the user, list and word ids"""
+    async def make(words):
+        async with AsyncSessionLocal() as session:
+            user = User(email=f"learner{next(_emails)}@example.com", hashed_password="x", is_active=True)
+            session.add(user)
+            await session.flush()
+            word_list = WordList(name="Practice", owner_id=user.id)
+            session.add(word_list)
+            await session.flush()
+            # Meanings are filled in so submits don't look them up
+            rows = [
+                Word(
+                    word=word, meaning="-", word_list_id=word_list.id, srs_level=0,
+                    practice_count=0, correct_count=0, incorrect_count=0, familiar=False
+                )
+                for word in words
+            ]
+            session.add_all(rows)
+            await session.flush()
+            await stats_service.get_word_list_stats(session, word_list.id)
+            await stats_service.get_user_stats(session, user.id)
+            await session.commit()
+            return user.id, word_list.id, [row.id for row in rows]
+    return make
+
+
+@pytest.fixture
+async def client(app):
+    """HTTP client that calls the app in-process"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=300) as client:
+        yield client
@@ -0,0 +1,61 @@
+"""
+An OpenAI-compatible /v1/chat/completions endpoint whose latency and
+failures the tests control, for driving OpenAIBackend over real HTTP.
+"""
+import asyncio
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+class FakeServerState:
+    """What the fake server does with the next requests, and what it has seen"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.latency = 0.0
+        self.failures = 0  # Requests still to answer with a 500; negative fails every request
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.client_ports = set()
+
+
+def create_fake_app(state: FakeServerState) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        state.requests += 1
+        state.client_ports.add(request.client.port)
+        state.in_flight += 1
+        state.max_in_flight = max(state.max_in_flight, state.in_flight)
+        try:
+            await asyncio.sleep(state.latency)
+            if state.failures:
+                if state.failures > 0:
+                    state.failures -= 1
+                return JSONResponse(status_code=500, content={"error": {"message": "fake failure"}})
+            return {
+                "id": f"chatcmpl-{state.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body["model"],
+                "choices": [{
+                    "index": 0,
+                    "message": {
+                        "role": "assistant",
+                        "content": '{"analysis": "fake", "suggestions": [], "rule": null}'
+                    },
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120}
+            }
+        finally:
+            state.in_flight -= 1
+
+    return app
@@ -0,0 +1,123 @@
+import asyncio
+import random
+from collections import Counter
+from datetime import timedelta
+
+import pytest
+
+from app.api.endpoints.auth import create_access_token
+from app.core.clock import get_clock
+from app.core.database import AsyncSessionLocal
+from app.models.models import User, Word, WordListStats
+from app.services.srs_service import srs_service
+from app.services.stats_service import COUNTER_COLUMNS, stats_service
+from app.services.write_coalescer import write_coalescer
+
+WORD = "necessary"
+ANSWERS = 200
+
+
+def burst(seed: int):
+    rng = random.Random(seed)
+    return [rng.random() < 0.7 for _ in range(ANSWERS)]
+
+
+async def assert_no_lost_updates(word_id: int, answers) -> None:
+    async with AsyncSessionLocal() as session:
+        word = await session.get(Word, word_id)
+        stats = await session.get(WordListStats, word.word_list_id)
+    assert word.practice_count == len(answers)
+    assert word.correct_count == sum(answers)
+    assert word.incorrect_count == len(answers) - sum(answers)
+    expected = stats_service.contribution(word)
+    for column in COUNTER_COLUMNS:
+        assert getattr(stats, column) == expected[column], column
+
+
+async def test_concurrent_record_answer_calls(make_word_list):
+    user_id, _, (word_id,) = await make_word_list([WORD])
+    answers = burst(1)
+
+    async def record(correct: bool) -> None:
+        async with AsyncSessionLocal() as session:
+            word = await session.get(Word, word_id)
+            _, delta = await srs_service.record_answer(session, word, correct, get_clock().now())
+            await stats_service.apply_delta(session, user_id, word.word_list_id, delta)
+            await session.commit()
+
+    # Any "database is locked" fails the test
+    await asyncio.gather(*(record(correct) for correct in answers))
+    await assert_no_lost_updates(word_id, answers)
+
+
+@pytest.mark.parametrize("coalesced", [False, True], ids=["per request", "coalesced"])
+async def test_concurrent_submits(client, make_word_list, coalesced):
+    user_id, _, (word_id,) = await make_word_list([WORD])
+    async with AsyncSessionLocal() as session:
+        user = await session.get(User, user_id)
+    token = create_access_token({"sub": user.email, "uid": user.id}, timedelta(hours=1))
+    headers = {"Authorization": f"Bearer {token}"}
+    answers = burst(2)
+
+    async def submit(index: int, correct: bool) -> None:
+        spelling = WORD if correct else "neccessary"
+        if index % 2:
+            response = await client.post(
+                f"/api/v1/srs/review/{word_id}/submit", headers=headers, json={"user_spelling": spelling}
+            )
+        else:
+            response = await client.post(
+                "/api/v1/practice/submit", headers=headers, json={"word_id": word_id, "user_spelling": spelling}
+            )
+        assert response.status_code == 200, response.text
+
+    if not coalesced:
+        # Every submit commits on its own and contends for the write lock
+        await write_coalescer.stop()
+    try:
+        await asyncio.gather(*(submit(index, correct) for index, correct in enumerate(answers)))
+    finally:
+        await write_coalescer.start()
+    await assert_no_lost_updates(word_id, answers)
+
+
+@pytest.mark.parametrize("path", ["/api/v1/srs/review/{word_id}/submit", "/api/v1/practice/submit"])
+async def test_answer_to_a_word_deleted_before_its_batch(client, make_word_list, monkeypatch, path):
+    user_id, _, (word_id, other_word_id) = await make_word_list([WORD, "rhythm"])
+    async with AsyncSessionLocal() as session:
+        user = await session.get(User, user_id)
+    token = create_access_token({"sub": user.email, "uid": user.id}, timedelta(hours=1))
+
+    submit = write_coalescer.submit
+    other_answer = []
+
+    async def submit_after_delete(job):
+        # The word goes away after the endpoint loaded it; another answer shares the batch
+        async with AsyncSessionLocal() as session:
+            word = await session.get(Word, word_id)
+            removed = Counter({name: -count for name, count in stats_service.contribution(word).items()})
+            await stats_service.apply_delta(session, user_id, word.word_list_id, removed)
+            await session.delete(word)
+            await session.commit()
+        other_answer.append(asyncio.create_task(answer_other_word()))
+        return await submit(job)
+
+    async def answer_other_word():
+        async def record(session):
+            word = await session.get(Word, other_word_id)
+            _, delta = await srs_service.record_answer(session, word, True, get_clock().now())
+            await stats_service.apply_delta(session, user_id, word.word_list_id, delta)
+        await submit(record)
+
+    monkeypatch.setattr(write_coalescer, "submit", submit_after_delete)
+    response = await client.post(
+        path.format(word_id=word_id),
+        headers={"Authorization": f"Bearer {token}"},
+        json={"word_id": word_id, "user_spelling": "neccessary"}
+    )
+    assert response.status_code == 404
+    await other_answer[0]
+
+    async with AsyncSessionLocal() as session:
+        other_word = await session.get(Word, other_word_id)
+    assert other_word.practice_count == 1
@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from sqlalchemy import event, text
+from sqlalchemy.future import select
+
+from app.core.database import AsyncSessionLocal, engine
+from app.core.init_db import apply_mistake_pattern_unique_index
+from app.models.models import MistakeExample, MistakePattern
+from app.services.mistake_pattern_repository import UNIQUE_PATTERN_INDEX
+
+
+async def index_exists() -> bool:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"),
+            {"name": UNIQUE_PATTERN_INDEX}
+        )
+        return result.first() is not None
+
+
+async def test_unique_index_migration_merges_duplicates(make_word_list):
+    _, _, (word_id,) = await make_word_list(["separate"])
+    # A database from before the index, with the same pattern recorded twice
+    async with AsyncSessionLocal() as session:
+        await session.execute(text(f"DROP INDEX {UNIQUE_PATTERN_INDEX}"))
+        patterns = [
+            MistakePattern(word_id=word_id, pattern_type="substitution", description="a/e confusion", frequency=frequency)
+            for frequency in (2, 3)
+        ]
+        session.add_all(patterns)
+        await session.flush()
+        session.add_all([
+            MistakeExample(pattern_id=pattern.id, spelling=spelling, last_seen=datetime(2026, 1, 1))
+            for pattern, spelling in zip(patterns, ["seperate", "separete"])
+        ])
+        await session.commit()
+
+    await apply_mistake_pattern_unique_index()
+
+    assert await index_exists()
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(MistakePattern).where(MistakePattern.word_id == word_id))
+        (pattern,) = result.scalars().all()
+        assert pattern.frequency == 5
+        assert sorted(pattern.examples) == ["separete", "seperate"]
+
+
+async def test_unique_index_migration_is_skipped_once_applied():
+    assert await index_exists()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        await apply_mistake_pattern_unique_index()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert not any("mistake_pattern" in statement for statement in statements)
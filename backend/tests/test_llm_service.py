@@ -0,0 +1,118 @@
+import asyncio
+import itertools
+import socket
+import time
+
+import pytest
+import uvicorn
+
+from app.services.llm_cache import LLMResponseCache
+from app.services.llm_service import CircuitBreaker, FALLBACK_ANALYSIS, LLMService, OpenAIBackend
+from tests.fake_llm_server import FakeServerState, create_fake_app
+
+_cases = itertools.count()
+
+
+@pytest.fixture(scope="module")
+async def fake_server():
+    state = FakeServerState()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(create_fake_app(state), log_level="warning"))
+    task = asyncio.create_task(server.serve(sockets=[sock]))
+    while not server.started:
+        await asyncio.sleep(0.01)
+    yield state, f"http://127.0.0.1:{sock.getsockname()[1]}/v1"
+    server.should_exit = True
+    await task
+
+
+@pytest.fixture
+def server(fake_server):
+    state, _ = fake_server
+    state.reset()
+    return state
+
+
+@pytest.fixture
+async def make_service(fake_server, tmp_path):
+    _, base_url = fake_server
+    services = []
+
+    def make(concurrency=4, timeout=5.0, max_retries=2, failure_threshold=5, reset_seconds=30):
+        backend = OpenAIBackend(
+            api_key="fake-key", base_url=base_url, max_concurrency=concurrency,
+            timeout=timeout, max_retries=max_retries
+        )
+        service = LLMService(
+            backend=backend,
+            cache=LLMResponseCache(str(tmp_path / "llm"), ttl_seconds=3600, max_bytes=1024 * 1024),
+            breaker=CircuitBreaker(failure_threshold=failure_threshold, reset_seconds=reset_seconds)
+        )
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        await service.close()
+
+
+async def analyze(service: LLMService) -> bool:
+    """Ask for an analysis no earlier call asked for, so it misses the cache; True unless it fell back"""
+    pattern = {"pattern_type": "other", "description": f"case {next(_cases)}", "frequency": 1, "examples": ["x"]}
+    return await service.analyze_mistake_patterns([pattern]) is not FALLBACK_ANALYSIS
+
+
+async def test_calls_stay_within_the_concurrency_limit(server, make_service):
+    service = make_service(concurrency=4)
+    server.latency = 0.1
+
+    results = await asyncio.gather(*(analyze(service) for _ in range(20)))
+
+    assert all(results)
+    assert server.max_in_flight <= 4
+    # Connections are pooled and reused, not opened per call
+    assert len(server.client_ports) <= 4
+
+
+async def test_transient_failures_are_retried(server, make_service):
+    service = make_service(max_retries=2)
+    server.failures = 2
+
+    assert await analyze(service)
+    assert server.requests == 3
+
+
+async def test_retries_give_up_after_max_retries(server, make_service):
+    service = make_service(max_retries=2)
+    server.failures = 3
+
+    assert not await analyze(service)
+    assert server.requests == 3
+
+
+async def test_slow_server_is_abandoned_at_the_deadline(server, make_service):
+    service = make_service(timeout=0.5)
+    server.latency = 3
+
+    started = time.perf_counter()
+    assert not await analyze(service)
+    assert time.perf_counter() - started < 1.5
+
+
+async def test_circuit_opens_on_an_outage_and_closes_when_it_ends(server, make_service):
+    service = make_service(max_retries=0, failure_threshold=3, reset_seconds=0.5)
+    server.failures = -1
+
+    for _ in range(3):
+        assert not await analyze(service)
+    assert service.breaker.state == "open"
+
+    # While open, calls fall back without reaching the provider
+    assert not any(await asyncio.gather(*(analyze(service) for _ in range(10))))
+    assert server.requests == 3
+
+    server.failures = 0
+    await asyncio.sleep(0.5)
+    assert await analyze(service)
+    assert service.breaker.state == "closed"
@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta
+
+from app.core.clock import SimulatedClock, get_clock, set_clock
+from app.core.database import AsyncSessionLocal
+from app.services.mistake_analysis_service import mistake_analysis_service, word_scope
+from app.services.mistake_pattern_repository import upsert_mistake_pattern
+
+PATTERN = {"pattern_type": "vowel_confusion", "description": "ie written as ei"}
+
+
+async def test_patterns_are_last_seen_on_the_injected_clock(make_word_list):
+    user_id, _, (word_id,) = await make_word_list(["believe"])
+    clock = SimulatedClock(datetime(2024, 1, 1, 8, 0))
+    real_clock = get_clock()
+    set_clock(clock)
+    try:
+        async with AsyncSessionLocal() as session:
+            await upsert_mistake_pattern(session, word_id, PATTERN, "beleive")
+            clock.advance(timedelta(days=3))
+            await upsert_mistake_pattern(session, word_id, PATTERN, "beleeve")
+            await session.commit()
+    finally:
+        set_clock(real_clock)
+
+    async with AsyncSessionLocal() as session:
+        (pattern,) = await mistake_analysis_service.load_patterns(session, user_id, word_scope(word_id))
+    assert pattern["last_seen"] == datetime(2024, 1, 4, 8, 0)
@@ -0,0 +1,17 @@
+from app.core.database import AsyncSessionLocal
+from app.services.mistake_pattern_repository import upsert_mistake_pattern
+
+PATTERN = {"pattern_type": "vowel_confusion", "description": "ie written as ei"}
+
+
+async def test_upsert_reads_examples_only_when_asked(make_word_list):
+    _, _, (word_id,) = await make_word_list(["believe"])
+    async with AsyncSessionLocal() as session:
+        first = await upsert_mistake_pattern(session, word_id, PATTERN, "beleive")
+        second = await upsert_mistake_pattern(session, word_id, PATTERN, "beleeve", with_examples=True)
+        await session.commit()
+
+    assert first.examples is None
+    assert first.id == second.id
+    assert (first.frequency, second.frequency) == (1, 2)
+    assert second.examples == ["beleive", "beleeve"]
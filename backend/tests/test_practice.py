@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from app.api.endpoints.auth import create_access_token
+from app.core.database import AsyncSessionLocal
+from app.models.models import User
+from app.services.grapheme_index_service import grapheme_index_service
+
+
+async def test_pattern_word_deleted_after_sampling_is_not_found(client, make_word_list, monkeypatch):
+    user_id, _, _ = await make_word_list(["believe"])
+    async with AsyncSessionLocal() as session:
+        user = await session.get(User, user_id)
+    token = create_access_token({"sub": user.email, "uid": user.id}, timedelta(hours=1))
+
+    async def sample_word(db, user_id, key, word_list_id=None):
+        return 10 ** 9  # Sampled, then deleted along with its list
+
+    monkeypatch.setattr(grapheme_index_service, "sample_word", sample_word)
+    response = await client.post(
+        "/api/v1/practice/pattern-word",
+        json={"pattern": "ie/ei"},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 404
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from app.services.spelling_alignment import _align_middle, align
+
+
+def table_alignment(correct, attempt):
+    """Align everything between the shared start and end with the full table"""
+    start = 0
+    while start < min(len(correct), len(attempt)) and correct[start] == attempt[start]:
+        start += 1
+    correct_end, attempt_end = len(correct), len(attempt)
+    while correct_end > start and attempt_end > start and correct[correct_end - 1] == attempt[attempt_end - 1]:
+        correct_end -= 1
+        attempt_end -= 1
+    return _align_middle(correct, attempt, start, correct_end, attempt_end)
+
+
+@pytest.mark.parametrize("correct, attempt", [
+    ("necessary", "neccessary"),
+    ("necessary", "necesary"),
+    ("receive", "recieve"),
+    ("separate", "seperate"),
+    ("rhythm", "rythm"),
+    ("phone", "fone"),
+    ("station", "stasion"),
+    ("a", "b"),
+    ("ab", "ba"),
+    ("tomorrow", "tommorow"),
+])
+def test_align_matches_the_table(correct, attempt):
+    assert align(correct, attempt) == table_alignment(correct, attempt)
+
+
+def test_align_matches_the_table_on_random_misspellings():
+    rng = random.Random(7)
+    for _ in range(5000):
+        correct = "".join(rng.choice("aebst") for _ in range(rng.randint(1, 8)))
+        attempt = list(correct)
+        for _ in range(rng.randint(1, 3)):
+            position = rng.randrange(len(attempt) + 1)
+            edit = rng.choice(("insert", "delete", "substitute", "transpose"))
+            if edit == "insert":
+                attempt.insert(position, rng.choice("aebst"))
+            elif position < len(attempt) and edit == "delete":
+                del attempt[position]
+            elif position < len(attempt) and edit == "substitute":
+                attempt[position] = rng.choice("aebst")
+            elif position + 1 < len(attempt):
+                attempt[position], attempt[position + 1] = attempt[position + 1], attempt[position]
+        attempt = "".join(attempt)
+        assert align(correct, attempt) == table_alignment(correct, attempt), (correct, attempt)
@@ -0,0 +1,17 @@
+from app.services.srs_optimizer import ReviewHistogram, fit_intervals
+from app.services.srs_service import SRSService
+
+
+def test_empty_histogram_keeps_default_intervals():
+    result = fit_intervals(
+        ReviewHistogram(),
+        target_retention=0.9,
+        default_intervals=SRSService.INTERVALS,
+        min_samples=200,
+        min_user_samples=50
+    )
+
+    assert result.intervals == SRSService.INTERVALS
+    assert result.stabilities == [None] * len(SRSService.INTERVALS)
+    assert result.sample_count == 0
+    assert result.user_scales == {}
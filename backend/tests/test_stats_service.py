@@ -0,0 +1,132 @@
+import asyncio
+import contextlib
+import random
+from collections import Counter
+
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.pool import NullPool
+
+from app.core.clock import get_clock
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, ReadOnlySessionLocal
+from app.models.models import UserStats, Word, WordListStats
+from app.services import stats_service as stats_module
+from app.services.srs_service import srs_service
+from app.services.stats_service import COUNTER_COLUMNS, stats_service
+
+
+async def answer(user_id: int, word_id: int, correct: bool, session_factory=AsyncSessionLocal) -> None:
+    async with session_factory() as session:
+        word = await session.get(Word, word_id)
+        _, delta = await srs_service.record_answer(session, word, correct, get_clock().now())
+        await stats_service.apply_delta(session, user_id, word.word_list_id, delta)
+        await session.commit()
+
+
+async def assert_counters_match_words(user_id: int, word_list_id: int) -> None:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(Word).where(Word.word_list_id == word_list_id))
+        expected = Counter()
+        for word in result.scalars().all():
+            expected.update(stats_service.contribution(word))
+        list_stats = await session.get(WordListStats, word_list_id)
+        user_stats = await session.get(UserStats, user_id)
+    for column in COUNTER_COLUMNS:
+        assert getattr(list_stats, column) == expected[column], column
+        assert getattr(user_stats, column) == expected[column], column
+
+
+async def test_answers_keep_counters_equal_to_aggregates(make_word_list):
+    user_id, word_list_id, word_ids = await make_word_list(["receive", "believe", "separate", "rhythm"])
+    rng = random.Random(1)
+    for _ in range(40):
+        await answer(user_id, rng.choice(word_ids), rng.random() < 0.7)
+
+    await assert_counters_match_words(user_id, word_list_id)
+    async with AsyncSessionLocal() as session:
+        corrected = await stats_service.reconcile(session)
+    assert corrected == {"users_corrected": 0, "lists_corrected": 0}
+
+
+async def test_reconcile_corrects_drift(make_word_list):
+    user_id, word_list_id, word_ids = await make_word_list(["necessary", "occasion"])
+    await answer(user_id, word_ids[0], True)
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(WordListStats).where(WordListStats.word_list_id == word_list_id)
+            .values(total_attempts=WordListStats.total_attempts + 5, familiar_words=2)
+        )
+        await session.commit()
+
+    async with AsyncSessionLocal() as session:
+        corrected = await stats_service.reconcile(session)
+    assert corrected["lists_corrected"] == 1
+    await assert_counters_match_words(user_id, word_list_id)
+
+
+async def test_reconcile_keeps_increments_committed_while_it_runs(make_word_list, monkeypatch):
+    user_id, word_list_id, word_ids = await make_word_list(["accommodate", "embarrass"])
+    # A connection outside the app's pool, like another server process's
+    other_process = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    other_session = async_sessionmaker(other_process, expire_on_commit=False)
+
+    # Answer from the other process after the aggregate was read, before the corrections
+    correct_rows = stats_service._correct_rows
+    answers = []
+
+    async def correct_rows_after_an_answer(*args, **kwargs):
+        if not answers:
+            answers.append(asyncio.create_task(answer(user_id, word_ids[0], True, other_session)))
+            await asyncio.sleep(0.2)
+        return await correct_rows(*args, **kwargs)
+
+    monkeypatch.setattr(stats_service, "_correct_rows", correct_rows_after_an_answer)
+    async with AsyncSessionLocal() as session:
+        await stats_service.reconcile(session)
+    await answers[0]
+    await other_process.dispose()
+
+    await assert_counters_match_words(user_id, word_list_id)
+
+
+async def test_backfill_keeps_answers_committed_after_the_read(make_word_list, monkeypatch):
+    user_id, word_list_id, word_ids = await make_word_list(["rhythm", "separate"])
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(UserStats).where(UserStats.user_id == user_id))
+        await session.execute(delete(WordListStats).where(WordListStats.word_list_id == word_list_id))
+        await session.commit()
+    # A read endpoint finds the rows missing; an answer commits before the backfill writes
+    answered = []
+
+    @contextlib.asynccontextmanager
+    async def write_session_after_an_answer():
+        if not answered:
+            await answer(user_id, word_ids[0], True)
+            answered.append(True)
+        async with AsyncSessionLocal() as session:
+            yield session
+
+    monkeypatch.setattr(stats_module, "AsyncSessionLocal", write_session_after_an_answer)
+    async with ReadOnlySessionLocal() as session:
+        await stats_service.get_word_list_stats(session, word_list_id)
+        await stats_service.get_user_stats(session, user_id)
+    monkeypatch.undo()
+
+    await assert_counters_match_words(user_id, word_list_id)
+
+
+async def test_add_words_increments_an_existing_list_row(make_word_list):
+    user_id, word_list_id, _ = await make_word_list(["receive"])
+    async with AsyncSessionLocal() as session:
+        word = Word(
+            word="believe", meaning="-", word_list_id=word_list_id, srs_level=0,
+            practice_count=0, correct_count=0, incorrect_count=0, familiar=False
+        )
+        session.add(word)
+        await session.flush()
+        await stats_service.add_words(session, user_id, word_list_id, [word])
+        await session.commit()
+
+    await assert_counters_match_words(user_id, word_list_id)
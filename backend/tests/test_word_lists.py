@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from app.api.endpoints.auth import create_access_token
+from app.core.database import AsyncSessionLocal
+from app.models.models import User, Word, WordGrapheme, WordList
+from app.services.dictionary_service import dictionary_service
+from app.services.grapheme_index_service import grapheme_index_service
+from tests.test_stats_service import assert_counters_match_words
+
+CSV = "word,meaning\nreceive,to get\nbelieve,to trust\nrhythm,a beat\n"
+
+
+@pytest.fixture
+async def headers(make_word_list, monkeypatch):
+    async def get_word_details(word):
+        return None, None, None
+
+    # Dictionary lookups go to the network
+    monkeypatch.setattr(dictionary_service, "get_word_details", get_word_details)
+    user_id, _, _ = await make_word_list([])
+    async with AsyncSessionLocal() as session:
+        user = await session.get(User, user_id)
+    token = create_access_token({"sub": user.email, "uid": user.id}, timedelta(hours=1))
+    return user_id, {"Authorization": f"Bearer {token}"}
+
+
+async def upload(client, headers):
+    return await client.post(
+        "/api/v1/word-lists/upload",
+        data={"name": "Imported"},
+        files={"file": ("words.csv", CSV, "text/csv")},
+        headers=headers
+    )
+
+
+async def test_upload_counts_and_indexes_words(client, headers):
+    user_id, auth = headers
+    response = await upload(client, auth)
+    assert response.status_code == 200
+    word_list_id = response.json()["id"]
+
+    await assert_counters_match_words(user_id, word_list_id)
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(func.count(func.distinct(WordGrapheme.word_id)))
+            .where(WordGrapheme.word_list_id == word_list_id)
+        )
+        assert result.scalar() == 3
+
+
+async def test_failed_upload_commits_nothing(client, headers, monkeypatch):
+    user_id, auth = headers
+
+    async def add_words(db, user_id, words):
+        raise RuntimeError("index unavailable")
+
+    monkeypatch.setattr(grapheme_index_service, "add_words", add_words)
+    with pytest.raises(RuntimeError):
+        await upload(client, auth)
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(func.count()).select_from(Word)
+            .join(WordList, Word.word_list_id == WordList.id)
+            .where(WordList.owner_id == user_id, WordList.name == "Imported")
+        )
+        assert result.scalar() == 0